@@ -0,0 +1,290 @@
+# Generated by Django 5.1 on 2026-10-18 13:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Сводки ведутся триггерами на уровне оператора: изменения берутся из
+# таблиц переходов (строки до и после оператора), поэтому пакетные
+# UPDATE/INSERT/DELETE и запросы в обход ORM учитываются одним
+# запросом к каждой сводке на оператор; неизменившиеся группы не
+# блокируются (сумма изменений по ним - ноль)
+PARTICIPANT_CHANGES = {
+    "INSERT": "SELECT *, 1 AS sign FROM new_rows",
+    "UPDATE": (
+        "SELECT *, 1 AS sign FROM new_rows "
+        "UNION ALL SELECT *, -1 AS sign FROM old_rows"
+    ),
+    "DELETE": "SELECT *, -1 AS sign FROM old_rows",
+}
+
+PARTICIPANT_ROLLUP = """
+CREATE FUNCTION analytics_participant_rollup() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    changes text := CASE TG_OP
+        WHEN 'INSERT' THEN %(INSERT)s
+        WHEN 'UPDATE' THEN %(UPDATE)s
+        ELSE %(DELETE)s
+    END;
+BEGIN
+    EXECUTE format($sql$
+        WITH changes AS (%%s)
+        INSERT INTO analytics_networkstats AS stats
+            (country, city, level, unit_name, participants, debt)
+        SELECT country, city, level, unit_name, sum(sign), sum(sign * debt)
+        FROM changes
+        GROUP BY country, city, level, unit_name
+        HAVING sum(sign) <> 0 OR sum(sign * debt) <> 0
+        ORDER BY country, city, level, unit_name
+        ON CONFLICT (country, city, level, unit_name) DO UPDATE SET
+            participants = stats.participants + EXCLUDED.participants,
+            debt = stats.debt + EXCLUDED.debt
+    $sql$, changes);
+    EXECUTE format($sql$
+        WITH changes AS (%%s)
+        INSERT INTO analytics_factorystats AS stats
+            (factory_id, unit_name, customers, debt)
+        SELECT
+            split_part(tree_path, '/', 2)::bigint AS factory_id,
+            unit_name,
+            sum(sign),
+            sum(sign * debt)
+        FROM changes
+        WHERE tree_path <> '/'
+        GROUP BY 1, 2
+        HAVING sum(sign) <> 0 OR sum(sign * debt) <> 0
+        ORDER BY 1, 2
+        ON CONFLICT (factory_id, unit_name) DO UPDATE SET
+            customers = stats.customers + EXCLUDED.customers,
+            debt = stats.debt + EXCLUDED.debt
+    $sql$, changes);
+    IF TG_OP = 'DELETE' THEN
+        DELETE FROM analytics_factorystats
+        WHERE factory_id IN (SELECT id FROM old_rows);
+        DELETE FROM analytics_ownerproductstats
+        WHERE owner_id IN (SELECT id FROM old_rows);
+    END IF;
+    RETURN NULL;
+END
+$$;
+""" % {op: f"'{sql}'" for op, sql in PARTICIPANT_CHANGES.items()}
+
+PRODUCT_ROLLUP = """
+CREATE FUNCTION analytics_product_rollup() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    changes text := CASE TG_OP
+        WHEN 'INSERT' THEN 'SELECT owner_id, 1 AS sign FROM new_rows'
+        WHEN 'UPDATE' THEN 'SELECT owner_id, 1 AS sign FROM new_rows
+            UNION ALL SELECT owner_id, -1 AS sign FROM old_rows'
+        ELSE 'SELECT owner_id, -1 AS sign FROM old_rows'
+    END;
+BEGIN
+    EXECUTE format($sql$
+        WITH changes AS (%s)
+        INSERT INTO analytics_ownerproductstats AS stats (owner_id, products)
+        SELECT owner_id, sum(sign)
+        FROM changes
+        WHERE owner_id IS NOT NULL
+        GROUP BY owner_id
+        HAVING sum(sign) <> 0
+        ORDER BY owner_id
+        ON CONFLICT (owner_id) DO UPDATE SET
+            products = stats.products + EXCLUDED.products
+    $sql$, changes);
+    RETURN NULL;
+END
+$$;
+"""
+
+
+def create_triggers(table, function):
+    return [
+        f"CREATE TRIGGER {table}_rollup_insert AFTER INSERT ON {table} "
+        f"REFERENCING NEW TABLE AS new_rows "
+        f"FOR EACH STATEMENT EXECUTE FUNCTION {function}()",
+        f"CREATE TRIGGER {table}_rollup_update AFTER UPDATE ON {table} "
+        f"REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+        f"FOR EACH STATEMENT EXECUTE FUNCTION {function}()",
+        f"CREATE TRIGGER {table}_rollup_delete AFTER DELETE ON {table} "
+        f"REFERENCING OLD TABLE AS old_rows "
+        f"FOR EACH STATEMENT EXECUTE FUNCTION {function}()",
+    ]
+
+
+# Сводки по уже записанным участникам и продуктам
+FILL_ROLLUPS = [
+    """
+    INSERT INTO analytics_networkstats
+        (country, city, level, unit_name, participants, debt)
+    SELECT country, city, level, unit_name, count(*), sum(debt)
+    FROM participants_participant
+    GROUP BY country, city, level, unit_name
+    """,
+    """
+    INSERT INTO analytics_factorystats (factory_id, unit_name, customers, debt)
+    SELECT split_part(tree_path, '/', 2)::bigint, unit_name, count(*), sum(debt)
+    FROM participants_participant
+    WHERE tree_path <> '/'
+    GROUP BY 1, 2
+    """,
+    """
+    INSERT INTO analytics_ownerproductstats (owner_id, products)
+    SELECT owner_id, count(*)
+    FROM products_product
+    WHERE owner_id IS NOT NULL
+    GROUP BY owner_id
+    """,
+]
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("participants", "0011_participant_level_any_depth"),
+        ("products", "0006_product_release_date_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OwnerProductStats",
+            fields=[
+                (
+                    "owner",
+                    models.OneToOneField(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="product_stats",
+                        serialize=False,
+                        to="participants.participant",
+                        verbose_name="владелец",
+                    ),
+                ),
+                (
+                    "products",
+                    models.BigIntegerField(default=0, verbose_name="продуктов"),
+                ),
+            ],
+            options={
+                "verbose_name": "сводка продуктов владельца",
+                "verbose_name_plural": "сводки продуктов владельцев",
+            },
+        ),
+        migrations.CreateModel(
+            name="NetworkStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("country", models.CharField(max_length=50, verbose_name="Страна")),
+                ("city", models.CharField(max_length=50, verbose_name="Город")),
+                (
+                    "level",
+                    models.CharField(
+                        blank=True, max_length=3, null=True, verbose_name="уровень"
+                    ),
+                ),
+                ("unit_name", models.CharField(max_length=20, verbose_name="звено")),
+                (
+                    "participants",
+                    models.BigIntegerField(default=0, verbose_name="участников"),
+                ),
+                (
+                    "debt",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=20,
+                        verbose_name="задолженность",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "сводка сети",
+                "verbose_name_plural": "сводки сети",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("country", "city", "level", "unit_name"),
+                        name="network_stats_group_uniq",
+                        nulls_distinct=False,
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="FactoryStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("unit_name", models.CharField(max_length=20, verbose_name="звено")),
+                (
+                    "customers",
+                    models.BigIntegerField(default=0, verbose_name="покупателей"),
+                ),
+                (
+                    "debt",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=20,
+                        verbose_name="задолженность",
+                    ),
+                ),
+                (
+                    "factory",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="factory_stats",
+                        to="participants.participant",
+                        verbose_name="завод",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "сводка покупателей завода",
+                "verbose_name_plural": "сводки покупателей заводов",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("factory", "unit_name"), name="factory_stats_uniq"
+                    )
+                ],
+            },
+        ),
+        migrations.RunSQL(
+            [
+                PARTICIPANT_ROLLUP,
+                PRODUCT_ROLLUP,
+                *create_triggers(
+                    "participants_participant", "analytics_participant_rollup"
+                ),
+                *create_triggers("products_product", "analytics_product_rollup"),
+                *FILL_ROLLUPS,
+            ],
+            [
+                *[
+                    f"DROP TRIGGER {table}_rollup_{operation} ON {table}"
+                    for table in ("participants_participant", "products_product")
+                    for operation in ("insert", "update", "delete")
+                ],
+                "DROP FUNCTION analytics_participant_rollup()",
+                "DROP FUNCTION analytics_product_rollup()",
+            ],
+        ),
+    ]
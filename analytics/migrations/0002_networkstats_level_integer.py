@@ -0,0 +1,23 @@
+# Generated by Django 5.1 on 2026-10-18 14:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Триггеры переносят уровень участника в сводку: тип меняется
+    # сначала у участника
+    dependencies = [
+        ("analytics", "0001_rollups"),
+        ("participants", "0013_participant_level_integer"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="networkstats",
+            name="level",
+            field=models.PositiveSmallIntegerField(
+                blank=True, null=True, verbose_name="уровень"
+            ),
+        ),
+    ]
@@ -0,0 +1,98 @@
+from django.db import models
+
+from participants.models import Participant
+
+NULLABLE = {"blank": True, "null": True}
+
+
+class NetworkStats(models.Model):
+    """
+    Количество и задолженность участников по стране, городу, уровню и
+    звену. Ведется триггерами PostgreSQL (analytics 0001) при любом
+    изменении участников, в том числе пакетном; группы без участников
+    остаются с нулевыми значениями
+    """
+
+    country = models.CharField(max_length=50, verbose_name="Страна")
+    city = models.CharField(max_length=50, verbose_name="Город")
+    level = models.PositiveSmallIntegerField(verbose_name="уровень", **NULLABLE)
+    unit_name = models.CharField(max_length=20, verbose_name="звено")
+    participants = models.BigIntegerField(default=0, verbose_name="участников")
+    debt = models.DecimalField(
+        max_digits=20, decimal_places=2, default=0, verbose_name="задолженность"
+    )
+
+    def __str__(self):
+        # Строковое отображение объекта
+        return (
+            f"{self.country}, {self.city}, {self.level}, {self.unit_name}: "
+            f"{self.participants}"
+        )
+
+    class Meta:
+        verbose_name = "сводка сети"
+        verbose_name_plural = "сводки сети"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["country", "city", "level", "unit_name"],
+                name="network_stats_group_uniq",
+                nulls_distinct=False,
+            ),
+        ]
+
+
+class FactoryStats(models.Model):
+    """
+    Количество и задолженность покупателей (на любой глубине) каждого
+    звена у верхнего участника цепочки - завода, у отключенной от сети
+    цепочки - ее верхнего участника. Ведется триггерами PostgreSQL
+    """
+
+    # Без внешнего ключа: записи удаляются триггером вместе с участником
+    factory = models.ForeignKey(
+        Participant,
+        related_name="factory_stats",
+        verbose_name="завод",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+    )
+    unit_name = models.CharField(max_length=20, verbose_name="звено")
+    customers = models.BigIntegerField(default=0, verbose_name="покупателей")
+    debt = models.DecimalField(
+        max_digits=20, decimal_places=2, default=0, verbose_name="задолженность"
+    )
+
+    def __str__(self):
+        # Строковое отображение объекта
+        return f"{self.factory_id}, {self.unit_name}: {self.customers}"
+
+    class Meta:
+        verbose_name = "сводка покупателей завода"
+        verbose_name_plural = "сводки покупателей заводов"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["factory", "unit_name"], name="factory_stats_uniq"
+            ),
+        ]
+
+
+class OwnerProductStats(models.Model):
+    """Количество продуктов участника, ведется триггерами PostgreSQL"""
+
+    owner = models.OneToOneField(
+        Participant,
+        primary_key=True,
+        related_name="product_stats",
+        verbose_name="владелец",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+    )
+    products = models.BigIntegerField(default=0, verbose_name="продуктов")
+
+    def __str__(self):
+        # Строковое отображение объекта
+        return f"{self.owner_id}: {self.products}"
+
+    class Meta:
+        verbose_name = "сводка продуктов владельца"
+        verbose_name_plural = "сводки продуктов владельцев"
@@ -0,0 +1,51 @@
+from rest_framework import serializers
+
+from analytics.models import OwnerProductStats
+from participants.models import Participant
+
+
+class NetworkStatsSerializer(serializers.Serializer):
+    """Группа сводки сети, в ответе только поля группировки из ?group_by="""
+
+    country = serializers.CharField(required=False)
+    city = serializers.CharField(required=False)
+    level = serializers.CharField(required=False)
+    unit_name = serializers.CharField(required=False)
+    participants = serializers.IntegerField(source="participants_total")
+    debt = serializers.DecimalField(
+        max_digits=20, decimal_places=2, source="debt_total"
+    )
+
+
+class FactoryStatsSerializer(serializers.ModelSerializer):
+    customers = serializers.SerializerMethodField()
+    customers_debt = serializers.DecimalField(
+        max_digits=20, decimal_places=2, read_only=True
+    )
+
+    class Meta:
+        model = Participant
+        fields = [
+            "id",
+            "name",
+            "country",
+            "city",
+            "customers",
+            "customers_debt",
+        ]
+
+    def get_customers(self, obj):
+        # Количество покупателей по звеньям
+        return {stats.unit_name: stats.customers for stats in obj.factory_stats.all()}
+
+
+class OwnerProductStatsSerializer(serializers.ModelSerializer):
+    name = serializers.CharField(source="owner.name", read_only=True)
+
+    class Meta:
+        model = OwnerProductStats
+        fields = [
+            "owner",
+            "name",
+            "products",
+        ]
@@ -0,0 +1,240 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import Count, Sum
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from analytics.models import FactoryStats, NetworkStats, OwnerProductStats
+from participants.models import Participant
+from products.models import Product
+from users.models import User
+
+
+class AnalyticsTestCase(APITestCase):
+    def setUp(self) -> None:
+
+        super().setUp()
+        self.factory = Participant.objects.create(
+            name="ООО Мир",
+            email="vvv@list.ru",
+            country="Россия",
+            city="Москва",
+            street="New",
+            house="36/5",
+            unit_name=Participant.FACTORY,
+        )
+        self.retail = Participant.objects.create(
+            name="ООО Сеть",
+            email="ret@list.ru",
+            country="Россия",
+            city="Тверь",
+            street="New",
+            house="1",
+            unit_name=Participant.RETAIL_NETWORK,
+            supplier=self.factory,
+            debt=Decimal("100.50"),
+        )
+        self.entrepreneur = Participant.objects.create(
+            name="ИП Иванов",
+            email="ip@list.ru",
+            country="Россия",
+            city="Тверь",
+            street="New",
+            house="2",
+            unit_name=Participant.ENTREPRENEUR,
+            supplier=self.retail,
+            debt=Decimal("20.25"),
+        )
+        Product.objects.bulk_create(
+            [
+                Product(
+                    product_name=f"Продукт {number}",
+                    model="M",
+                    release_date="2024-01-01",
+                    owner=self.factory,
+                )
+                for number in range(3)
+            ]
+        )
+        self.user = User.objects.create(
+            email="vvv@list.ru",
+            last_name="Иванов",
+            first_name="Иван",
+            employer=self.factory,
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def assertRollupsMatch(self):
+        """Сводки совпадают с подсчетом по таблицам участников и продуктов"""
+
+        expected = {
+            tuple(row[:4]): row[4:]
+            for row in Participant.objects.values_list(
+                "country", "city", "level", "unit_name"
+            ).annotate(Count("pk"), Sum("debt"))
+        }
+        actual = {
+            tuple(row[:4]): row[4:]
+            for row in NetworkStats.objects.filter(participants__gt=0).values_list(
+                "country", "city", "level", "unit_name", "participants", "debt"
+            )
+        }
+        self.assertEqual(actual, expected)
+        expected = {}
+        for participant in Participant.objects.exclude(tree_path="/"):
+            key = (int(participant.tree_path.split("/")[1]), participant.unit_name)
+            customers, debt = expected.get(key, (0, 0))
+            expected[key] = (customers + 1, debt + participant.debt)
+        actual = {
+            row[:2]: row[2:]
+            for row in FactoryStats.objects.filter(customers__gt=0).values_list(
+                "factory_id", "unit_name", "customers", "debt"
+            )
+        }
+        self.assertEqual(actual, expected)
+        expected = dict(
+            Product.objects.filter(owner__isnull=False)
+            .values_list("owner_id")
+            .annotate(Count("pk"))
+            .order_by()
+        )
+        actual = dict(
+            OwnerProductStats.objects.filter(products__gt=0).values_list(
+                "owner_id", "products"
+            )
+        )
+        self.assertEqual(actual, expected)
+
+    def test_rollups(self):
+        """Сводки обновляются при любом изменении участников и продуктов"""
+
+        self.assertRollupsMatch()
+        self.entrepreneur.set_debt(Decimal("5.00"))
+        self.assertRollupsMatch()
+        self.entrepreneur.supplier = self.factory
+        self.entrepreneur.save()
+        self.assertRollupsMatch()
+        Participant.objects.filter(city="Тверь").update(
+            city="Клин", debt=Decimal("1.00")
+        )
+        self.assertRollupsMatch()
+        self.retail.detach_subtree()
+        self.assertRollupsMatch()
+        Product.objects.filter(owner=self.factory)[:1].get().delete()
+        Product.objects.filter(owner=self.factory).update(owner=self.retail)
+        self.assertRollupsMatch()
+        self.retail.delete()
+        self.assertRollupsMatch()
+        self.assertFalse(FactoryStats.objects.filter(factory_id=self.retail.pk))
+        self.assertFalse(OwnerProductStats.objects.filter(owner_id=self.retail.pk))
+
+    def test_network(self):
+        """Группировка по ?group_by= без чтения таблицы участников"""
+
+        url = reverse("analytics:network")
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url, {"group_by": "city", "country": "Россия"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json(),
+            [
+                {"city": "Москва", "participants": 1, "debt": "0.00"},
+                {"city": "Тверь", "participants": 2, "debt": "120.75"},
+            ],
+        )
+        self.assertFalse(
+            [
+                query
+                for query in captured.captured_queries
+                if "participants_participant" in query["sql"]
+            ]
+        )
+
+        response = self.client.get(url, {"level": "2"})
+        self.assertEqual(
+            response.json(),
+            [
+                {
+                    "country": "Россия",
+                    "city": "Тверь",
+                    "level": "2",
+                    "unit_name": Participant.ENTREPRENEUR,
+                    "participants": 1,
+                    "debt": "20.25",
+                }
+            ],
+        )
+
+        response = self.client.get(url, {"group_by": "city,supplier"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(PARTICIPANT_MAX_LEVEL=10)
+    def test_network_levels_order(self):
+        """Уровни группируются и сортируются как числа: 10 после 2"""
+
+        supplier = self.entrepreneur
+        for number in range(8):
+            supplier = Participant.objects.create(
+                name=f"ИП {number}",
+                email=f"ip{number}@list.ru",
+                country="Россия",
+                city="Тверь",
+                street="New",
+                house="3",
+                unit_name=Participant.ENTREPRENEUR,
+                supplier=supplier,
+            )
+        self.assertEqual(supplier.level, 10)
+
+        response = self.client.get(
+            reverse("analytics:network"), {"group_by": "level"}
+        )
+        self.assertEqual(
+            [group["level"] for group in response.json()],
+            [str(level) for level in range(11)],
+        )
+        self.assertRollupsMatch()
+
+    def test_factories(self):
+        """Покупатели завода по звеньям на любой глубине"""
+
+        response = self.client.get(reverse("analytics:factories"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json()["results"],
+            [
+                {
+                    "id": self.factory.pk,
+                    "name": "ООО Мир",
+                    "country": "Россия",
+                    "city": "Москва",
+                    "customers": {
+                        Participant.ENTREPRENEUR: 1,
+                        Participant.RETAIL_NETWORK: 1,
+                    },
+                    "customers_debt": "120.75",
+                }
+            ],
+        )
+
+    def test_products(self):
+        """Количество продуктов у владельцев"""
+
+        response = self.client.get(reverse("analytics:products"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json()["results"],
+            [{"owner": self.factory.pk, "name": "ООО Мир", "products": 3}],
+        )
+
+    def test_not_employee(self):
+        """Сводки доступны только активным сотрудникам"""
+
+        self.user.employer = None
+        self.user.save()
+        response = self.client.get(reverse("analytics:network"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
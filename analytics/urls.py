@@ -0,0 +1,27 @@
+from django.urls import path
+
+from analytics.apps import AnalyticsConfig
+from analytics.views import (FactoryStatsAPIView, NetworkStatsAPIView,
+                             OwnerProductStatsAPIView)
+from participants.permissions import IsActiveEmployee
+
+app_name = AnalyticsConfig.name
+
+
+urlpatterns = [
+    path(
+        "network/",
+        NetworkStatsAPIView.as_view(permission_classes=(IsActiveEmployee,)),
+        name="network",
+    ),
+    path(
+        "factories/",
+        FactoryStatsAPIView.as_view(permission_classes=(IsActiveEmployee,)),
+        name="factories",
+    ),
+    path(
+        "products/",
+        OwnerProductStatsAPIView.as_view(permission_classes=(IsActiveEmployee,)),
+        name="products",
+    ),
+]
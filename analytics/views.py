@@ -0,0 +1,82 @@
+from django.db.models import Prefetch, Sum
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import exceptions
+from rest_framework.generics import ListAPIView
+
+from analytics.models import FactoryStats, NetworkStats, OwnerProductStats
+from analytics.serializers import (FactoryStatsSerializer,
+                                   NetworkStatsSerializer,
+                                   OwnerProductStatsSerializer)
+from participants.models import Participant
+from participants.paginators import ParticipantPaginator
+
+# Поля группировки сводки сети
+DIMENSIONS = ("country", "city", "level", "unit_name")
+
+
+class NetworkStatsAPIView(ListAPIView):
+    """
+    Количество и задолженность участников по группам ?group_by=
+    (через запятую из country, city, level, unit_name; по умолчанию -
+    все четыре). Считается по сводке сети без чтения таблицы участников
+    """
+
+    queryset = NetworkStats.objects.filter(participants__gt=0)
+    serializer_class = NetworkStatsSerializer
+    filter_backends = (DjangoFilterBackend,)
+    filterset_fields = DIMENSIONS
+
+    def get_group_by(self):
+        value = self.request.query_params.get("group_by")
+        if value is None:
+            return DIMENSIONS
+        group_by = [name.strip() for name in value.split(",") if name.strip()]
+        if not group_by or set(group_by) - set(DIMENSIONS):
+            raise exceptions.ValidationError(
+                {"group_by": [f"Допустимые поля: {', '.join(DIMENSIONS)}."]}
+            )
+        return tuple(dict.fromkeys(group_by))
+
+    def get_queryset(self):
+        group_by = self.get_group_by()
+        return (
+            super()
+            .get_queryset()
+            .values(*group_by)
+            .annotate(
+                participants_total=Sum("participants"), debt_total=Sum("debt")
+            )
+            .order_by(*group_by)
+        )
+
+
+class FactoryStatsAPIView(ListAPIView):
+    """
+    Количество покупателей каждого звена на любой глубине и их
+    задолженность у каждого завода (из сводки заводов)
+    """
+
+    queryset = (
+        Participant.objects.filter(level=0, unit_name=Participant.FACTORY)
+        .annotate(customers_debt=Sum("factory_stats__debt", default=0))
+        .prefetch_related(
+            Prefetch(
+                "factory_stats",
+                queryset=FactoryStats.objects.filter(customers__gt=0).order_by(
+                    "unit_name"
+                ),
+            )
+        )
+    )
+    serializer_class = FactoryStatsSerializer
+    pagination_class = ParticipantPaginator
+
+
+class OwnerProductStatsAPIView(ListAPIView):
+    """Количество продуктов у каждого владельца (из сводки продуктов)"""
+
+    queryset = OwnerProductStats.objects.filter(products__gt=0).select_related(
+        "owner"
+    )
+    serializer_class = OwnerProductStatsSerializer
+    pagination_class = ParticipantPaginator
@@ -0,0 +1,284 @@
+"""
+Запросы замеров API: по одной функции на каждый маршрут participants,
+products, users и analytics
+
+Функция получает данные замера (context) и номер запроса и возвращает
+метод, адрес и тело запроса. Объекты, которые запрос изменяет или
+удаляет, создаются в функции - вне замера времени.
+"""
+
+from django.urls import reverse
+
+from participants.models import Participant
+from products.models import Product
+from users.models import User
+
+ENDPOINTS = {}
+
+
+def endpoint(name):
+    def register(function):
+        ENDPOINTS[name] = function
+        return function
+
+    return register
+
+
+def new_participant(context, number):
+    # Администратор удаляет только участника со своим адресом
+    return Participant.objects.create(
+        name=f"Замер {number}",
+        email=context.email,
+        country="Россия",
+        city="Москва",
+        street="Новая",
+        house="1",
+        unit_name=Participant.FACTORY,
+    )
+
+
+def new_products(context, number, count):
+    return Product.objects.bulk_create(
+        [
+            Product(
+                product_name=f"Замер {number}",
+                model="bench",
+                release_date="2024-01-01",
+                owner_id=context.factory,
+            )
+            for _ in range(count)
+        ]
+    )
+
+
+def product_data(number):
+    return {
+        "product_name": f"Новинка {number}",
+        "model": f"bench-{number}",
+        "release_date": "2024-01-01",
+    }
+
+
+def user_data(number, prefix):
+    return {
+        "email": f"bench-{prefix}-{number}@example.invalid",
+        "password": "bench-password",
+        "last_name": "Замеров",
+        "first_name": "Сотрудник",
+    }
+
+
+@endpoint("participants:create")
+def participant_create(context, number):
+    return (
+        "post",
+        reverse("participants:create"),
+        {
+            "name": f"ИП {number}",
+            "email": f"bench-create-{number}@example.invalid",
+            "country": "Россия",
+            "city": "Тверь",
+            "street": "Новая",
+            "house": "1",
+            "unit_name": Participant.ENTREPRENEUR,
+            "supplier": context.retail,
+        },
+    )
+
+
+@endpoint("participants:list")
+def participant_list(context, number):
+    return "get", reverse("participants:list"), None
+
+
+@endpoint("participants:export")
+def participant_export(context, number):
+    return "get", reverse("participants:export", args=("csv",)), None
+
+
+@endpoint("participants:view")
+def participant_view(context, number):
+    return "get", reverse("participants:view", args=(context.factory,)), None
+
+
+@endpoint("participants:downstream")
+def participant_downstream(context, number):
+    return "get", reverse("participants:downstream", args=(context.factory,)), None
+
+
+@endpoint("participants:upstream")
+def participant_upstream(context, number):
+    return "get", reverse("participants:upstream", args=(context.entrepreneur,)), None
+
+
+@endpoint("participants:async_list")
+def participant_async_list(context, number):
+    return "get", reverse("participants:async_list"), None
+
+
+@endpoint("participants:async_view")
+def participant_async_view(context, number):
+    return "get", reverse("participants:async_view", args=(context.factory,)), None
+
+
+@endpoint("participants:async_downstream")
+def participant_async_downstream(context, number):
+    url = reverse("participants:async_downstream", args=(context.factory,))
+    return "get", url, None
+
+
+@endpoint("participants:async_upstream")
+def participant_async_upstream(context, number):
+    url = reverse("participants:async_upstream", args=(context.entrepreneur,))
+    return "get", url, None
+
+
+@endpoint("participants:receivables")
+def participant_receivables(context, number):
+    return "get", reverse("participants:receivables"), None
+
+
+@endpoint("participants:receivable")
+def participant_receivable(context, number):
+    return "get", reverse("participants:receivable", args=(context.factory,)), None
+
+
+@endpoint("participants:update")
+def participant_update(context, number):
+    url = reverse("participants:update", args=(context.factory,))
+    return "patch", url, {"city": f"Город {number}"}
+
+
+@endpoint("participants:delete")
+def participant_delete(context, number):
+    participant = new_participant(context, number)
+    return "delete", reverse("participants:delete", args=(participant.pk,)), None
+
+
+@endpoint("products:create")
+def product_create(context, number):
+    return "post", reverse("products:create"), product_data(number)
+
+
+@endpoint("products:list")
+def product_list(context, number):
+    return "get", reverse("products:list"), None
+
+
+@endpoint("products:async_list")
+def product_async_list(context, number):
+    return "get", reverse("products:async_list"), None
+
+
+@endpoint("products:async_view")
+def product_async_view(context, number):
+    return "get", reverse("products:async_view", args=(context.product,)), None
+
+
+@endpoint("products:search")
+def product_search(context, number):
+    return "get", reverse("products:search"), {"q": f"Продукт {number % 1000}"}
+
+
+@endpoint("products:export")
+def product_export(context, number):
+    return "get", reverse("products:export", args=("csv",)), None
+
+
+@endpoint("products:view")
+def product_view(context, number):
+    return "get", reverse("products:view", args=(context.product,)), None
+
+
+@endpoint("products:update")
+def product_update(context, number):
+    url = reverse("products:update", args=(context.product,))
+    return "patch", url, {"model": f"bench-{number}"}
+
+
+@endpoint("products:delete")
+def product_delete(context, number):
+    (product,) = new_products(context, number, 1)
+    return "delete", reverse("products:delete", args=(product.pk,)), None
+
+
+@endpoint("products:bulk_create")
+def product_bulk_create(context, number):
+    data = [
+        product_data(number * context.batch + item) for item in range(context.batch)
+    ]
+    return "post", reverse("products:bulk_create"), data
+
+
+@endpoint("products:bulk_update")
+def product_bulk_update(context, number):
+    data = [
+        {"id": pk, **product_data(number)} for pk in context.products[: context.batch]
+    ]
+    return "patch", reverse("products:bulk_update"), data
+
+
+@endpoint("products:bulk_delete")
+def product_bulk_delete(context, number):
+    ids = [product.pk for product in new_products(context, number, context.batch)]
+    return "delete", reverse("products:bulk_delete"), {"ids": ids}
+
+
+@endpoint("users:login")
+def user_login(context, number):
+    data = {"email": context.email, "password": context.password}
+    return "post", reverse("users:login"), data
+
+
+@endpoint("users:token_refresh")
+def user_token_refresh(context, number):
+    return "post", reverse("users:token_refresh"), {"refresh": context.refresh}
+
+
+@endpoint("users:create")
+def user_create(context, number):
+    return "post", reverse("users:create"), user_data(number, "create")
+
+
+@endpoint("users:bulk_create")
+def user_bulk_create(context, number):
+    data = [
+        user_data(number * context.batch + item, "bulk")
+        for item in range(context.batch)
+    ]
+    return "post", reverse("users:bulk_create"), data
+
+
+@endpoint("users:list")
+def user_list(context, number):
+    return "get", reverse("users:list"), None
+
+
+@endpoint("users:update")
+def user_update(context, number):
+    url = reverse("users:update", args=(context.free_user,))
+    return "patch", url, {"employer": None}
+
+
+@endpoint("users:delete")
+def user_delete(context, number):
+    user = User.objects.create(
+        email=f"bench-delete-{number}@example.invalid",
+        employer_id=context.factory,
+    )
+    return "delete", reverse("users:delete", args=(user.pk,)), None
+
+
+@endpoint("analytics:network")
+def analytics_network(context, number):
+    return "get", reverse("analytics:network"), None
+
+
+@endpoint("analytics:factories")
+def analytics_factories(context, number):
+    return "get", reverse("analytics:factories"), None
+
+
+@endpoint("analytics:products")
+def analytics_products(context, number):
+    return "get", reverse("analytics:products"), None
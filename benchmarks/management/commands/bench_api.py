@@ -0,0 +1,309 @@
+import json
+import statistics
+import subprocess
+import time
+from types import SimpleNamespace
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from benchmarks.api import ENDPOINTS
+from benchmarks.seed import (analyze, seed_network, seed_products,
+                             seed_receivables, seed_users)
+from benchmarks.stats import percentile
+from products.models import Product
+from users.authentication import UserRefreshToken
+from users.models import User
+
+BENCH_PASSWORD = "bench-password"
+
+
+def get_commit():
+    """Текущий коммит git или None (например, в контейнере без git)"""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеры всех маршрутов API (participants, products, users, "
+        "analytics) на тестовой сети: задержки p50/p95/p99, пропускная "
+        "способность и число запросов к базе; результаты сохраняются в JSON "
+        "для сравнения"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--factories", type=int, default=10, help="количество заводов"
+        )
+        parser.add_argument(
+            "--fan-out",
+            type=int,
+            default=10,
+            help="количество покупателей у каждого поставщика",
+        )
+        parser.add_argument(
+            "--products",
+            type=int,
+            default=10,
+            help="количество продуктов у каждого участника",
+        )
+        parser.add_argument(
+            "--employees",
+            type=int,
+            default=2,
+            help="количество сотрудников у каждого участника",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=20,
+            help="количество запросов к каждому маршруту",
+        )
+        parser.add_argument(
+            "--batch",
+            type=int,
+            default=100,
+            help="размер списка в пакетных запросах",
+        )
+        parser.add_argument(
+            "--endpoint",
+            action="append",
+            dest="endpoints",
+            choices=sorted(ENDPOINTS),
+            help="маршрут, можно несколько (по умолчанию все)",
+        )
+        parser.add_argument(
+            "--output", default="bench_api.json", help="файл результатов (JSON)"
+        )
+        parser.add_argument(
+            "--compare", help="файл результатов предыдущего замера для сравнения"
+        )
+        parser.add_argument("--label", help="метка замера (по умолчанию - коммит git)")
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1:
+            raise CommandError("Нужен хотя бы один запрос к маршруту.")
+        previous = None
+        if options["compare"]:
+            try:
+                with open(options["compare"], encoding="utf-8") as file:
+                    previous = json.load(file)
+            except (OSError, ValueError) as error:
+                raise CommandError(
+                    f"Не удалось прочитать {options['compare']}: {error}"
+                )
+
+        # Данные замера и все изменения запросов откатываются
+        with transaction.atomic():
+            self.stdout.write("Заполнение тестовыми данными...")
+            dataset, context = self.seed(options)
+            results = [
+                self.measure(name, context, options["requests"])
+                for name in options["endpoints"] or ENDPOINTS
+            ]
+            transaction.set_rollback(True)
+
+        commit = get_commit()
+        report = {
+            "label": options["label"] or commit,
+            "commit": commit,
+            "created_at": timezone.now().isoformat(),
+            "dataset": dataset,
+            "results": results,
+        }
+        with open(options["output"], "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+        for result in results:
+            self.report(result)
+        if previous is not None:
+            self.compare(previous, report)
+        self.stdout.write(f"Результаты сохранены в {options['output']}")
+
+    def seed(self, options):
+        bounds = seed_network(options["factories"], options["fan_out"])
+        factories, retail, entrepreneurs = (
+            bounds["завод"],
+            bounds["розничная сеть"],
+            bounds["ИП"],
+        )
+        participants = (factories[0], entrepreneurs[1])
+        span = participants[1] - participants[0] + 1
+        password = make_password(BENCH_PASSWORD)
+        seed_products(options["products"] * span, participants)
+        seed_users(options["employees"] * span, participants, password)
+        seed_receivables()
+        analyze()
+
+        user = User.objects.create(
+            email="bench@example.invalid",
+            password=password,
+            is_staff=True,
+            employer_id=factories[0],
+        )
+        products = list(
+            Product.objects.filter(owner_id=factories[0])
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        context = SimpleNamespace(
+            factory=factories[0],
+            retail=retail[0],
+            entrepreneur=entrepreneurs[0],
+            products=products,
+            product=products[0] if products else None,
+            free_user=User.objects.create(email="bench-free@example.invalid").pk,
+            user=user,
+            email=user.email,
+            password=BENCH_PASSWORD,
+            refresh=str(UserRefreshToken.for_user(user)),
+            batch=options["batch"],
+        )
+        dataset = {
+            "participants": span,
+            "factories": options["factories"],
+            "fan_out": options["fan_out"],
+            "products": options["products"] * span,
+            "employees": options["employees"] * span,
+        }
+        return dataset, context
+
+    def measure(self, name, context, count):
+        """
+        count запросов к маршруту name, каждый в своей точке сохранения и
+        с пустым кешем; GET-запрос затем повторяется с заполненным кешем
+        (warm_*), время повторов в пропускную способность не входит
+        """
+        token = UserRefreshToken.for_user(context.user).access_token
+        client = Client(headers={"authorization": f"Bearer {token}"})
+        latencies, queries, errors = [], [], []
+        warm_latencies, warm_queries = [], []
+        warm_total = 0
+        started = time.perf_counter()
+        for number in range(count):
+            method, url, data = ENDPOINTS[name](context, number)
+            cache.clear()
+            try:
+                response, elapsed, captured = self.timed(client, method, url, data)
+                if method == "get" and response.status_code < 400:
+                    _, warm_elapsed, warm_captured = self.timed(
+                        client, method, url, data
+                    )
+                    warm_total += warm_elapsed
+                    warm_latencies.append(warm_elapsed * 1000)
+                    warm_queries.append(warm_captured)
+            except Exception as error:
+                # Ошибка сервера не прерывает замеры остальных маршрутов
+                errors.append(type(error).__name__)
+                continue
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+                continue
+            latencies.append(elapsed * 1000)
+            queries.append(captured)
+        total = time.perf_counter() - started - warm_total
+
+        latencies.sort()
+        warm_latencies.sort()
+        result = {
+            "endpoint": name,
+            "method": method.upper(),
+            "requests": count,
+            "errors": len(errors),
+            "error_codes": sorted(set(map(str, errors))),
+        }
+        if latencies:
+            result.update(
+                {
+                    "mean_ms": round(statistics.mean(latencies), 3),
+                    "p50_ms": round(percentile(latencies, 50), 3),
+                    "p95_ms": round(percentile(latencies, 95), 3),
+                    "p99_ms": round(percentile(latencies, 99), 3),
+                    "throughput_rps": round(len(latencies) / total, 1),
+                    "queries_median": statistics.median(queries),
+                    "queries_max": max(queries),
+                }
+            )
+        if warm_latencies:
+            result.update(
+                {
+                    "warm_p50_ms": round(percentile(warm_latencies, 50), 3),
+                    "warm_p95_ms": round(percentile(warm_latencies, 95), 3),
+                    "warm_p99_ms": round(percentile(warm_latencies, 99), 3),
+                    "warm_queries_max": max(warm_queries),
+                }
+            )
+        return result
+
+    def timed(self, client, method, url, data):
+        """Ответ, время и число запросов к базе (в точке сохранения)"""
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = self.request(client, method, url, data)
+                elapsed = time.perf_counter() - started
+        return response, elapsed, len(captured.captured_queries)
+
+    def request(self, client, method, url, data):
+        if method == "get":
+            response = client.get(url, data)
+        else:
+            response = getattr(client, method)(
+                url, data, content_type="application/json"
+            )
+        if response.streaming:
+            b"".join(response.streaming_content)
+        return response
+
+    def report(self, result):
+        line = f"{result['method']:6} {result['endpoint']:32}"
+        if "p50_ms" in result:
+            line += (
+                f" p50 {result['p50_ms']:9.2f} мс  p95 {result['p95_ms']:9.2f} мс"
+                f"  p99 {result['p99_ms']:9.2f} мс  {result['throughput_rps']:8.1f}"
+                f" запр/с  запросов к базе: {result['queries_max']}"
+            )
+        if "warm_p50_ms" in result:
+            line += (
+                f"  с кешем: p50 {result['warm_p50_ms']:9.2f} мс"
+                f"  p95 {result['warm_p95_ms']:9.2f} мс"
+                f"  запросов к базе: {result['warm_queries_max']}"
+            )
+        if result["errors"]:
+            line = self.style.ERROR(
+                f"{line}  ошибок: {result['errors']} {result['error_codes']}"
+            )
+        self.stdout.write(line)
+
+    def compare(self, previous, report):
+        """Изменение p95 и числа запросов к базе относительно previous"""
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(
+                f"== Сравнение с {previous.get('label')} ({previous.get('created_at')})"
+            )
+        )
+        before = {result["endpoint"]: result for result in previous["results"]}
+        for result in report["results"]:
+            old = before.get(result["endpoint"])
+            if not old or "p95_ms" not in old or "p95_ms" not in result:
+                continue
+            change = (result["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100
+            line = (
+                f"{result['endpoint']:32} p95 {old['p95_ms']:.2f} -> "
+                f"{result['p95_ms']:.2f} мс ({change:+.0f}%), запросов к базе "
+                f"{old['queries_max']} -> {result['queries_max']}"
+            )
+            if result["queries_max"] > old["queries_max"]:
+                line = self.style.WARNING(line)
+            self.stdout.write(line)
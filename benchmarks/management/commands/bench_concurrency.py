@@ -0,0 +1,130 @@
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from django.core.management import BaseCommand, CommandError
+
+from benchmarks.stats import percentile
+from users.authentication import UserRefreshToken
+from users.models import User
+
+# Синхронный (WSGI) и асинхронный (ASGI) список участников
+PATHS = ["/participants/", "/participants/async/"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагрузочный тест: одновременные запросы к запущенному серверу, "
+        "пропускная способность и задержки (p50, p95, p99)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "url",
+            nargs="+",
+            help="адрес сервера (http://host:port), например WSGI и ASGI",
+        )
+        parser.add_argument(
+            "--email", required=True, help="email сотрудника для JWT-токена"
+        )
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help=f"путь запроса, можно несколько (по умолчанию {PATHS})",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=50,
+            help="количество одновременных клиентов",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=1000,
+            help="количество запросов к каждому пути",
+        )
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(email=options["email"]).first()
+        if user is None:
+            raise CommandError("Нет такого пользователя.")
+        token = str(UserRefreshToken.for_user(user).access_token)
+
+        for url in options["url"]:
+            for path in options["paths"] or PATHS:
+                latencies, errors, elapsed = asyncio.run(
+                    self.run(
+                        url + path,
+                        token,
+                        options["concurrency"],
+                        options["requests"],
+                    )
+                )
+                self.report(url + path, latencies, errors, elapsed)
+
+    async def run(self, url, token, concurrency, count):
+        """
+        concurrency клиентов по очереди разбирают count запросов;
+        задержки успешных запросов в мс, число ошибок и общее время
+        """
+        queue = asyncio.Queue()
+        for _ in range(count):
+            queue.put_nowait(None)
+        latencies, errors = [], [0]
+
+        async def client():
+            while not queue.empty():
+                queue.get_nowait()
+                started = time.perf_counter()
+                try:
+                    code = await self.fetch(url, token)
+                except OSError:
+                    code = None
+                if code == 200:
+                    latencies.append((time.perf_counter() - started) * 1000)
+                else:
+                    errors[0] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        return sorted(latencies), errors[0], time.perf_counter() - started
+
+    async def fetch(self, url, token):
+        """GET-запрос HTTP/1.1 (отдельное соединение), код ответа"""
+        parts = urlsplit(url)
+        reader, writer = await asyncio.open_connection(
+            parts.hostname, parts.port or 80
+        )
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        writer.write(
+            f"GET {path} HTTP/1.1\r\n"
+            f"Host: {parts.netloc}\r\n"
+            f"Authorization: Bearer {token}\r\n"
+            "Connection: close\r\n\r\n".encode()
+        )
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+        writer.close()
+        await writer.wait_closed()
+        try:
+            return int(status_line.split()[1])
+        except (IndexError, ValueError):
+            return None
+
+    def report(self, url, latencies, errors, elapsed):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"== {url}"))
+        self.stdout.write(
+            f"запросов: {len(latencies)}, ошибок: {errors}, "
+            f"время: {elapsed:.2f} с, "
+            f"запросов в секунду: {len(latencies) / elapsed:.1f}"
+        )
+        if latencies:
+            self.stdout.write(
+                ", ".join(
+                    f"p{percent}: {percentile(latencies, percent):.1f} мс"
+                    for percent in (50, 95, 99)
+                )
+            )
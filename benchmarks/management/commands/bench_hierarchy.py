@@ -0,0 +1,150 @@
+import random
+import time
+from collections import Counter
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from benchmarks.seed import analyze, seed_levels
+from benchmarks.stats import percentile
+from participants.models import Participant
+from participants.validators import check_supplier
+
+
+def walk_suppliers(pk):
+    """Цепочка поставщиков обходом по supplier_id (запрос на уровень)"""
+    chain = []
+    while pk is not None:
+        chain.append(pk)
+        pk = Participant.objects.filter(pk=pk).values_list("supplier_id", flat=True)[0]
+    return chain
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеры проверки смены поставщика (циклы, наибольший уровень) и "
+        "переноса участника с покупателями на сети произвольной глубины"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--participants",
+            type=int,
+            default=100_000,
+            help="количество тестовых участников",
+        )
+        parser.add_argument(
+            "--depth",
+            type=int,
+            default=10,
+            help="глубина сети (PARTICIPANT_MAX_LEVEL на время замера)",
+        )
+        parser.add_argument(
+            "--checks", type=int, default=1000, help="количество проверок"
+        )
+        parser.add_argument(
+            "--moves", type=int, default=100, help="количество переносов"
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="начальное значение выбора"
+        )
+
+    def handle(self, *args, **options):
+        """
+        Данные заполняются в транзакции, которая в конце откатывается -
+        база остается без изменений
+        """
+        if options["depth"] < 2:
+            raise CommandError("Глубина сети - не меньше 2.")
+        rng = random.Random(options["seed"])
+        with override_settings(PARTICIPANT_MAX_LEVEL=options["depth"]):
+            with transaction.atomic():
+                self.stdout.write("Заполнение тестовыми данными...")
+                bounds = seed_levels(options["participants"], options["depth"])
+                analyze()
+                cache.clear()
+                pairs = [self.pick(bounds, rng) for _ in range(options["checks"])]
+                accepted = self.measure_checks(pairs)
+                self.measure_walk(pairs)
+                self.measure_moves(accepted[: options["moves"]])
+                transaction.set_rollback(True)
+            cache.clear()
+
+    def pick(self, bounds, rng):
+        """
+        Участник с покупателями и новый поставщик: в четверти случаев -
+        покупатель участника (цикл), иначе - участник любого уровня
+        """
+        pk = rng.randint(*bounds[rng.randrange(1, len(bounds) - 1)])
+        if rng.random() < 0.25:
+            supplier_pk = (
+                Participant.objects.filter(supplier_id=pk)
+                .values_list("pk", flat=True)
+                .first()
+            )
+        else:
+            supplier_pk = rng.randint(*bounds[rng.randrange(len(bounds))])
+        return (
+            Participant.objects.get(pk=pk),
+            Participant.objects.get(pk=supplier_pk or pk),
+        )
+
+    def measure_checks(self, pairs):
+        """check_supplier (как при PUT/PATCH participants/update/<pk>/)"""
+        latencies, queries, outcomes, accepted = [], [], Counter(), []
+        for instance, supplier in pairs:
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                try:
+                    check_supplier(
+                        instance.email, instance.unit_name, supplier, instance
+                    )
+                except ValidationError as error:
+                    outcomes[error.messages[0]] += 1
+                else:
+                    outcomes["допустимо"] += 1
+                    accepted.append((instance, supplier))
+                latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured.captured_queries))
+        self.report("проверка поставщика", latencies, queries)
+        for outcome, count in outcomes.most_common():
+            self.stdout.write(f"    {count:6}  {outcome}")
+        return accepted
+
+    def measure_walk(self, pairs):
+        """Для сравнения: поиск цикла обходом цепочки запросами к базе"""
+        latencies, queries = [], []
+        for instance, supplier in pairs:
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                walk_suppliers(supplier.pk)
+                latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured.captured_queries))
+        self.report("цикл обходом цепочки", latencies, queries)
+
+    def measure_moves(self, pairs):
+        """Смена поставщика с переносом покупателей, каждая откатывается"""
+        latencies, queries = [], []
+        for instance, supplier in pairs:
+            with transaction.atomic():
+                instance.supplier = supplier
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    instance.save()
+                    latencies.append((time.perf_counter() - started) * 1000)
+                queries.append(len(captured.captured_queries))
+                transaction.set_rollback(True)
+        if latencies:
+            self.report("перенос участника", latencies, queries)
+
+    def report(self, name, latencies, queries):
+        latencies.sort()
+        self.stdout.write(
+            f"{name:24} p50 {percentile(latencies, 50):8.3f} мс"
+            f"  p95 {percentile(latencies, 95):8.3f} мс"
+            f"  p99 {percentile(latencies, 99):8.3f} мс"
+            f"  запросов к базе: {max(queries)}"
+        )
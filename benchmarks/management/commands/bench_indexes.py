@@ -0,0 +1,94 @@
+from django.core.management import BaseCommand
+from django.db import connection, transaction
+
+from benchmarks.seed import analyze, seed_participants, seed_products
+from participants.models import Participant
+from products.models import Product
+
+# Индексы фильтров (participants 0008, products 0004), без которых
+# снимаются планы "до"
+INDEXES = [
+    "participant_country_idx",
+    "participant_city_idx",
+    "participant_level_idx",
+    "product_owner_idx",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Планы запросов (EXPLAIN ANALYZE) фильтров API и Admin-панели "
+        "без индексов и с индексами на тестовых данных"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--participants",
+            type=int,
+            default=1_000_000,
+            help="количество тестовых участников",
+        )
+        parser.add_argument(
+            "--products",
+            type=int,
+            default=1_000_000,
+            help="количество тестовых продуктов",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Данные заполняются и индексы удаляются в транзакции, которая
+        в конце откатывается - база остается без изменений
+        """
+        with transaction.atomic():
+            self.stdout.write("Заполнение тестовыми данными...")
+            # Продукты выпускают заводы
+            owners = seed_participants(options["participants"])["завод"]
+            seed_products(options["products"], owners)
+            analyze()
+            queries = self.get_queries(owners[0])
+
+            after = {name: self.explain(queryset) for name, queryset in queries}
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    for index in INDEXES:
+                        cursor.execute(f"DROP INDEX {connection.ops.quote_name(index)}")
+                before = {name: self.explain(queryset) for name, queryset in queries}
+                transaction.set_rollback(True)
+
+            for name, _ in queries:
+                self.stdout.write(self.style.MIGRATE_HEADING(f"== {name}"))
+                self.stdout.write("-- без индексов:")
+                self.stdout.write(before[name])
+                self.stdout.write("-- с индексами:")
+                self.stdout.write(after[name])
+            transaction.set_rollback(True)
+
+    def get_queries(self, owner_id):
+        """Запросы списков и фильтров в том виде, в каком их строит ORM"""
+        participants = Participant.objects.order_by("-pk")
+        return [
+            (
+                "Список участников по стране (?country=), первая страница",
+                participants.filter(country="Казахстан").only(
+                    "id", "name", "email", "country", "level", "supplier"
+                )[:51],
+            ),
+            (
+                "Admin-панель: фильтр по городу",
+                participants.filter(city="Город 42")[:100],
+            ),
+            (
+                "Участники уровня 1 (розничные сети)",
+                participants.filter(level=1, unit_name="розничная сеть")[:51],
+            ),
+            (
+                "Продукты владельца (изменение/удаление, список своих)",
+                Product.objects.filter(owner_id=owner_id).values(
+                    "id", "product_name", "model", "release_date"
+                )[:51],
+            ),
+        ]
+
+    def explain(self, queryset):
+        return queryset.explain(analyze=True, buffers=True)
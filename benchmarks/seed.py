@@ -0,0 +1,213 @@
+"""
+Заполнение базы тестовыми данными для замеров (одним INSERT на звено сети)
+
+Сеть строится как на платформе: заводы (уровень 0), розничные сети
+у заводов (уровень 1) и ИП у розничных сетей (уровень 2), seed_levels -
+сеть произвольной глубины. Записи каждой таблицы распределяются по
+владельцам (поставщикам, работодателям) равномерно: запись n
+принадлежит владельцу first + n % span.
+"""
+
+from django.db import connection
+
+# Распределение неравномерное, как на платформе: большинство участников
+# из одной страны
+COUNTRIES = ["Россия"] * 15 + ["Беларусь", "Казахстан", "Армения", "Киргизия", "Другая"]
+
+INSERT_PARTICIPANTS = """
+WITH inserted AS (
+    INSERT INTO participants_participant (
+        name, email, country, city, street, house, created_at, updated_at,
+        unit_name, supplier_id, debt, level, tree_path
+    )
+    SELECT
+        %(unit_name)s || ' ' || n,
+        'bench-' || %(level)s || '-' || n || '@example.invalid',
+        (%(countries)s::varchar[])[1 + n %% %(country_count)s],
+        'Город ' || n %% 500,
+        'Улица ' || n %% 100,
+        (n %% 100)::varchar,
+        now(),
+        now(),
+        %(unit_name)s,
+        supplier.id,
+        (n %% 1000)::numeric,
+        %(level)s,
+        COALESCE(supplier.tree_path || supplier.id || '/', '/')
+    FROM generate_series(1, %(count)s) AS n
+    LEFT JOIN participants_participant AS supplier
+        ON supplier.id = %(first)s + n %% %(span)s
+    RETURNING id
+)
+SELECT min(id), max(id) FROM inserted
+"""
+
+INSERT_PRODUCTS = """
+INSERT INTO products_product (product_name, model, release_date, owner_id, updated_at)
+SELECT
+    'Продукт ' || n %% 1000,
+    'Модель ' || n,
+    DATE '2020-01-01' + n %% 1500,
+    %(first)s + n %% %(span)s,
+    now()
+FROM generate_series(1, %(count)s) AS n
+"""
+
+INSERT_USERS = """
+INSERT INTO users_user (
+    password, is_superuser, is_staff, is_active, date_joined, email,
+    last_name, first_name, employer_id, updated_at
+)
+SELECT
+    %(password)s,
+    false,
+    false,
+    true,
+    now(),
+    'bench-user-' || n || '@example.invalid',
+    'Сотрудник',
+    'Номер ' || n,
+    %(first)s + n %% %(span)s,
+    now()
+FROM generate_series(1, %(count)s) AS n
+"""
+
+INSERT_RECEIVABLES = """
+INSERT INTO participants_supplierreceivable (supplier_id, total)
+SELECT supplier_id, sum(debt)
+FROM participants_participant
+WHERE supplier_id IS NOT NULL
+GROUP BY supplier_id
+ON CONFLICT (supplier_id) DO UPDATE SET total = EXCLUDED.total
+"""
+
+
+def seed_participants(count):
+    """
+    Добавляет count участников (1% заводов, 30% розничных сетей,
+    остальные ИП), возвращает диапазоны id участников каждого звена
+    """
+    stages = [
+        ("завод", 0, max(count // 100, 1)),
+        ("розничная сеть", 1, max(count * 3 // 10, 1)),
+    ]
+    stages.append(("ИП", 2, max(count - stages[0][2] - stages[1][2], 1)))
+    return seed_stages(stages)
+
+
+def seed_network(factories, fan_out):
+    """
+    Добавляет сеть с заданным ветвлением: factories заводов, у каждого
+    завода fan_out розничных сетей, у каждой сети fan_out ИП; возвращает
+    диапазоны id участников каждого звена
+    """
+    return seed_stages(
+        [
+            ("завод", 0, factories),
+            ("розничная сеть", 1, factories * fan_out),
+            ("ИП", 2, factories * fan_out**2),
+        ]
+    )
+
+
+def seed_stages(stages):
+    """
+    Добавляет звенья сети [(звено, уровень, количество)], поставщики -
+    участники предыдущего звена
+    """
+    first, last = 0, 0
+    bounds = {}
+    with connection.cursor() as cursor:
+        for unit_name, level, stage_count in stages:
+            first, last = insert_stage(
+                cursor, unit_name, level, stage_count, (first, last)
+            )
+            bounds[unit_name] = (first, last)
+    return bounds
+
+
+def seed_levels(count, depth):
+    """
+    Добавляет сеть из count участников на уровнях от 0 до depth: 1% заводов,
+    остальные поровну по уровням, поставщики - участники предыдущего
+    уровня; возвращает диапазоны id участников каждого уровня
+    """
+    factories = max(count // 100, 1)
+    level_count = max((count - factories) // depth, 1)
+    first, last = 0, 0
+    bounds = []
+    with connection.cursor() as cursor:
+        for level in range(depth + 1):
+            if level == 0:
+                unit_name, stage_count = "завод", factories
+            elif level < depth:
+                unit_name, stage_count = "розничная сеть", level_count
+            else:
+                unit_name, stage_count = "ИП", level_count
+            first, last = insert_stage(
+                cursor, unit_name, level, stage_count, (first, last)
+            )
+            bounds.append((first, last))
+    return bounds
+
+
+def insert_stage(cursor, unit_name, level, count, suppliers):
+    """
+    Добавляет count участников звена, поставщики - участники из
+    диапазона suppliers; возвращает диапазон id добавленных
+    """
+    first, last = suppliers
+    cursor.execute(
+        INSERT_PARTICIPANTS,
+        {
+            "unit_name": unit_name,
+            "level": level,
+            "countries": COUNTRIES,
+            "country_count": len(COUNTRIES),
+            "count": count,
+            "first": first,
+            "span": last - first + 1,
+        },
+    )
+    return cursor.fetchone()
+
+
+def seed_products(count, owners):
+    """Добавляет count продуктов, владельцы - участники из диапазона owners"""
+    first, last = owners
+    with connection.cursor() as cursor:
+        cursor.execute(
+            INSERT_PRODUCTS, {"count": count, "first": first, "span": last - first + 1}
+        )
+
+
+def seed_users(count, employers, password):
+    """
+    Добавляет count сотрудников (с одним хешем пароля), работодатели -
+    участники из диапазона employers
+    """
+    first, last = employers
+    with connection.cursor() as cursor:
+        cursor.execute(
+            INSERT_USERS,
+            {
+                "count": count,
+                "first": first,
+                "span": last - first + 1,
+                "password": password,
+            },
+        )
+
+
+def seed_receivables():
+    """Сводки задолженности поставщиков по задолженности покупателей"""
+    with connection.cursor() as cursor:
+        cursor.execute(INSERT_RECEIVABLES)
+
+
+def analyze():
+    """Обновление статистики планировщика после заполнения"""
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE participants_participant")
+        cursor.execute("ANALYZE products_product")
+        cursor.execute("ANALYZE users_user")
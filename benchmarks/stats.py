@@ -0,0 +1,4 @@
+def percentile(values, percent):
+    """Значение, не больше которого percent% отсортированных values"""
+    index = max(round(len(values) * percent / 100) - 1, 0)
+    return values[index]
@@ -0,0 +1,158 @@
+import json
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+
+from analytics import urls as analytics_urls
+from benchmarks.api import ENDPOINTS
+from participants import urls as participants_urls
+from participants.models import Participant
+from products import urls as products_urls
+from products.models import Product
+from users import urls as users_urls
+from users.models import User
+
+
+class BenchIndexesTestCase(APITestCase):
+
+    def test_bench_indexes(self):
+        """Планы до и после для каждого запроса, данные откатываются"""
+
+        stdout = StringIO()
+        call_command("bench_indexes", participants=1000, products=1000, stdout=stdout)
+        output = stdout.getvalue()
+        self.assertEqual(output.count("-- без индексов:"), 4)
+        self.assertEqual(output.count("-- с индексами:"), 4)
+        self.assertIn("Execution Time", output)
+        self.assertFalse(Participant.objects.exists())
+        self.assertFalse(Product.objects.exists())
+
+
+class BenchHierarchyTestCase(APITestCase):
+
+    def test_bench_hierarchy(self):
+        """Проверки, обход цепочки и переносы на сети глубины 5"""
+
+        stdout = StringIO()
+        call_command(
+            "bench_hierarchy",
+            participants=2000,
+            depth=5,
+            checks=100,
+            moves=10,
+            stdout=stdout,
+        )
+        output = stdout.getvalue()
+        self.assertIn("проверка поставщика", output)
+        self.assertIn("Поставщик не может быть покупателем участника.", output)
+        self.assertIn("цикл обходом цепочки", output)
+        self.assertIn("перенос участника", output)
+        self.assertFalse(Participant.objects.exists())
+
+
+class BenchConcurrencyHandler(BaseHTTPRequestHandler):
+    """Отвечает 200 на запросы с токеном к /ok/, иначе 500"""
+
+    def do_GET(self):
+        authorized = self.headers["Authorization"].startswith("Bearer ")
+        self.send_response(200 if authorized and self.path == "/ok/" else 500)
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+class BenchConcurrencyTestCase(APITestCase):
+
+    def test_bench_concurrency(self):
+        """Каждый путь каждого сервера: число запросов, ошибок и задержки"""
+
+        User.objects.create(email="bench@list.ru")
+        server = ThreadingHTTPServer(("127.0.0.1", 0), BenchConcurrencyHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        stdout = StringIO()
+        call_command(
+            "bench_concurrency",
+            f"http://127.0.0.1:{server.server_port}",
+            email="bench@list.ru",
+            paths=["/ok/", "/error/"],
+            concurrency=5,
+            requests=20,
+            stdout=stdout,
+        )
+        output = stdout.getvalue()
+        self.assertIn("запросов: 20, ошибок: 0", output)
+        self.assertIn("запросов: 0, ошибок: 20", output)
+        self.assertEqual(output.count("p99:"), 1)
+
+
+class BenchApiTestCase(APITestCase):
+
+    def test_endpoints(self):
+        """
+        Замеры есть для каждого маршрута participants, products, users и
+        analytics
+        """
+
+        names = {
+            f"{module.app_name}:{pattern.name}"
+            for module in (participants_urls, products_urls, users_urls, analytics_urls)
+            for pattern in module.urlpatterns
+        }
+        self.assertEqual(set(ENDPOINTS), names)
+
+    def test_bench_api(self):
+        """Каждый маршрут без ошибок, результаты в JSON, данные откатываются"""
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        output = os.path.join(directory.name, "bench.json")
+        options = {
+            "factories": 1,
+            "fan_out": 2,
+            "products": 2,
+            "employees": 1,
+            "requests": 2,
+            "batch": 2,
+        }
+        call_command("bench_api", output=output, stdout=StringIO(), **options)
+        with open(output, encoding="utf-8") as file:
+            report = json.load(file)
+        self.assertEqual(report["dataset"]["participants"], 7)
+        self.assertEqual(
+            [result["endpoint"] for result in report["results"]], list(ENDPOINTS)
+        )
+        for result in report["results"]:
+            self.assertEqual(result["errors"], 0, result)
+            self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+            # GET-маршруты замеряются и с пустым, и с заполненным кешем
+            self.assertEqual("warm_p50_ms" in result, result["method"] == "GET")
+        results = {result["endpoint"]: result for result in report["results"]}
+        self.assertLess(
+            results["products:view"]["warm_queries_max"],
+            results["products:view"]["queries_max"],
+        )
+        self.assertFalse(Participant.objects.exists())
+        self.assertFalse(User.objects.exists())
+
+        stdout = StringIO()
+        call_command(
+            "bench_api",
+            endpoint=["products:list"],
+            output=os.path.join(directory.name, "next.json"),
+            compare=output,
+            label="следующий",
+            stdout=stdout,
+            **options,
+        )
+        self.assertIn(f"== Сравнение с {report['label']}", stdout.getvalue())
+        self.assertIn("products:list", stdout.getvalue())
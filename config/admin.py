@@ -0,0 +1,69 @@
+"""
+Админ-панель для больших таблиц
+
+Число записей списка - по оценке планировщика PostgreSQL вместо
+COUNT(*) по всей выборке, значения фильтров по полю - из кеша вместо
+SELECT DISTINCT по всей таблице при каждом открытии списка.
+"""
+
+import json
+
+from django.conf import settings
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimate_count(queryset):
+    """Оценка числа строк выборки по плану запроса (EXPLAIN, без выполнения)"""
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Точное число записей только для выборок меньше
+    ADMIN_EXACT_COUNT_LIMIT (по оценке), для больших - оценка: последняя
+    страница может оказаться ближе или дальше указанной
+    """
+
+    @cached_property
+    def count(self):
+        if not hasattr(self.object_list, "query"):
+            return super().count
+        estimate = estimate_count(self.object_list)
+        if estimate < settings.ADMIN_EXACT_COUNT_LIMIT:
+            return super().count
+        return estimate
+
+
+class CachedAllValuesFieldListFilter(admin.AllValuesFieldListFilter):
+    """
+    Фильтр по значениям поля, список значений хранится в кеше
+    ADMIN_FILTER_CACHE_TIMEOUT секунд (новое значение появляется
+    в фильтре не сразу)
+    """
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        key = f"{model._meta.label_lower}:admin_filter:{field_path}"
+        choices = cache.get(key)
+        if choices is None:
+            choices = list(self.lookup_choices)
+            cache.set(key, choices, settings.ADMIN_FILTER_CACHE_TIMEOUT)
+        self.lookup_choices = choices
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Список без полного COUNT(*) и без подсчета записей по фильтрам"""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
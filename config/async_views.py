@@ -0,0 +1,97 @@
+"""
+Асинхронные представления только для чтения (ASGI)
+
+Запросы к базе выполняются асинхронным ORM (aget, aiterator), поэтому
+один процесс сервера обслуживает много одновременных клиентов, пока
+ответы медленно уходят по сети. Аутентификация - те же JWT-токены,
+права доступа - те же классы DRF (передаются в as_view).
+"""
+
+from django.http import JsonResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.utils.urls import replace_query_param
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from users.authentication import aget_user
+
+
+class AsyncAPIView(View):
+    permission_classes = ()
+    serializer_class = None
+    http_method_names = ["get", "options"]
+    page_size = 50
+    max_page_size = 500
+
+    async def authenticate(self, request):
+        """Пользователь по JWT-токену из заголовка Authorization или None"""
+        authentication = JWTAuthentication()
+        header = authentication.get_header(request)
+        if header is None:
+            return None
+        raw_token = authentication.get_raw_token(header)
+        if raw_token is None:
+            return None
+        token = authentication.get_validated_token(raw_token)
+        user = await aget_user(token[api_settings.USER_ID_CLAIM])
+        if user is None or not user.is_active:
+            raise exceptions.AuthenticationFailed()
+        return user
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            request.user = await self.authenticate(request)
+            if request.user is None:
+                raise exceptions.NotAuthenticated()
+            for permission in self.permission_classes:
+                if not permission().has_permission(request, self):
+                    raise exceptions.PermissionDenied()
+            data = await self.get_data(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            if not isinstance(exc.detail, dict):
+                exc.detail = {"detail": exc.detail}
+            return JsonResponse(exc.detail, status=exc.status_code)
+        return JsonResponse(data, json_dumps_params={"ensure_ascii": False})
+
+    async def get_data(self, request, *args, **kwargs):
+        raise NotImplementedError
+
+    async def get_object(self, queryset, **lookup):
+        try:
+            instance = await queryset.aget(**lookup)
+        except queryset.model.DoesNotExist:
+            raise exceptions.NotFound()
+        return self.serializer_class(instance).data
+
+    async def get_list(self, queryset):
+        """Вся выборка без разбиения на страницы (короткие списки)"""
+        items = [item async for item in queryset.aiterator()]
+        return {"results": self.serializer_class(items, many=True).data}
+
+    async def get_page(self, request, queryset):
+        """
+        Страница по убыванию id (?before=<id>&page_size=) и ссылка на
+        следующую страницу
+        """
+        try:
+            page_size = int(request.GET.get("page_size", self.page_size))
+            if request.GET.get("before"):
+                queryset = queryset.filter(pk__lt=int(request.GET["before"]))
+        except ValueError:
+            raise exceptions.ValidationError("Некорректный параметр страницы.")
+        page_size = min(max(page_size, 1), self.max_page_size)
+        items = [
+            item
+            async for item in queryset.order_by("-pk")[: page_size + 1].aiterator()
+        ]
+        next_url = None
+        if len(items) > page_size:
+            items = items[:page_size]
+            next_url = replace_query_param(
+                request.build_absolute_uri(), "before", items[-1].pk
+            )
+        return {
+            "next": next_url,
+            "results": self.serializer_class(items, many=True).data,
+        }
@@ -0,0 +1,136 @@
+"""
+Кеширование ответов API (список и просмотр объекта)
+
+Версии таблиц и объектов хранятся в общем кеше (при нескольких процессах
+сервера - redis) и меняются после фиксации транзакции, изменившей записи:
+запрос, выполненный до нее, не сохранит в кеше прежние данные под новой
+версией. Ответы списков хранятся под версией таблицы, ответы просмотра -
+под версией объекта; из версий же строится ETag (config.conditional),
+поэтому повторный запрос не обращается к базе.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.mixins import RetrieveModelMixin
+from rest_framework.response import Response
+
+
+def get_version(key, timeout=None):
+    """Текущая версия по ключу (время в наносекундах; при отсутствии - новая)"""
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(key, version, timeout):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_versions(keys, timeout=None):
+    """
+    Новые версии по ключам: не меньше чем на секунду больше прежних, чтобы
+    изменился и Last-Modified (с точностью до секунды)
+    """
+    now, versions = time.time_ns(), cache.get_many(keys)
+    cache.set_many(
+        {key: max(now, versions.get(key, 0) + 10**9) for key in keys}, timeout
+    )
+
+
+def get_list_version(model):
+    """Текущая версия списков таблицы"""
+    return get_version(f"{model._meta.label_lower}:version")
+
+
+def get_object_version(model, pk):
+    """
+    Текущая версия объекта; хранится RESPONSE_CACHE_TIMEOUT секунд, как и
+    ответы просмотра (новая версия после истечения только меняет ETag)
+    """
+    return get_version(
+        f"{model._meta.label_lower}:version:{pk}", settings.RESPONSE_CACHE_TIMEOUT
+    )
+
+
+def invalidate_list(model):
+    """Сброс всех закешированных списков таблицы (после фиксации транзакции)"""
+    keys = [f"{model._meta.label_lower}:version"]
+    transaction.on_commit(lambda: bump_versions(keys))
+
+
+def invalidate_objects(model, pks):
+    """
+    Сброс закешированных объектов и списков таблицы (после фиксации
+    транзакции)
+    """
+    keys = [f"{model._meta.label_lower}:version:{pk}" for pk in pks]
+    if keys:
+        transaction.on_commit(
+            lambda: bump_versions(keys, settings.RESPONSE_CACHE_TIMEOUT)
+        )
+    invalidate_list(model)
+
+
+class VersionedMixin:
+    """
+    Ответ представления зависит от версий в кеше: у просмотра - версии
+    объекта, у списка - версии таблицы, в развернутом представлении -
+    также версий таблиц связанных объектов
+    """
+
+    def get_version_models(self):
+        """Таблицы, от изменения которых зависит ответ"""
+        return (self.queryset.model,)
+
+    def get_versions(self):
+        """Версии ответа (время изменения в наносекундах), одни на запрос"""
+        if getattr(self, "versions", None) is None:
+            model, *related = self.get_version_models()
+            if isinstance(self, RetrieveModelMixin):
+                lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+                version = get_object_version(model, self.kwargs[lookup_url_kwarg])
+            else:
+                version = get_list_version(model)
+            self.versions = [version, *map(get_list_version, related)]
+        return self.versions
+
+
+class CachedResponseMixin(VersionedMixin):
+    """
+    Кеширование ответов GET под версиями из кеша: повторный запрос не
+    обращается к базе. Права доступа проверяются до обращения к кешу;
+    если ответ зависит от работодателя пользователя (cache_per_employer),
+    он кешируется отдельно для каждого работодателя.
+    """
+
+    cache_per_employer = False
+
+    def get_cache_key(self, request):
+        """Ключ ответа: версии, адрес запроса и работодатель"""
+        versions = ":".join(map(str, self.get_versions()))
+        variant = f"{versions}:{request.get_full_path()}"
+        if self.cache_per_employer:
+            variant = f"{request.user.employer_id}:{variant}"
+        digest = hashlib.md5(variant.encode()).hexdigest()
+        return f"{self.queryset.model._meta.label_lower}:response:{digest}"
+
+    def list(self, request, *args, **kwargs):
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = super().list(request, *args, **kwargs)
+        cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = super().retrieve(request, *args, **kwargs)
+        cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        return response
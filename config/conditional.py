@@ -0,0 +1,39 @@
+"""
+Условные GET-запросы (ETag / Last-Modified)
+
+Метка версии ответа - версии из общего кеша (config.cache): у просмотра -
+версия объекта, у списка - версия таблицы, в развернутом представлении -
+также версии таблиц связанных объектов. Версии меняются после фиксации
+транзакции, изменившей записи, поэтому метка вычисляется без запроса к
+базе. Если метка не изменилась, возвращается 304 Not Modified без
+сериализации.
+"""
+
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from config.cache import VersionedMixin
+
+
+class ConditionalGetMixin(VersionedMixin):
+
+    def get(self, request, *args, **kwargs):
+        versions = self.get_versions()
+        variant = (
+            f"{':'.join(map(str, versions))}:"
+            f"{getattr(request.user, 'employer_id', None)}:{request.get_full_path()}"
+        )
+        etag = quote_etag(hashlib.md5(variant.encode()).hexdigest())
+        last_modified = max(versions) // 10**9
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        return response
@@ -0,0 +1,49 @@
+"""
+Развернутое представление (?expand=1)
+
+Связанные объекты (поставщик, владелец) выводятся вложенными и выбираются
+тем же запросом через select_related, поля ограничиваются через only(),
+поэтому число запросов не зависит от числа записей.
+"""
+
+
+class ExpandMixin:
+    expanded_serializer_class = None
+    # связь -> поля связанного объекта во вложенном представлении
+    expand_fields = {}
+
+    @property
+    def expanded(self):
+        request = getattr(self, "request", None)
+        return request is not None and request.query_params.get("expand") in (
+            "1",
+            "true",
+        )
+
+    def get_serializer_class(self):
+        if self.expanded:
+            return self.expanded_serializer_class
+        return super().get_serializer_class()
+
+    def get_version_models(self):
+        """Ответ меняется и при изменении вложенных объектов"""
+        models = super().get_version_models()
+        if self.expanded:
+            model = self.queryset.model
+            models += tuple(
+                model._meta.get_field(relation).related_model
+                for relation in self.expand_fields
+            )
+        return models
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = list(self.serializer_class.Meta.fields)
+        if self.expanded:
+            queryset = queryset.select_related(*self.expand_fields)
+            fields += [
+                f"{relation}__{field}"
+                for relation, related_fields in self.expand_fields.items()
+                for field in related_fields
+            ]
+        return queryset.only(*fields)
@@ -0,0 +1,45 @@
+"""
+Настройки gunicorn для production (WSGI)
+
+Запуск: gunicorn -c config/gunicorn.py config.wsgi:application
+Количество процессов по умолчанию - 2 * число ядер + 1, в каждом
+процессе GUNICORN_THREADS потоков (worker_class gthread), у каждого
+потока свое постоянное соединение с базой (CONN_MAX_AGE).
+
+Пул хеширования паролей (users.hashing) создается в каждом процессе:
+всего процессов хеширования workers * PASSWORD_HASHING_WORKERS, поэтому
+по умолчанию ядра делятся между процессами сервера (число ядер //
+WEB_CONCURRENCY, не менее 1). При заданном PASSWORD_HASHING_WORKERS
+произведение не должно превышать числа ядер.
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+# Число процессов - для настроек Django в процессах (PASSWORD_HASHING_WORKERS)
+os.environ["WEB_CONCURRENCY"] = str(workers)
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+worker_class = "gthread"
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+graceful_timeout = timeout
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+# Перезапуск процесса после max_requests запросов (утечки памяти),
+# со случайным сдвигом, чтобы процессы не перезапускались одновременно
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
+
+
+def child_exit(server, worker):
+    """Метрики завершенного процесса больше не публикуются"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,24 @@
+from django.db import DatabaseError, connection
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+class HealthAPIView(APIView):
+    """
+    Проверка работоспособности для балансировщика и docker-compose:
+    200, если база отвечает, иначе 503
+    """
+
+    authentication_classes = ()
+
+    def get(self, request):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        except DatabaseError:
+            return Response(
+                {"status": "unavailable"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        return Response({"status": "ok"})
@@ -0,0 +1,131 @@
+"""
+Потоковый импорт строк из CSV/NDJSON файлов в management-командах
+
+Файл читается построчно, строки обрабатываются порциями, каждая порция
+записывается в отдельной транзакции. Номер последней обработанной строки
+сохраняется в базе (ImportProgress) в той же транзакции, что и порция, и
+при запуске с `--resume` импорт продолжается со следующей строки: сбой
+после записи порции не приводит к ее повторной вставке.
+"""
+
+import csv
+import json
+import os
+from itertools import islice
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+
+from imports.models import ImportProgress
+
+FORMATS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+}
+
+
+def read_rows(path, file_format):
+    """Строки файла по одной (None - строка, которую не удалось разобрать)"""
+    with open(path, encoding="utf-8", newline="") as file:
+        if file_format == "csv":
+            yield from csv.DictReader(file)
+            return
+        for line in file:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield row if isinstance(row, dict) else None
+
+
+def chunks(rows, size):
+    """Порции по size элементов без чтения всей последовательности"""
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+class ImportCommand(BaseCommand):
+    """
+    Базовая команда импорта, в наследнике определяется import_chunk -
+    запись порции строк [(номер строки, данные), ...]
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="путь к CSV или NDJSON файлу")
+        parser.add_argument(
+            "--format",
+            choices=sorted(set(FORMATS.values())),
+            help="формат файла (по умолчанию - по расширению)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.IMPORT_BATCH_SIZE,
+            help="количество строк в одной транзакции",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="продолжить прерванный импорт с последней записанной порции",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or FORMATS.get(
+            os.path.splitext(path)[1].lower()
+        )
+        if file_format is None:
+            raise CommandError("Не удалось определить формат файла, укажите --format")
+        if not os.path.exists(path):
+            raise CommandError(f"Файл {path} не найден")
+
+        key = {
+            "command": self.__module__.rsplit(".", 1)[-1],
+            "path": os.path.abspath(path),
+        }
+        progress = ImportProgress.objects.filter(**key)
+        start = 0
+        if options["resume"]:
+            start = progress.values_list("line", flat=True).first() or 0
+            if start:
+                self.stdout.write(f"Продолжение импорта со строки {start + 1}")
+
+        self.created = self.skipped = self.failed = 0
+        rows = islice(enumerate(read_rows(path, file_format), start=1), start, None)
+        for chunk in chunks(rows, options["batch_size"]):
+            parsed = []
+            for number, row in chunk:
+                if row is None:
+                    self.report_error(number, "Некорректная строка.")
+                else:
+                    parsed.append((number, row))
+            with transaction.atomic():
+                self.import_chunk(parsed)
+                ImportProgress.objects.update_or_create(
+                    **key, defaults={"line": chunk[-1][0]}
+                )
+            self.after_chunk()
+            self.stdout.write(
+                f"Обработано строк: {chunk[-1][0]} (создано: {self.created}, "
+                f"пропущено: {self.skipped}, ошибок: {self.failed})"
+            )
+
+        progress.delete()
+        self.stdout.write(self.style.SUCCESS("Импорт завершен"))
+
+    def import_chunk(self, rows):
+        raise NotImplementedError
+
+    def after_chunk(self):
+        """Действия после записи порции (например, сброс кеша)"""
+
+    def report_error(self, number, errors):
+        self.failed += 1
+        if not isinstance(errors, str):
+            errors = json.dumps(errors, ensure_ascii=False)
+        self.stderr.write(f"Строка {number}: {errors}")
@@ -0,0 +1,248 @@
+"""
+Метрики запросов в формате Prometheus (/metrics/)
+
+По каждому маршруту (имя view, например participants:list): время
+ответа, число и время SQL-запросов, время рендеринга ответа DRF и размер
+ответа. Данные запроса накапливаются в контекстной переменной, поэтому
+SQL-запросы асинхронных представлений, выполняемые в другом потоке,
+учитываются в своем запросе. Потоковые ответы (выгрузки) замеряются до
+окончания передачи. При нескольких процессах сервера (gunicorn,
+uvicorn --workers) метрики процессов объединяются через каталог
+PROMETHEUS_MULTIPROC_DIR.
+
+Метрики включаются METRICS_ENABLED (middleware первым в MIDDLEWARE).
+Рендеринг замеряется рендерерами DRF проекта, классы DRF не изменяются.
+"""
+
+import os
+import secrets
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from django.utils.decorators import sync_and_async_middleware
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY,
+                               CollectorRegistry, Counter, Histogram,
+                               generate_latest, multiprocess)
+from rest_framework import renderers
+
+METHODS = {"GET", "HEAD", "OPTIONS", "POST", "PUT", "PATCH", "DELETE"}
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+REQUESTS = Counter(
+    "api_requests", "Количество запросов", ["view", "method", "status"]
+)
+REQUEST_DURATION = Histogram(
+    "api_request_duration_seconds",
+    "Время ответа",
+    ["view", "method"],
+    buckets=DURATION_BUCKETS,
+)
+SQL_QUERIES = Histogram(
+    "api_request_sql_queries",
+    "Количество SQL-запросов за запрос",
+    ["view"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+SQL_DURATION = Histogram(
+    "api_request_sql_duration_seconds",
+    "Время SQL-запросов за запрос",
+    ["view"],
+    buckets=DURATION_BUCKETS,
+)
+RENDER_DURATION = Histogram(
+    "api_request_render_duration_seconds",
+    "Время рендеринга ответа DRF за запрос",
+    ["view"],
+    buckets=DURATION_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    "api_response_size_bytes",
+    "Размер ответа",
+    ["view"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+
+
+class RequestStats:
+    __slots__ = ("queries", "sql_duration", "render_duration", "rendering")
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_duration = 0.0
+        self.render_duration = 0.0
+        self.rendering = False
+
+
+current_stats = ContextVar("current_stats", default=None)
+
+
+def sql_timer(execute, sql, params, many, context):
+    stats = current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.sql_duration += time.perf_counter() - started
+
+
+def install_sql_timer(connection, **kwargs):
+    if sql_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(sql_timer)
+
+
+class TimedRendererMixin:
+    """
+    Замер рендеринга ответа в метрики запроса; вложенный рендеринг
+    (JSON внутри BrowsableAPIRenderer) не замеряется повторно
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        stats = current_stats.get()
+        if stats is None or stats.rendering:
+            return super().render(data, accepted_media_type, renderer_context)
+        stats.rendering = True
+        started = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            stats.rendering = False
+            stats.render_duration += time.perf_counter() - started
+
+
+class JSONRenderer(TimedRendererMixin, renderers.JSONRenderer):
+    pass
+
+
+class BrowsableAPIRenderer(TimedRendererMixin, renderers.BrowsableAPIRenderer):
+    pass
+
+
+def record(request, response, stats, started, size):
+    match = request.resolver_match
+    view = match.view_name if match else "unmatched"
+    method = request.method if request.method in METHODS else "other"
+    REQUESTS.labels(view, method, response.status_code).inc()
+    REQUEST_DURATION.labels(view, method).observe(time.perf_counter() - started)
+    SQL_QUERIES.labels(view).observe(stats.queries)
+    SQL_DURATION.labels(view).observe(stats.sql_duration)
+    RENDER_DURATION.labels(view).observe(stats.render_duration)
+    RESPONSE_SIZE.labels(view).observe(size)
+
+
+def stream(content, stats, finish):
+    """
+    Потоковый ответ: SQL-запросы при чтении каждой части учитываются в
+    запросе, метрики записываются после передачи или закрытия ответа
+    """
+    content, size = iter(content), 0
+    try:
+        while True:
+            token = current_stats.set(stats)
+            try:
+                chunk = next(content, None)
+            finally:
+                current_stats.reset(token)
+            if chunk is None:
+                return
+            size += len(chunk)
+            yield chunk
+    finally:
+        finish(size)
+
+
+async def astream(content, stats, finish):
+    """Асинхронный вариант stream"""
+    content, size = aiter(content), 0
+    try:
+        while True:
+            token = current_stats.set(stats)
+            try:
+                chunk = await anext(content, None)
+            finally:
+                current_stats.reset(token)
+            if chunk is None:
+                return
+            size += len(chunk)
+            yield chunk
+    finally:
+        finish(size)
+
+
+def finish_response(request, response, stats, started):
+    """Запись метрик; у потокового ответа - после передачи содержимого"""
+    if not response.streaming:
+        record(request, response, stats, started, len(response.content))
+        return response
+
+    def finish(size):
+        record(request, response, stats, started, size)
+
+    if response.is_async:
+        response.streaming_content = astream(
+            response.streaming_content, stats, finish
+        )
+    else:
+        response.streaming_content = stream(response.streaming_content, stats, finish)
+    return response
+
+
+@sync_and_async_middleware
+def metrics_middleware(get_response):
+    connection_created.connect(install_sql_timer, dispatch_uid="sql_timer")
+
+    def start():
+        # Соединения, открытые до подключения сигнала
+        for connection in connections.all(initialized_only=True):
+            install_sql_timer(connection)
+        stats = RequestStats()
+        return stats, current_stats.set(stats), time.perf_counter()
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            stats, token, started = start()
+            try:
+                response = await get_response(request)
+            finally:
+                current_stats.reset(token)
+            return finish_response(request, response, stats, started)
+
+    else:
+
+        def middleware(request):
+            stats, token, started = start()
+            try:
+                response = get_response(request)
+            finally:
+                current_stats.reset(token)
+            return finish_response(request, response, stats, started)
+
+    return middleware
+
+
+def metrics_view(request):
+    """
+    Метрики в текстовом формате Prometheus: с токеном METRICS_TOKEN, без
+    заданного токена - только для сотрудников (вход в Admin-панель)
+    """
+    if not settings.METRICS_TOKEN:
+        if not request.user.is_staff:
+            return HttpResponse(status=403)
+    elif not secrets.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {settings.METRICS_TOKEN}"
+    ):
+        return HttpResponse(status=401)
+    registry = REGISTRY
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "relatives",
     "rest_framework_simplejwt",
@@ -50,6 +51,9 @@ INSTALLED_APPS = [
     "users",
     "products",
     "participants",
+    "analytics",
+    "benchmarks",
+    "imports",
 ]
 
 MIDDLEWARE = [
@@ -63,6 +67,15 @@ MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
 ]
 
+# Метрики запросов (/metrics/): время ответа, SQL, рендеринг, размер ответа
+# по маршрутам, по умолчанию отключены (middleware замеряет весь запрос,
+# поэтому стоит первым); METRICS_TOKEN - токен доступа к /metrics/ (Bearer),
+# без токена метрики доступны только сотрудникам (is_staff)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "False") == "True"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+if METRICS_ENABLED:
+    MIDDLEWARE.insert(0, "config.metrics.metrics_middleware")
+
 ROOT_URLCONF = "config.urls"
 
 REST_FRAMEWORK = {
@@ -71,12 +84,18 @@ REST_FRAMEWORK = {
     ),
     # Настройки JWT-токенов
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication",
     ),
     # Закрыт проект аутентификацией
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    # Рендереры DRF с замером времени для метрик (без METRICS_ENABLED
+    # замер не выполняется)
+    "DEFAULT_RENDERER_CLASSES": (
+        "config.metrics.JSONRenderer",
+        "config.metrics.BrowsableAPIRenderer",
+    ),
 }
 
 TEMPLATES = [
@@ -109,9 +128,96 @@ DATABASES = {
         "HOST": os.getenv("DB_HOST"),
         "PORT": os.getenv("DB_PORT"),
         "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
+        # Постоянные соединения (секунды, 0 - новое соединение на каждый
+        # запрос); перед повторным использованием соединение проверяется
+        "CONN_MAX_AGE": int(os.getenv("CONN_MAX_AGE", 0)),
+        "CONN_HEALTH_CHECKS": True,
+    }
+}
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+}
+
+# Версии таблиц и объектов для ETag и кеша ответов хранятся в кеше: при
+# нескольких процессах сервера нужен общий кеш (redis), locmem - для тестов
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[os.getenv("CACHE_BACKEND", "locmem")],
+        # для file - каталог, для redis - адрес, например redis://redis:6379/0
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
     }
 }
 
+# Срок хранения ответов API в кеше (в секундах)
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", 300))
+
+# Админ-панель: точное число записей списка только для выборок меньше
+# ADMIN_EXACT_COUNT_LIMIT (иначе - оценка PostgreSQL), значения фильтров
+# хранятся в кеше ADMIN_FILTER_CACHE_TIMEOUT секунд
+ADMIN_EXACT_COUNT_LIMIT = int(os.getenv("ADMIN_EXACT_COUNT_LIMIT", 10000))
+ADMIN_FILTER_CACHE_TIMEOUT = int(os.getenv("ADMIN_FILTER_CACHE_TIMEOUT", 600))
+
+# Наибольший уровень участника сети (завод - 0). Путь в иерархии
+# (tree_path, 255 символов) вмещает 31 уровень при 7-значных id, большее
+# значение отклоняет проверка participants.E001
+PARTICIPANT_MAX_LEVEL = int(os.getenv("PARTICIPANT_MAX_LEVEL", 2))
+
+# Кеш иерархии участников (participants.hierarchy): срок хранения
+# (в секундах) и наибольшее число записей в памяти процесса
+HIERARCHY_CACHE_TIMEOUT = int(os.getenv("HIERARCHY_CACHE_TIMEOUT", 300))
+HIERARCHY_LOCAL_CACHE_SIZE = int(os.getenv("HIERARCHY_LOCAL_CACHE_SIZE", 10000))
+
+# Срок хранения в кеше полей пользователя для аутентификации (в секундах)
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv("AUTH_USER_CACHE_TIMEOUT", 60))
+
+# Пакетные операции с продуктами: не более PRODUCTS_BULK_MAX_ITEMS
+# продуктов в запросе, запись в базу пачками по PRODUCTS_BULK_BATCH_SIZE
+PRODUCTS_BULK_MAX_ITEMS = int(os.getenv("PRODUCTS_BULK_MAX_ITEMS", 5000))
+PRODUCTS_BULK_BATCH_SIZE = int(os.getenv("PRODUCTS_BULK_BATCH_SIZE", 1000))
+
+# Импорт из файлов (import_participants, import_products): строки читаются
+# потоком и записываются порциями по IMPORT_BATCH_SIZE в одной транзакции
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 1000))
+
+# Выгрузка в CSV/NDJSON: строки читаются из базы порциями по EXPORT_CHUNK_SIZE
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 2000))
+
+# Хеширование паролей: PASSWORD_HASHER - алгоритм новых паролей (pbkdf2,
+# argon2 или scrypt), пароли других алгоритмов проверяются и перехешируются
+# при входе. Параметры стоимости, 0 - значение Django по умолчанию
+PASSWORD_HASHER_CLASSES = {
+    "pbkdf2": "users.hashers.PBKDF2PasswordHasher",
+    "argon2": "users.hashers.Argon2PasswordHasher",
+    "scrypt": "users.hashers.ScryptPasswordHasher",
+}
+PASSWORD_HASHER = os.getenv("PASSWORD_HASHER", "pbkdf2")
+PASSWORD_HASHERS = [PASSWORD_HASHER_CLASSES[PASSWORD_HASHER]] + [
+    path for name, path in PASSWORD_HASHER_CLASSES.items() if name != PASSWORD_HASHER
+]
+PBKDF2_ITERATIONS = int(os.getenv("PBKDF2_ITERATIONS", 0))
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", 0))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", 0))  # в КиБ
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", 0))
+SCRYPT_WORK_FACTOR = int(os.getenv("SCRYPT_WORK_FACTOR", 0))
+
+# Пакетная регистрация сотрудников: не более USERS_BULK_MAX_ITEMS в запросе,
+# пароли хешируются в PASSWORD_HASHING_WORKERS процессах. Пул свой у каждого
+# из WEB_CONCURRENCY процессов сервера (gunicorn, uvicorn), поэтому по
+# умолчанию ядра делятся между ними (config/gunicorn.py)
+USERS_BULK_MAX_ITEMS = int(os.getenv("USERS_BULK_MAX_ITEMS", 1000))
+PASSWORD_HASHING_WORKERS = int(
+    os.getenv(
+        "PASSWORD_HASHING_WORKERS",
+        max((os.cpu_count() or 1) // int(os.getenv("WEB_CONCURRENCY", 1)), 1),
+    )
+)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -23,6 +23,8 @@ from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 
 from config import settings
+from config.health import HealthAPIView
+from config.metrics import metrics_view
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -40,12 +42,19 @@ schema_view = get_schema_view(
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path(
+        "health/",
+        HealthAPIView.as_view(permission_classes=(permissions.AllowAny,)),
+        name="health",
+    ),
+    path("metrics/", metrics_view, name="metrics"),
     path("users/", include("users.urls", namespace="users")),
     path(
         "participants/",
         include("participants.urls", namespace="participants")
     ),
     path("products/", include("products.urls", namespace="products")),
+    path("analytics/", include("analytics.urls", namespace="analytics")),
     path(
         "swagger<format>/",
         schema_view.without_ui(cache_timeout=0),
@@ -0,0 +1,43 @@
+# Generated by Django 5.1 on 2026-10-18 13:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportProgress",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("command", models.CharField(max_length=50, verbose_name="команда")),
+                ("path", models.CharField(max_length=255, verbose_name="путь к файлу")),
+                ("line", models.PositiveBigIntegerField(verbose_name="строка")),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Время изменения"),
+                ),
+            ],
+            options={
+                "verbose_name": "ход импорта",
+                "verbose_name_plural": "ход импорта",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("command", "path"), name="import_progress_unique"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import models
+
+
+class ImportProgress(models.Model):
+    """
+    Последняя записанная строка файла импорта, сохраняется в транзакции
+    порции: продолжение импорта (--resume) не повторяет записанные строки
+    """
+
+    command = models.CharField(max_length=50, verbose_name="команда")
+    path = models.CharField(max_length=255, verbose_name="путь к файлу")
+    line = models.PositiveBigIntegerField(verbose_name="строка")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Время изменения")
+
+    def __str__(self):
+        # Строковое отображение объекта
+        return f"{self.command} {self.path}: {self.line}"
+
+    class Meta:
+        verbose_name = "ход импорта"
+        verbose_name_plural = "ход импорта"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["command", "path"], name="import_progress_unique"
+            ),
+        ]
@@ -1,18 +1,62 @@
+from collections import defaultdict
+
+from django import forms
 from django.contrib import admin
-from relatives import RelativesAdmin
+from django.db import transaction
+from django.utils import timezone
+from relatives import RelativesMixin
 
-from participants.models import Participant
+from config.admin import CachedAllValuesFieldListFilter, LargeTableAdmin
+from config.cache import invalidate_objects
+from participants.models import DebtChange, Participant, SupplierReceivable
+from participants.validators import check_supplier
 
 
 @admin.action(description="Очистить задолженность указанных поставщиков")
 def is_clear_debt(modeladmin, request, queryset):
-    for participants in queryset:
-        participants.debt = 0.00
-        participants.save()
+    queryset = queryset.exclude(debt=0).order_by()
+    with transaction.atomic():
+        changes = [
+            DebtChange(
+                participant_id=pk,
+                supplier_id=supplier_id,
+                previous_debt=debt,
+                debt=0,
+                amount=-debt,
+                author=request.user,
+            )
+            for pk, supplier_id, debt in queryset.select_for_update().values_list(
+                "pk", "supplier_id", "debt"
+            )
+        ]
+        DebtChange.objects.bulk_create(changes, batch_size=1000)
+        queryset.update(debt=0, updated_at=timezone.now())
+        amounts = defaultdict(int)
+        for change in changes:
+            amounts[change.supplier_id] += change.amount
+        SupplierReceivable.objects.add(amounts)
+    invalidate_objects(Participant, [change.participant_id for change in changes])
+    modeladmin.message_user(
+        request, f"Задолженность очищена у {len(changes)} участников."
+    )
+
+
+class ParticipantForm(forms.ModelForm):
+
+    def clean(self):
+        # Те же проверки поставщика, что и в API
+        cleaned_data = super().clean()
+        check_supplier(
+            cleaned_data.get("email"),
+            cleaned_data.get("unit_name"),
+            cleaned_data.get("supplier"),
+            self.instance if self.instance.pk else None,
+        )
+        return cleaned_data
 
 
 @admin.register(Participant)
-class ParticipantsAdmin(RelativesAdmin, admin.ModelAdmin):
+class ParticipantsAdmin(RelativesMixin, LargeTableAdmin):
     list_display = (
         "id",
         "name",
@@ -40,5 +84,44 @@ class ParticipantsAdmin(RelativesAdmin, admin.ModelAdmin):
             "debt",
         ),
     ]
-    list_filter = ("city",)
+    readonly_fields = ("level",)
+    form = ParticipantForm
+    # Ссылка на поставщика в списке (RelativesMixin) без запроса на строку
+    list_select_related = ("supplier",)
+    list_filter = (("city", CachedAllValuesFieldListFilter),)
+    # Выбор поставщика поиском по началу наименования вместо списка всех
+    # участников
+    search_fields = ("^name",)
+    autocomplete_fields = ("supplier",)
     actions = [is_clear_debt]
+
+    def save_model(self, request, obj, form, change):
+        # Задолженность изменяется только через журнал
+        debt = obj.debt
+        obj.debt = form.initial.get("debt", 0) if change else 0
+        super().save_model(request, obj, form, change)
+        if debt != obj.debt:
+            obj.set_debt(debt, author=request.user)
+
+
+@admin.register(DebtChange)
+class DebtChangeAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "participant",
+        "supplier",
+        "previous_debt",
+        "debt",
+        "author",
+        "created_at",
+    )
+    list_select_related = ("participant", "supplier", "author")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ParticipantsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "participants"
+
+    def ready(self):
+        import participants.checks  # noqa: F401
+        import participants.signals  # noqa: F401
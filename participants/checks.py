@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+from participants.models import Participant
+
+# Число цифр id участника, на которое рассчитан путь в иерархии
+ID_DIGITS = 7
+
+
+@register(Tags.models)
+def check_max_level(app_configs, **kwargs):
+    """
+    Путь в иерархии участника наибольшего уровня ("/" и id всех
+    поставщиков через "/") помещается в поле tree_path
+    """
+    max_length = Participant._meta.get_field("tree_path").max_length
+    allowed = (max_length - 1) // (ID_DIGITS + 1)
+    if settings.PARTICIPANT_MAX_LEVEL <= allowed:
+        return []
+    return [
+        Error(
+            f"PARTICIPANT_MAX_LEVEL={settings.PARTICIPANT_MAX_LEVEL} больше "
+            f"допустимого {allowed}: путь в иерархии длиннее {max_length} "
+            "символов.",
+            hint=f"Уменьшите PARTICIPANT_MAX_LEVEL до {allowed}.",
+            id="participants.E001",
+        )
+    ]
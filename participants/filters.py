@@ -0,0 +1,21 @@
+from django_filters import rest_framework as filters
+
+from participants.models import Participant
+
+
+class ParticipantFilter(filters.FilterSet):
+    """
+    Фильтры списка участников: точное совпадение, списки значений
+    (?city__in=Москва,Тула) и диапазоны (?debt__gte=100&debt__lte=500)
+    """
+
+    class Meta:
+        model = Participant
+        fields = {
+            "country": ["exact", "in"],
+            "city": ["exact", "in"],
+            "level": ["exact", "in", "isnull"],
+            "unit_name": ["exact", "in"],
+            "debt": ["exact", "gte", "lte", "range"],
+            "created_at": ["gte", "lte", "range"],
+        }
@@ -0,0 +1,146 @@
+"""
+Кеш иерархии участников для проверок при изменении цепочки поставщиков
+
+Для каждого участника хранятся поставщик, уровень, звено, email, путь
+в иерархии и наличие покупателей: в памяти процесса и в общем кеше
+HIERARCHY_CACHE_TIMEOUT секунд. Записи общего кеша сбрасываются точечно
+по сигналу hierarchy_changed (смена поставщика, перенос и отключение
+покупателей, удаление участника, импорт) после фиксации транзакции -
+иначе параллельный запрос вернул бы в кеш прежние поля. Сохранение
+участника без изменения этих полей кеш не сбрасывает. Сброс также меняет
+версию иерархии, по которой процессы сбрасывают свои записи в памяти.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Exists, OuterRef
+
+from participants.models import Participant
+
+# Поля участника в кеше; остальные поля загружаются из базы при обращении
+HIERARCHY_FIELDS = ("id", "supplier_id", "level", "unit_name", "email", "tree_path")
+
+VERSION_KEY = f"{Participant._meta.label_lower}:hierarchy:version"
+
+
+def get_node_key(pk):
+    return f"{Participant._meta.label_lower}:hierarchy:{pk}"
+
+
+def get_version():
+    """Текущая версия иерархии"""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        cache.add(VERSION_KEY, version, None)
+    return version
+
+
+def invalidate_hierarchy(pks):
+    """Сброс записей участников в общем кеше и в памяти всех процессов"""
+    cache.delete_many([get_node_key(pk) for pk in pks if pk is not None])
+    cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def is_current(participant):
+    """
+    В общем кеше - текущие поля иерархии участника (сохранение без
+    изменения иерархии не сбрасывает кеш); при отсутствии записи ее
+    могли сохранить в памяти процессы, поэтому результат - False
+    """
+    snapshot = cache.get(get_node_key(participant.pk))
+    return snapshot is not None and all(
+        snapshot[name] == getattr(participant, name) for name in HIERARCHY_FIELDS
+    )
+
+
+class LocalNodes:
+    """
+    Записи в памяти процесса для одной версии иерархии, сбрасываются
+    при смене версии, через HIERARCHY_CACHE_TIMEOUT секунд и при
+    превышении HIERARCHY_LOCAL_CACHE_SIZE записей
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version, self.expires, self.nodes = None, 0, {}
+
+    def get_many(self, version, pks):
+        with self.lock:
+            if version != self.version or time.monotonic() > self.expires:
+                self.version = version
+                self.expires = time.monotonic() + settings.HIERARCHY_CACHE_TIMEOUT
+                self.nodes = {}
+            return {pk: self.nodes[pk] for pk in pks if pk in self.nodes}
+
+    def update(self, version, nodes):
+        with self.lock:
+            if version != self.version:
+                return
+            if len(self.nodes) + len(nodes) > settings.HIERARCHY_LOCAL_CACHE_SIZE:
+                self.nodes = {}
+            self.nodes.update(nodes)
+
+
+local_nodes = LocalNodes()
+
+
+def get_snapshots(pks, version=None):
+    """Поля иерархии участников {id: поля}, несуществующих id в ответе нет"""
+    pks = set(pks)
+    version = version or get_version()
+    snapshots = local_nodes.get_many(version, pks)
+    missing = pks - snapshots.keys()
+    if missing:
+        found = cache.get_many([get_node_key(pk) for pk in missing])
+        loaded = {snapshot["id"]: snapshot for snapshot in found.values()}
+        missing -= loaded.keys()
+        if missing:
+            rows = {
+                snapshot["id"]: snapshot
+                for snapshot in Participant.objects.filter(pk__in=missing)
+                .order_by()
+                .values(*HIERARCHY_FIELDS)
+                .annotate(
+                    has_customers=Exists(
+                        Participant.objects.filter(supplier=OuterRef("pk"))
+                    )
+                )
+            }
+            cache.set_many(
+                {get_node_key(pk): snapshot for pk, snapshot in rows.items()},
+                settings.HIERARCHY_CACHE_TIMEOUT,
+            )
+            loaded.update(rows)
+        local_nodes.update(version, loaded)
+        snapshots.update(loaded)
+    return snapshots
+
+
+def participant_from_snapshot(snapshot):
+    """Участник из полей кеша, как если бы он был загружен из базы"""
+    names = [
+        field.attname
+        for field in Participant._meta.concrete_fields
+        if field.attname in snapshot
+    ]
+    participant = Participant.from_db(
+        DEFAULT_DB_ALIAS, names, [snapshot[name] for name in names]
+    )
+    participant.has_customers = snapshot["has_customers"]
+    return participant
+
+
+def get_participant(pk):
+    """
+    Участник по id с полями иерархии и признаком has_customers
+    (наличие покупателей) или None
+    """
+    if pk is None:
+        return None
+    snapshot = get_snapshots([pk]).get(pk)
+    return participant_from_snapshot(snapshot) if snapshot else None
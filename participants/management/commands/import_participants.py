@@ -0,0 +1,66 @@
+from config.cache import invalidate_list
+from config.imports import ImportCommand
+from participants.models import Participant, hierarchy_changed
+from participants.serializers import ParticipantsImportSerializer
+
+
+class Command(ImportCommand):
+    help = "Импорт участников сети из CSV/NDJSON файла (поставщик - email)"
+
+    def import_chunk(self, rows):
+        """
+        Поставщики порции загружаются одним запросом; участники, уже
+        записанные в базу (или ранее в файле), пропускаются
+        """
+        # Поставщики, у которых появились покупатели (сброс кеша иерархии
+        # после фиксации порции)
+        self.suppliers = set()
+        emails = {
+            value
+            for _, row in rows
+            for value in (row.get("email"), row.get("supplier"))
+            if isinstance(value, str) and value
+        }
+        participants = {
+            participant.email: participant
+            for participant in Participant.objects.filter(email__in=emails)
+        }
+        pending = []
+        for number, row in rows:
+            email, supplier_email = row.get("email"), row.get("supplier")
+            if isinstance(email, str) and email in participants:
+                self.skipped += 1
+                continue
+            if isinstance(supplier_email, str):
+                supplier = participants.get(supplier_email)
+                if supplier is not None and supplier.pk is None:
+                    # Поставщик из этой же порции - нужен его id
+                    self.create(pending)
+            serializer = ParticipantsImportSerializer(
+                data=row, context={"participants": participants}
+            )
+            if not serializer.is_valid():
+                self.report_error(number, serializer.errors)
+                continue
+            participant = Participant(**serializer.validated_data)
+            if participant.supplier:
+                participant.tree_path = participant.supplier.subtree_path
+            participant.level = participant.get_level()
+            participants[participant.email] = participant
+            pending.append(participant)
+        self.create(pending)
+
+    def create(self, pending):
+        Participant.objects.bulk_create(pending)
+        self.suppliers.update(
+            participant.supplier_id
+            for participant in pending
+            if participant.supplier_id
+        )
+        self.created += len(pending)
+        pending.clear()
+
+    def after_chunk(self):
+        invalidate_list(Participant)
+        if self.suppliers:
+            hierarchy_changed.send(sender=Participant, pks=self.suppliers)
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.15 on 2026-10-18 12:11
+
+from django.db import migrations, models
+
+
+def fill_tree_path(apps, schema_editor):
+    """Заполнение пути в иерархии для уже существующих участников"""
+    Participant = apps.get_model("participants", "Participant")
+    suppliers = dict(Participant.objects.values_list("pk", "supplier_id"))
+    paths = {}
+
+    def get_path(pk):
+        if pk not in paths:
+            supplier_id = suppliers[pk]
+            paths[pk] = f"{get_path(supplier_id)}{supplier_id}/" if supplier_id else "/"
+        return paths[pk]
+
+    participants = [Participant(pk=pk, tree_path=get_path(pk)) for pk in suppliers]
+    Participant.objects.bulk_update(participants, ["tree_path"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("participants", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="participant",
+            name="tree_path",
+            field=models.CharField(
+                default="/",
+                editable=False,
+                max_length=255,
+                verbose_name="путь в иерархии",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="participant",
+            index=models.Index(
+                fields=["tree_path"],
+                name="participant_tree_path_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ),
+        migrations.RunPython(fill_tree_path, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations, models
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Cast, Length, Replace
+
+
+def fill_level(apps, schema_editor):
+    """Пересчет уровня существующих участников по цепочке поставщиков"""
+    Participant = apps.get_model("participants", "Participant")
+    depth = (
+        Length(F("tree_path"))
+        - Length(Replace(F("tree_path"), Value("/")))
+        - 1
+    )
+    Participant.objects.update(
+        level=Case(
+            When(Q(supplier__isnull=True) & ~Q(unit_name="завод"), then=Value(None)),
+            default=Cast(depth, output_field=models.CharField()),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("participants", "0002_participant_tree_path"),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_level, migrations.RunPython.noop),
+    ]
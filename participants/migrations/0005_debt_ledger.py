@@ -0,0 +1,75 @@
+# Generated by Django 5.1.15 on 2026-10-18 12:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F, Sum
+
+
+def fill_ledger(apps, schema_editor):
+    """Сумма изменения в журнале и сводки по существующим задолженностям"""
+    DebtChange = apps.get_model("participants", "DebtChange")
+    Participant = apps.get_model("participants", "Participant")
+    SupplierReceivable = apps.get_model("participants", "SupplierReceivable")
+
+    DebtChange.objects.update(amount=F("debt") - F("previous_debt"))
+    totals = (
+        Participant.objects.filter(supplier__isnull=False)
+        .values("supplier_id")
+        .annotate(total=Sum("debt"))
+        .order_by()
+    )
+    SupplierReceivable.objects.bulk_create(
+        SupplierReceivable(supplier_id=row["supplier_id"], total=row["total"])
+        for row in totals
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("participants", "0004_debtchange"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SupplierReceivable",
+            fields=[
+                (
+                    "supplier",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="receivable",
+                        serialize=False,
+                        to="participants.participant",
+                        verbose_name="поставщик",
+                    ),
+                ),
+                (
+                    "total",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=15,
+                        verbose_name="задолженность покупателей",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "задолженность перед поставщиком",
+                "verbose_name_plural": "задолженности перед поставщиками",
+                "ordering": ["-pk"],
+            },
+        ),
+        migrations.AddField(
+            model_name="debtchange",
+            name="amount",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=0,
+                max_digits=15,
+                verbose_name="сумма изменения",
+            ),
+        ),
+        migrations.RunPython(fill_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1 on 2026-10-18 12:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("participants", "0006_participant_updated_at"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="participant",
+            name="supplier",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="предыдущий по иерархии участник сети",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="customer",
+                to="participants.participant",
+                verbose_name="поставщик",
+            ),
+        ),
+    ]
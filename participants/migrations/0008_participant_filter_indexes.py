@@ -0,0 +1,29 @@
+# Generated by Django 5.1 on 2026-10-18 12:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("participants", "0007_supplier_without_parent_link"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="participant",
+            index=models.Index(
+                fields=["country", "-id"], name="participant_country_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="participant",
+            index=models.Index(fields=["city", "-id"], name="participant_city_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="participant",
+            index=models.Index(
+                fields=["level", "unit_name", "-id"], name="participant_level_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1 on 2026-10-18 12:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("participants", "0008_participant_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="participant",
+            index=models.Index(
+                fields=["created_at"], name="participant_created_at_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="participant",
+            index=models.Index(fields=["debt"], name="participant_debt_idx"),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1 on 2026-10-18 13:01
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("participants", "0009_participant_ordering_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="participant",
+            index=models.Index(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"),
+                    name="text_pattern_ops",
+                ),
+                name="participant_name_upper_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1 on 2026-10-18 13:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("participants", "0010_participant_name_upper_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="participant",
+            name="level",
+            field=models.CharField(
+                blank=True, max_length=3, null=True, verbose_name="уровень"
+            ),
+        ),
+    ]
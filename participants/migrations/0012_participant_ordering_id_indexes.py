@@ -0,0 +1,31 @@
+# Generated by Django 5.1 on 2026-10-18 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("participants", "0011_participant_level_any_depth"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="participant",
+            name="participant_created_at_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="participant",
+            name="participant_debt_idx",
+        ),
+        migrations.AddIndex(
+            model_name="participant",
+            index=models.Index(
+                fields=["created_at", "id"], name="participant_created_at_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="participant",
+            index=models.Index(fields=["debt", "id"], name="participant_debt_idx"),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1 on 2026-10-18 14:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("participants", "0012_participant_ordering_id_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="participant",
+            name="level",
+            field=models.PositiveSmallIntegerField(
+                blank=True, null=True, verbose_name="уровень"
+            ),
+        ),
+    ]
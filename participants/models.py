@@ -1,7 +1,25 @@
-from django.db import models
+from django.conf import settings
+from django.contrib.postgres.indexes import OpClass
+from django.db import models, transaction
+from django.db.models import Case, F, Max, Value, When
+from django.db.models.functions import Concat, Length, Replace, Substr, Upper
+from django.dispatch import Signal
+from django.utils import timezone
+
+from config.cache import invalidate_objects
 
 NULLABLE = {"blank": True, "null": True}
 
+# Могли измениться поставщик, уровень, путь в иерархии, звено или наличие
+# покупателей участников pks, а также поля сохраненного участника instance
+# (participants.hierarchy)
+hierarchy_changed = Signal()
+
+
+def tree_depth(tree_path):
+    """Число поставщиков в цепочке по пути в иерархии (в SQL)"""
+    return Length(tree_path) - Length(Replace(tree_path, Value("/"))) - 1
+
 
 class Participant(models.Model):
     """Участник торговой онлайн платформы"""
@@ -17,6 +35,7 @@ class Participant(models.Model):
     created_at = models.DateTimeField(
         auto_now_add=True, verbose_name="Время создания"
     )
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Время изменения")
 
     FACTORY = "завод"
     RETAIL_NETWORK = "розничная сеть"
@@ -38,33 +57,401 @@ class Participant(models.Model):
         verbose_name="поставщик",
         on_delete=models.SET_NULL,
         help_text="предыдущий по иерархии участник сети",
-        parent_link=True,
         **NULLABLE,
     )
 
     debt = models.DecimalField(max_digits=15, decimal_places=2, default=0)
 
-    ZERO = "0"
-    ONE = "1"
-    TWO = "2"
-    LEVEL = {
-        ZERO: "0",
-        ONE: "1",
-        TWO: "2",
-    }
-    level = models.CharField(
-        choices=LEVEL,
-        max_length=3,
+    # Уровень от 0 (завод) до PARTICIPANT_MAX_LEVEL
+    level = models.PositiveSmallIntegerField(
         verbose_name="уровень",
         **NULLABLE,
     )
 
+    # Материализованный путь: id всех поставщиков по цепочке, начиная
+    # с верхнего, например "/1/5/" (у участника без поставщика - "/")
+    tree_path = models.CharField(
+        max_length=255,
+        default="/",
+        editable=False,
+        verbose_name="путь в иерархии",
+    )
+
+    # Поставщик и звено на момент загрузки из базы
+    _loaded_hierarchy = None
+    # Задолженность на момент загрузки из базы
+    _loaded_debt = None
+
     def __str__(self):
         # Строковое отображение объекта
         return f"{self.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if {"supplier_id", "unit_name"} <= set(field_names):
+            instance._loaded_hierarchy = (instance.supplier_id, instance.unit_name)
+        if "debt" in field_names:
+            instance._loaded_debt = instance.debt
+        return instance
+
+    @property
+    def subtree_path(self):
+        """Префикс пути всех покупателей участника (на любой глубине)"""
+        return f"{self.tree_path}{self.pk}/"
+
+    @property
+    def supplier_ids(self):
+        """id поставщиков по цепочке, начиная с верхнего"""
+        return [int(pk) for pk in self.tree_path.split("/") if pk]
+
+    def get_level(self):
+        """
+        Уровень по цепочке поставщиков: завод - 0, у покупателя на 1 больше,
+        чем у поставщика; участник без поставщика (кроме завода) вне сети
+        """
+        if self.supplier_id or self.unit_name == self.FACTORY:
+            return len(self.supplier_ids)
+        return None
+
+    def get_height(self):
+        """Число уровней покупателей участника (0 - покупателей нет)"""
+        depth = Participant.objects.filter(
+            tree_path__startswith=self.subtree_path
+        ).aggregate(depth=Max(tree_depth(F("tree_path"))))["depth"]
+        return depth - len(self.supplier_ids) if depth is not None else 0
+
+    def save(self, *args, **kwargs):
+        """
+        Задолженность существующего участника не перезаписывается полем:
+        изменение проводится через set_debt (журнал и сводка поставщика)
+        """
+        update_fields = kwargs.get("update_fields")
+        adding, debt = self._state.adding, self.__dict__.get("debt")
+        if (
+            adding
+            or debt is None
+            or debt == self._loaded_debt
+            or (update_fields is not None and "debt" not in update_fields)
+        ):
+            self.save_fields(*args, **kwargs)
+            if adding:
+                self._loaded_debt = debt
+            return
+        with transaction.atomic():
+            self.save_fields(*args, **kwargs)
+            self.set_debt(debt)
+
+    def save_fields(self, *args, **kwargs):
+        """Запись участника с пересчетом пути и уровня (без задолженности)"""
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if not self._state.adding:
+                update_fields.discard("debt")
+            if not {"supplier", "unit_name"} & update_fields:
+                kwargs["update_fields"] = update_fields
+                return super().save(*args, **kwargs)
+            kwargs["update_fields"] = {*update_fields, "tree_path", "level"}
+        elif not self._state.adding and self._loaded_hierarchy == (
+            self.supplier_id,
+            self.unit_name,
+        ):
+            # Поставщик и звено не изменились: путь и уровень не
+            # пересчитываются (без запроса поставщика) и не перезаписываются
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in ("tree_path", "level", "debt")
+            ]
+            super().save(*args, **kwargs)
+            self.send_hierarchy_changed([])
+            return
+        elif not self._state.adding:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "debt"
+            ]
+
+        with transaction.atomic():
+            # Участник и новый поставщик блокируются до конца транзакции, пути
+            # перечитываются: параллельные смены поставщиков (A -> B и B -> A)
+            # выполняются по очереди, и вторая не создаст цикл
+            adding = self._state.adding
+            locked = (
+                Participant.objects.select_for_update()
+                .filter(pk__in=[pk for pk in (self.pk, self.supplier_id) if pk])
+                .order_by("pk")
+                .values_list("pk", "tree_path", "debt")
+            )
+            paths, debts = {}, {}
+            for pk, tree_path, debt in locked:
+                paths[pk], debts[pk] = tree_path, debt
+            # В сводки поставщиков переносится задолженность, записанная в базе
+            debt = debts.get(self.pk, self.debt)
+            if self.pk in paths:
+                self.tree_path = paths[self.pk]
+            old_subtree_path = self.subtree_path if self.pk else None
+            old_depth = len(self.supplier_ids)
+            old_supplier_id = self.supplier_ids[-1] if self.pk and old_depth else None
+            if self.supplier_id and self.supplier_id not in paths:
+                raise Participant.DoesNotExist(
+                    f"Поставщик {self.supplier_id} не найден."
+                )
+            self.tree_path = (
+                f"{paths[self.supplier_id]}{self.supplier_id}/"
+                if self.supplier_id
+                else "/"
+            )
+            if self.pk in self.supplier_ids:
+                raise ValueError(
+                    f"Участник {self.pk} не может быть поставщиком самого себя "
+                    f"(цепочка поставщиков {self.tree_path})."
+                )
+            old_level, self.level = self.level, self.get_level()
+            if (
+                old_level is not None
+                and self.level is None
+                and old_subtree_path
+                and Participant.objects.filter(supplier_id=self.pk).exists()
+            ):
+                raise ValueError(
+                    f"Участник {self.pk} с покупателями не может выйти из сети "
+                    "(без поставщика звено может быть только заводом)."
+                )
+            super().save(*args, **kwargs)
+            if adding and self.debt:
+                # Начальная задолженность записывается в журнал
+                DebtChange.objects.create(
+                    participant=self,
+                    supplier_id=self.supplier_id,
+                    previous_debt=0,
+                    debt=self.debt,
+                    amount=self.debt,
+                )
+            if old_supplier_id != self.supplier_id:
+                # Задолженность переходит к новому поставщику
+                SupplierReceivable.objects.add(
+                    {old_supplier_id: -debt, self.supplier_id: debt}
+                )
+            moved = []
+            if old_subtree_path and old_subtree_path != self.subtree_path:
+                # Переносим всех покупателей и пересчитываем их уровни
+                # одним UPDATE
+                delta = len(self.supplier_ids) - old_depth
+                subtree = Participant.objects.filter(
+                    tree_path__startswith=old_subtree_path
+                )
+                moved = list(subtree.values_list("pk", flat=True))
+                subtree.update(
+                    updated_at=timezone.now(),
+                    tree_path=Concat(
+                        Value(self.subtree_path),
+                        Substr("tree_path", len(old_subtree_path) + 1),
+                    ),
+                    level=tree_depth(F("tree_path")) + delta,
+                )
+                invalidate_objects(Participant, moved)
+        if old_supplier_id != self.supplier_id:
+            moved += [old_supplier_id, self.supplier_id]
+        self._loaded_hierarchy = (self.supplier_id, self.unit_name)
+        self.send_hierarchy_changed(moved)
+
+    def send_hierarchy_changed(self, pks):
+        """Сигнал hierarchy_changed после фиксации транзакции"""
+        transaction.on_commit(
+            lambda: hierarchy_changed.send(sender=Participant, pks=pks, instance=self)
+        )
+
+    def set_debt(self, debt, author=None):
+        """
+        Изменение задолженности перед поставщиком: запись в журнал и
+        в сводку поставщика в одной транзакции
+        """
+        with transaction.atomic():
+            previous_debt, supplier_id = (
+                Participant.objects.select_for_update()
+                .values_list("debt", "supplier_id")
+                .get(pk=self.pk)
+            )
+            if debt == previous_debt:
+                self.debt = self._loaded_debt = debt
+                return
+            Participant.objects.filter(pk=self.pk).update(
+                debt=debt, updated_at=timezone.now()
+            )
+            DebtChange.objects.create(
+                participant=self,
+                supplier_id=supplier_id,
+                previous_debt=previous_debt,
+                debt=debt,
+                amount=debt - previous_debt,
+                author=author,
+            )
+            SupplierReceivable.objects.add({supplier_id: debt - previous_debt})
+        invalidate_objects(Participant, [self.pk])
+        self.debt = self._loaded_debt = debt
+
+    def detach_subtree(self):
+        """
+        Отрезает путь покупателей до участника (включительно) и
+        пересчитывает их уровни, вызывается перед удалением участника
+        """
+        # Покупатели на любой глубине - по префиксу пути (индекс
+        # participant_tree_path_idx), путь после участника сохраняется
+        subtree = Participant.objects.filter(tree_path__startswith=self.subtree_path)
+        pks = list(subtree.values_list("pk", flat=True))
+        subtree.update(
+            updated_at=timezone.now(),
+            tree_path=Substr("tree_path", len(self.subtree_path)),
+            level=Case(
+                When(supplier_id=self.pk, then=Value(None)),
+                default=tree_depth(F("tree_path")) - len(self.supplier_ids) - 1,
+            ),
+        )
+        invalidate_objects(Participant, pks)
+        transaction.on_commit(
+            lambda: hierarchy_changed.send(sender=Participant, pks=pks)
+        )
+
     class Meta:
         verbose_name = "участник"
         verbose_name_plural = "участники"
         # Сортировка по id
         ordering = ["-pk"]
+        indexes = [
+            models.Index(
+                fields=["tree_path"],
+                name="participant_tree_path_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+            # Фильтр списка по стране с сортировкой курсора по id
+            models.Index(fields=["country", "-id"], name="participant_country_idx"),
+            # Фильтр по городу в Admin-панели (сортировка по id)
+            models.Index(fields=["city", "-id"], name="participant_city_idx"),
+            # Выборки по уровню и звену сети в порядке списка
+            models.Index(
+                fields=["level", "unit_name", "-id"], name="participant_level_idx"
+            ),
+            # Сортировка списка (?ordering=) с id для позиции курсора
+            models.Index(
+                fields=["created_at", "id"], name="participant_created_at_idx"
+            ),
+            models.Index(fields=["debt", "id"], name="participant_debt_idx"),
+            # Поиск по началу наименования без учета регистра (автодополнение
+            # поставщика в Admin-панели): UPPER(name) LIKE 'ABC%'
+            models.Index(
+                OpClass(Upper("name"), name="text_pattern_ops"),
+                name="participant_name_upper_idx",
+            ),
+        ]
+
+
+class DebtChange(models.Model):
+    """
+    Изменение задолженности участника перед поставщиком
+    (журнал только пополняется, записи не изменяются),
+    задолженность участника - остаток после последней записи
+    """
+
+    participant = models.ForeignKey(
+        Participant,
+        related_name="debt_changes",
+        verbose_name="участник",
+        on_delete=models.SET_NULL,
+        **NULLABLE,
+    )
+    supplier = models.ForeignKey(
+        Participant,
+        related_name="+",
+        verbose_name="поставщик",
+        on_delete=models.SET_NULL,
+        **NULLABLE,
+    )
+    amount = models.DecimalField(
+        max_digits=15, decimal_places=2, default=0, verbose_name="сумма изменения"
+    )
+    previous_debt = models.DecimalField(
+        max_digits=15, decimal_places=2, verbose_name="задолженность до"
+    )
+    debt = models.DecimalField(
+        max_digits=15, decimal_places=2, verbose_name="задолженность после"
+    )
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="+",
+        verbose_name="автор изменения",
+        on_delete=models.SET_NULL,
+        **NULLABLE,
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name="Время изменения"
+    )
+
+    def __str__(self):
+        # Строковое отображение объекта
+        return f"{self.participant}: {self.previous_debt} -> {self.debt}"
+
+    class Meta:
+        verbose_name = "изменение задолженности"
+        verbose_name_plural = "изменения задолженности"
+        ordering = ["-pk"]
+
+
+class SupplierReceivableManager(models.Manager):
+
+    def add(self, amounts):
+        """
+        Прибавляет суммы к сводкам поставщиков ({id поставщика: сумма})
+        двумя запросами независимо от числа поставщиков
+        """
+        amounts = {pk: amount for pk, amount in amounts.items() if pk and amount}
+        if not amounts:
+            return
+        self.bulk_create(
+            [self.model(supplier_id=pk) for pk in amounts], ignore_conflicts=True
+        )
+        self.filter(supplier_id__in=amounts).update(
+            total=F("total")
+            + Case(
+                *[
+                    When(supplier_id=pk, then=Value(amount))
+                    for pk, amount in amounts.items()
+                ],
+                output_field=models.DecimalField(max_digits=15, decimal_places=2),
+            )
+        )
+
+
+class SupplierReceivable(models.Model):
+    """
+    Сводная задолженность покупателей перед поставщиком,
+    изменяется вместе с задолженностью покупателей
+    """
+
+    supplier = models.OneToOneField(
+        Participant,
+        primary_key=True,
+        related_name="receivable",
+        verbose_name="поставщик",
+        on_delete=models.CASCADE,
+    )
+    total = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=0,
+        verbose_name="задолженность покупателей",
+    )
+
+    objects = SupplierReceivableManager()
+
+    def __str__(self):
+        # Строковое отображение объекта
+        return f"{self.supplier}: {self.total}"
+
+    class Meta:
+        verbose_name = "задолженность перед поставщиком"
+        verbose_name_plural = "задолженности перед поставщиками"
+        ordering = ["-pk"]
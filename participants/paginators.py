@@ -0,0 +1,124 @@
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models import F, Func, Q, Value
+from django.db.models.lookups import GreaterThan, LessThan
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+class Row(Func):
+    """Строка значений (a, b): сравнивается по индексу на оба столбца"""
+
+    function = ""
+    output_field = models.Field()
+
+
+class ParticipantPaginator(CursorPagination):
+    """
+    Постраничный вывод участников по курсору (keyset),
+    стоимость страницы не зависит от глубины прокрутки.
+    Сортировка по неуникальному полю (?ordering=debt) дополняется id,
+    позиция курсора - пара (значение, id) без смещения среди равных
+    значений
+    """
+
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    ordering = "-pk"
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        field = ordering[0]
+        if field.lstrip("-") in ("pk", "id"):
+            return (field,)
+        return (field, "-pk" if field.startswith("-") else "pk")
+
+    def _get_position_from_instance(self, instance, ordering):
+        position = super()._get_position_from_instance(instance, ordering)
+        if len(ordering) == 1:
+            return position
+        return f"{position}|{instance.pk}"
+
+    def get_position_filter(self, queryset, position, greater):
+        """Условие (поле, id) > (значение, id) или < для позиции курсора"""
+        name = self.ordering[0].lstrip("-")
+        if len(self.ordering) == 1:
+            return Q(**{f"{name}__{'gt' if greater else 'lt'}": position})
+        lookup = GreaterThan if greater else LessThan
+        field = queryset.model._meta.get_field(name)
+        try:
+            value, pk = position.rsplit("|", 1)
+            value, pk = field.to_python(value), int(pk)
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return lookup(
+            Row(F(name), F("pk")),
+            Row(
+                Value(value, output_field=field),
+                Value(pk, output_field=models.BigIntegerField()),
+            ),
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # Как в CursorPagination, но позиция курсора сравнивается по всем
+        # полям сортировки, а смещение в курсоре всегда нулевое
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            is_reversed = self.ordering[0].startswith("-")
+            queryset = queryset.filter(
+                self.get_position_filter(
+                    queryset, current_position, self.cursor.reverse == is_reversed
+                )
+            )
+
+        results = list(queryset[offset : offset + self.page_size + 1])
+        self.page = list(results[: self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
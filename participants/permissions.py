@@ -7,6 +7,6 @@ class IsActiveEmployee(BasePermission):
     """
 
     def has_permission(self, request, view):
-        if request.user.employer:
+        if request.user.employer_id:
             return True
         return False
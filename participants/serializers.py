@@ -1,6 +1,8 @@
 from rest_framework import serializers
 
-from participants.models import Participant
+from participants.hierarchy import get_participant
+from participants.models import Participant, SupplierReceivable
+from participants.validators import check_supplier
 
 
 class ParticipantsCreateSerializer(serializers.ModelSerializer):
@@ -20,44 +22,23 @@ class ParticipantsCreateSerializer(serializers.ModelSerializer):
 
 
 class ParticipantsSerializer(serializers.ModelSerializer):
+    # Уровень хранится числом, в API - строкой, как прежде
+    level = serializers.CharField(read_only=True)
 
     def validate(self, attrs):
+        """
+        Проверка звена и поставщика, уровень вычисляется по цепочке
+        поставщиков при сохранении
+        """
+        unit_name = attrs.get("unit_name", getattr(self.instance, "unit_name", None))
+        email = attrs.get("email", getattr(self.instance, "email", None))
+        if "supplier" in attrs:
+            supplier = attrs["supplier"]
+        else:
+            # Текущий поставщик - из кеша иерархии, без запроса к базе
+            supplier = get_participant(getattr(self.instance, "supplier_id", None))
 
-        if attrs["unit_name"] == "завод":
-            if attrs["level"] != "0":
-                raise serializers.ValidationError(
-                    "Завод всегда находится на нулевом(0) уровне."
-                )
-
-        if attrs["unit_name"] in ["розничная сеть", "ИП"] and attrs["level"] not in [
-            "1",
-            "2",
-        ]:
-            raise serializers.ValidationError(
-                "'Розничная сеть' и 'ИП' могут быть только на 1-м или 2-м уровне."
-            )
-
-        if attrs["supplier"]:
-            if attrs["level"] not in ["2", "1"]:
-                raise serializers.ValidationError(
-                    "Если есть поставщик то Ваш уровень должен быть '1' или '2'."
-                )
-            if attrs["email"] == attrs["supplier"].email:
-                raise serializers.ValidationError(
-                    "Покупатель и поставщик не могут быть одним лицом."
-                )
-            if attrs["supplier"].level == "0" and attrs["level"] in ["0", "2"]:
-                raise serializers.ValidationError(
-                    "Вы выбрали поставщика с уровнем '0', Ваш уровень должен быть '1'."
-                )
-            if attrs["supplier"].level == "1" and attrs["level"] in ["0", "1"]:
-                raise serializers.ValidationError(
-                    "Вы выбрали поставщика с уровнем '1', Ваш уровень должен быть '2'."
-                )
-            if attrs["supplier"].level == "2":
-                raise serializers.ValidationError(
-                    "Поставщик с уровнем '2' не осуществляет поставки."
-                )
+        check_supplier(email, unit_name, supplier, self.instance)
         return attrs
 
     class Meta:
@@ -76,3 +57,71 @@ class ParticipantsSerializer(serializers.ModelSerializer):
             "supplier",
             "debt",
         ]
+
+
+class ParticipantsSupplierSerializer(serializers.ModelSerializer):
+    level = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = Participant
+        fields = [
+            "id",
+            "name",
+            "level",
+        ]
+
+
+class ParticipantsExpandedSerializer(ParticipantsSerializer):
+    """Участник с вложенным поставщиком (наименование и уровень)"""
+
+    supplier = ParticipantsSupplierSerializer(read_only=True)
+
+
+class ParticipantsImportSerializer(serializers.ModelSerializer):
+    """
+    Строка файла импорта участников: поставщик указывается по email и
+    берется из context["participants"] (поставщики загружаются порцией)
+    """
+
+    supplier = serializers.EmailField(
+        required=False, allow_blank=True, allow_null=True
+    )
+
+    def validate_supplier(self, value):
+        if not value:
+            return None
+        supplier = self.context["participants"].get(value)
+        if supplier is None:
+            raise serializers.ValidationError("Нет такого поставщика.")
+        return supplier
+
+    def validate(self, attrs):
+        check_supplier(attrs["email"], attrs["unit_name"], attrs.get("supplier"))
+        return attrs
+
+    class Meta:
+        model = Participant
+        # Уникальность email проверяется командой импорта по всей порции
+        extra_kwargs = {"email": {"validators": []}}
+        fields = [
+            "name",
+            "email",
+            "country",
+            "city",
+            "street",
+            "house",
+            "unit_name",
+            "supplier",
+        ]
+
+
+class SupplierReceivableSerializer(serializers.ModelSerializer):
+    name = serializers.CharField(source="supplier.name", read_only=True)
+
+    class Meta:
+        model = SupplierReceivable
+        fields = [
+            "supplier",
+            "name",
+            "total",
+        ]
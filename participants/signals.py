@@ -0,0 +1,57 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from config.cache import invalidate_list, invalidate_objects
+from participants.hierarchy import invalidate_hierarchy, is_current
+from participants.models import (Participant, SupplierReceivable,
+                                 hierarchy_changed)
+from products.models import Product
+from users.authentication import invalidate_users
+
+
+@receiver(pre_delete, sender=Participant)
+def detach_customers(sender, instance, **kwargs):
+    """Покупатели удаляемого участника становятся верхним звеном"""
+    instance.detach_subtree()
+
+
+@receiver(pre_delete, sender=Participant)
+def remove_debt(sender, instance, **kwargs):
+    """Задолженность удаляемого участника снимается со сводки поставщика"""
+    SupplierReceivable.objects.add({instance.supplier_id: -instance.debt})
+
+
+@receiver(pre_delete, sender=Participant)
+def invalidate_owned_products(sender, instance, **kwargs):
+    """У продуктов удаляемого участника не будет владельца"""
+    invalidate_objects(Product, instance.product.values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Participant)
+def invalidate_employees(sender, instance, **kwargs):
+    """У сотрудников удаляемого участника не будет работодателя"""
+    invalidate_users(instance.user.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Participant)
+@receiver(post_delete, sender=Participant)
+def invalidate_participant(sender, instance, **kwargs):
+    invalidate_objects(Participant, [instance.pk])
+    # Наименование владельца есть в развернутом списке продуктов
+    invalidate_list(Product)
+
+
+@receiver(hierarchy_changed, sender=Participant)
+def invalidate_changed_hierarchy(sender, pks, instance=None, **kwargs):
+    if instance is not None and not is_current(instance):
+        pks = [*pks, instance.pk]
+    if pks:
+        invalidate_hierarchy(pks)
+
+
+@receiver(post_delete, sender=Participant)
+def invalidate_deleted_hierarchy(sender, instance, **kwargs):
+    """У поставщика удаляемого участника могло не остаться покупателей"""
+    pks = [instance.pk, instance.supplier_id]
+    transaction.on_commit(lambda: invalidate_hierarchy(pks))
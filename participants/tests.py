@@ -1,10 +1,28 @@
+import json
+import os
+import tempfile
+import threading
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import translation
 from rest_framework import status
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
 
 from config import settings
-from participants.models import Participant
+from config.admin import EstimatedCountPaginator
+from imports.models import ImportProgress
+from participants.checks import check_max_level
+from participants.hierarchy import get_participant
+from participants.models import DebtChange, Participant, SupplierReceivable
+from participants.validators import check_supplier
 from users.models import User
 
 
@@ -12,6 +30,9 @@ class ParticipantTestCase(APITestCase):
     def setUp(self) -> None:
 
         super().setUp()
+        # Сброс кеша ответов выполняется после фиксации транзакции,
+        # а транзакция теста не фиксируется
+        cache.clear()
         self.participant = Participant.objects.create(
             name="ООО Мир",
             email="vvv@list.ru",
@@ -20,7 +41,7 @@ class ParticipantTestCase(APITestCase):
             street="New",
             house="36/5",
             unit_name="завод",
-            level="0",
+            level=0,
         )
 
         self.user = User.objects.create(
@@ -113,9 +134,9 @@ class ParticipantTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(result.get("email"), ["Enter a valid email address."])
 
-    def test_participant_update_is_false_level(self):
+    def test_participant_update_level_is_read_only(self):
         """Проверка изменения участника платформы
-        (с ошибкой, завод может быть только с уровнем 0)"""
+        (уровень вычисляется по цепочке поставщиков, не задается вручную)"""
 
         url = reverse("participants:update", args=(self.participant.pk,))
         data = {
@@ -133,16 +154,22 @@ class ParticipantTestCase(APITestCase):
         }
         response = self.client.put(url, data)
         result = response.json()
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertEqual(
-            result,
-            {"non_field_errors": ["Завод всегда находится на нулевом(0) уровне."]},
-        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.get("level"), "0")
 
-    def test_participant_update_is_false_unit_name_and_level(self):
+    def test_participant_update_is_false_supplier_not_in_network(self):
         """Проверка изменения участника платформы
-        (с ошибкой, ИП и розничная сеть только на 1 и 2 уровнях)"""
+        (с ошибкой, поставщик без своего поставщика вне сети)"""
 
+        participant = Participant.objects.create(
+            name="ПАО розничная сеть",
+            email="PPP@list.ru",
+            country="Россия",
+            city="Москва",
+            street="Московская",
+            house="5",
+            unit_name="розничная сеть",
+        )
         url = reverse("participants:update", args=(self.participant.pk,))
         data = {
             "id": self.participant.pk,
@@ -153,7 +180,7 @@ class ParticipantTestCase(APITestCase):
             "street": "New",
             "house": "36/5",
             "unit_name": "розничная сеть",
-            "level": "0",
+            "supplier": participant.pk,
         }
         response = self.client.put(url, data)
         result = response.json()
@@ -162,14 +189,14 @@ class ParticipantTestCase(APITestCase):
             result,
             {
                 "non_field_errors": [
-                    "'Розничная сеть' и 'ИП' могут быть только на 1-м или 2-м уровне."
+                    "Поставщик не подключен к сети (не выбран его поставщик)."
                 ]
             },
         )
 
-    def test_participant_update_is_false_supplier_and_level(self):
+    def test_participant_update_is_false_factory_and_supplier(self):
         """Проверка изменения участника платформы
-        (с ошибкой, если есть поставщик то уровень должен быть 1 или 2.)"""
+        (с ошибкой, у завода не может быть поставщика)"""
 
         participant = Participant.objects.create(
             name="ПАО Посредник",
@@ -179,7 +206,6 @@ class ParticipantTestCase(APITestCase):
             street="Московская",
             house="5",
             unit_name="завод",
-            level="0",
         )
         url = reverse("participants:update", args=(self.participant.pk,))
         data = {
@@ -191,7 +217,6 @@ class ParticipantTestCase(APITestCase):
             "street": "New",
             "house": "36/5",
             "unit_name": "завод",
-            "level": "0",
             "supplier": participant.pk,
         }
         response = self.client.put(url, data)
@@ -199,11 +224,7 @@ class ParticipantTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(
             result,
-            {
-                "non_field_errors": [
-                    "Если есть поставщик то Ваш уровень должен быть '1' или '2'."
-                ]
-            },
+            {"non_field_errors": ["Завод всегда находится на нулевом(0) уровне."]},
         )
 
     def test_participant_update_is_false_supplier_and_buyer(self):
@@ -232,9 +253,9 @@ class ParticipantTestCase(APITestCase):
             {"non_field_errors": ["Покупатель и поставщик не могут быть одним лицом."]},
         )
 
-    def test_participant_update_is_false_supplier_level_0(self):
+    def test_participant_update_supplier_level_0(self):
         """Проверка изменения участника платформы
-        (с ошибкой, если поставщик с уровнем 0 покупатель должен быть 1.)"""
+        (без ошибки, если поставщик с уровнем 0 покупатель на уровне 1)"""
 
         participant = Participant.objects.create(
             name="ПАО Завод",
@@ -244,7 +265,6 @@ class ParticipantTestCase(APITestCase):
             street="Московская",
             house="5",
             unit_name="завод",
-            level="0",
         )
         url = reverse("participants:update", args=(self.participant.pk,))
         data = {
@@ -256,25 +276,26 @@ class ParticipantTestCase(APITestCase):
             "street": "New",
             "house": "36/5",
             "unit_name": "ИП",
-            "level": "2",
             "supplier": participant.pk,
         }
         response = self.client.put(url, data)
         result = response.json()
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertEqual(
-            result,
-            {
-                "non_field_errors": [
-                    "Вы выбрали поставщика с уровнем '0', Ваш уровень должен быть '1'."
-                ]
-            },
-        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.get("level"), "1")
 
-    def test_participant_update_is_false_supplier_level_1(self):
+    def test_participant_update_supplier_level_1(self):
         """Проверка изменения участника платформы
-        (с ошибкой, если поставщик с уровнем 0 покупатель должен быть 1.)"""
+        (без ошибки, если поставщик с уровнем 1 покупатель на уровне 2)"""
 
+        factory = Participant.objects.create(
+            name="ПАО Завод",
+            email="factory@list.ru",
+            country="Россия",
+            city="Москва",
+            street="Заводская",
+            house="1",
+            unit_name="завод",
+        )
         participant = Participant.objects.create(
             name="ПАО розничная сеть",
             email="PPP@list.ru",
@@ -283,7 +304,7 @@ class ParticipantTestCase(APITestCase):
             street="Московская",
             house="5",
             unit_name="розничная сеть",
-            level="1",
+            supplier=factory,
         )
         url = reverse("participants:update", args=(self.participant.pk,))
         data = {
@@ -295,34 +316,45 @@ class ParticipantTestCase(APITestCase):
             "street": "New",
             "house": "36/5",
             "unit_name": "ИП",
-            "level": "1",
             "supplier": participant.pk,
         }
         response = self.client.put(url, data)
         result = response.json()
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertEqual(
-            result,
-            {
-                "non_field_errors": [
-                    "Вы выбрали поставщика с уровнем '1', Ваш уровень должен быть '2'."
-                ]
-            },
-        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(result.get("level"), "2")
 
     def test_participant_update_is_false_supplier_level_2(self):
         """Проверка изменения участника платформы
-        (с ошибкой, если поставщик с уровнем 0 покупатель должен быть 1.)"""
+        (с ошибкой, поставщик с уровнем 2 не осуществляет поставки)"""
 
-        participant = Participant.objects.create(
+        factory = Participant.objects.create(
+            name="ПАО Завод",
+            email="factory@list.ru",
+            country="Россия",
+            city="Москва",
+            street="Заводская",
+            house="1",
+            unit_name="завод",
+        )
+        retail = Participant.objects.create(
             name="ПАО розничная сеть",
+            email="retail@list.ru",
+            country="Россия",
+            city="Москва",
+            street="Торговая",
+            house="2",
+            unit_name="розничная сеть",
+            supplier=factory,
+        )
+        participant = Participant.objects.create(
+            name="ИП Петров",
             email="PPP@list.ru",
             country="Россия",
             city="Москва",
             street="Московская",
             house="5",
-            unit_name="розничная сеть",
-            level="2",
+            unit_name="ИП",
+            supplier=retail,
         )
         url = reverse("participants:update", args=(self.participant.pk,))
         data = {
@@ -334,7 +366,6 @@ class ParticipantTestCase(APITestCase):
             "street": "New",
             "house": "36/5",
             "unit_name": "ИП",
-            "level": "2",
             "supplier": participant.pk,
         }
         response = self.client.put(url, data)
@@ -395,7 +426,132 @@ class ParticipantTestCase(APITestCase):
         ]
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(data, result)
+        self.assertEqual(data["results"], result)
+        self.assertIsNone(data["next"])
+
+    def test_participant_list_page_size(self):
+        """Проверка постраничного вывода участников (курсор)"""
+
+        Participant.objects.bulk_create(
+            Participant(
+                name=f"ИП {number}",
+                email=f"ip{number}@list.ru",
+                country="Россия",
+                city="Москва",
+                street="Московская",
+                house="5",
+                unit_name="ИП",
+            )
+            for number in range(3)
+        )
+        url = reverse("participants:list")
+        response = self.client.get(url, {"page_size": 2})
+        data = response.json()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(data["results"]), 2)
+        self.assertIsNotNone(data["next"])
+
+        response = self.client.get(data["next"])
+        data = response.json()
+        self.assertEqual(len(data["results"]), 2)
+        self.assertIsNone(data["next"])
+        self.assertEqual(data["results"][-1]["id"], self.participant.pk)
+
+    def test_participant_list_is_cached(self):
+        """Повторный запрос списка отдается из кеша,
+        изменение участника сбрасывает кеш"""
+
+        url = reverse("participants:list")
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.json()["results"][0]["country"], "Другая")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.participant.country = "Россия"
+            self.participant.save()
+            # До фиксации транзакции кеш не сбрасывается
+            response = self.client.get(url)
+            self.assertEqual(response.json()["results"][0]["country"], "Другая")
+        response = self.client.get(url)
+        self.assertEqual(response.json()["results"][0]["country"], "Россия")
+
+    def test_participant_retrieve_is_cached(self):
+        """Повторный просмотр участника отдается из кеша,
+        изменение задолженности сбрасывает кеш"""
+
+        url = reverse("participants:view", args=(self.participant.pk,))
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.json()["debt"], "0.00")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.participant.set_debt(10)
+        response = self.client.get(url)
+        self.assertEqual(response.json()["debt"], "10.00")
+
+    def test_participant_retrieve_not_modified(self):
+        """Условный запрос участника: 304, пока участник не изменился"""
+
+        url = reverse("participants:view", args=(self.participant.pk,))
+        response = self.client.get(url)
+        etag = response["ETag"]
+        self.assertIn("Last-Modified", response)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.participant.name = "ООО Мир и Ко"
+            self.participant.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_participant_expanded_not_modified(self):
+        """Развернутый просмотр меняется при изменении поставщика"""
+
+        customer = Participant.objects.create(
+            name="ИП Петров",
+            email="ip@list.ru",
+            country="Россия",
+            city="Тула",
+            street="Ленина",
+            house="1",
+            unit_name="ИП",
+            supplier=self.participant,
+        )
+        url = reverse("participants:view", args=(customer.pk,))
+        etag = self.client.get(url, {"expand": "1"})["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {"expand": "1"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.participant.name = "ООО Мир и Ко"
+            self.participant.save()
+        response = self.client.get(url, {"expand": "1"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["supplier"]["name"], "ООО Мир и Ко")
+
+    def test_participant_list_not_modified(self):
+        """Условный запрос списка: 304 без обращения к базе,
+        пока таблица не изменилась"""
+
+        url = reverse("participants:list")
+        response = self.client.get(url)
+        last_modified = response["Last-Modified"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.participant.set_debt(5)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
 
     def test_participant_list_is_false(self):
         """Проверка списка участников (нет доступа)"""
@@ -405,6 +561,1352 @@ class ParticipantTestCase(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_participant_list_filter(self):
+        """Фильтры списка: город, уровень, звено, диапазон задолженности"""
+
+        for number, (city, unit_name, debt) in enumerate(
+            (
+                ("Москва", "розничная сеть", 100),
+                ("Тула", "ИП", 500),
+                ("Тверь", "ИП", 1000),
+            )
+        ):
+            Participant.objects.create(
+                name=f"Участник {number}",
+                email=f"user{number}@list.ru",
+                country="Россия",
+                city=city,
+                street="Ленина",
+                house="1",
+                unit_name=unit_name,
+                supplier=self.participant,
+                debt=debt,
+            )
+        url = reverse("participants:list")
+
+        def emails(params):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return [item["email"] for item in response.json()["results"]]
+
+        self.assertEqual(
+            emails({"city__in": "Москва,Тула"}), ["user1@list.ru", "user0@list.ru"]
+        )
+        self.assertEqual(
+            emails({"unit_name": "ИП", "level": "1", "debt__gte": 600}),
+            ["user2@list.ru"],
+        )
+        self.assertEqual(
+            emails({"debt__range": "100,500", "ordering": "debt"}),
+            ["user0@list.ru", "user1@list.ru"],
+        )
+        self.assertEqual(emails({"level__isnull": True}), [])
+        self.assertEqual(emails({"created_at__lte": "2000-01-01T00:00:00Z"}), [])
+
+        response = self.client.get(url, {"debt__gte": "много"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_participant_list_ordering(self):
+        """Сортировка списка только по разрешенным полям"""
+
+        for number in range(3):
+            Participant.objects.create(
+                name=f"Участник {number}",
+                email=f"user{number}@list.ru",
+                country="Россия",
+                city="Тула",
+                street="Ленина",
+                house="1",
+                unit_name="ИП",
+                supplier=self.participant,
+                debt=10 - number,
+            )
+        url = reverse("participants:list")
+        response = self.client.get(url, {"ordering": "-debt", "page_size": 2})
+        self.assertEqual(
+            [item["debt"] for item in response.json()["results"]], ["10.00", "9.00"]
+        )
+        response = self.client.get(response.json()["next"])
+        self.assertEqual(
+            [item["debt"] for item in response.json()["results"]], ["8.00", "0.00"]
+        )
+
+        # Сортировка по полю без индекса не применяется
+        response = self.client.get(url, {"ordering": "name"})
+        self.assertEqual(response.json()["results"][0]["email"], "user2@list.ru")
+
+    def test_participant_list_ordering_ties(self):
+        """
+        Сортировка по неуникальному полю: равные значения упорядочены по id,
+        страницы без смещения (OFFSET) и без пропусков и повторов
+        """
+
+        Participant.objects.bulk_create(
+            Participant(
+                name=f"ИП {number}",
+                email=f"ip{number}@list.ru",
+                country="Россия",
+                city="Москва",
+                street="Московская",
+                house="5",
+                unit_name="ИП",
+            )
+            for number in range(6)
+        )
+        expected = list(
+            Participant.objects.order_by("-debt", "-pk").values_list("pk", flat=True)
+        )
+        url = reverse("participants:list")
+        params = {"ordering": "-debt", "page_size": 2}
+        ids, pages = [], []
+        while url:
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertFalse(
+                any("OFFSET" in query["sql"] for query in captured.captured_queries)
+            )
+            data = response.json()
+            ids += [item["id"] for item in data["results"]]
+            pages.append(data)
+            url, params = data["next"], None
+        self.assertEqual(ids, expected)
+
+        response = self.client.get(pages[-1]["previous"])
+        self.assertEqual(
+            [item["id"] for item in response.json()["results"]], expected[4:6]
+        )
+
+    def test_participant_export(self):
+        """Выгрузка участников потоком (CSV/NDJSON) с фильтром по стране"""
+
+        Participant.objects.create(
+            name="ИП Петров",
+            email="ip@list.ru",
+            country="Россия",
+            city="Тула",
+            street="Ленина",
+            house="1",
+            unit_name="ИП",
+            supplier=self.participant,
+        )
+        url = reverse("participants:export", args=["csv"])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"country": "Россия"})
+            content = b"".join(response.streaming_content).decode()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(len(queries), 1)
+        lines = content.splitlines()
+        self.assertEqual(
+            lines[0],
+            "id,name,email,country,city,street,house,unit_name,level,supplier,debt",
+        )
+        self.assertEqual(len(lines), 2)
+        self.assertIn("ИП Петров,ip@list.ru,Россия,Тула", lines[1])
+
+        url = reverse("participants:export", args=["ndjson"])
+        response = self.client.get(url)
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual([row["email"] for row in rows], ["vvv@list.ru", "ip@list.ru"])
+        self.assertEqual(rows[1]["supplier"], self.participant.pk)
+        self.assertEqual(rows[1]["debt"], "0.00")
+
+        url = reverse("participants:export", args=["xml"])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def tearDown(self):
         translation.activate(settings.LANGUAGE_CODE)
         super().tearDown()
+
+
+class ParticipantNetworkTestCase(APITestCase):
+    def setUp(self) -> None:
+
+        super().setUp()
+        self.factory = Participant.objects.create(
+            name="Завод",
+            email="factory@list.ru",
+            country="Россия",
+            city="Москва",
+            street="Заводская",
+            house="1",
+            unit_name="завод",
+            level=0,
+        )
+        self.retail = Participant.objects.create(
+            name="Розничная сеть",
+            email="retail@list.ru",
+            country="Россия",
+            city="Москва",
+            street="Торговая",
+            house="2",
+            unit_name="розничная сеть",
+            level=1,
+            supplier=self.factory,
+        )
+        self.entrepreneur = Participant.objects.create(
+            name="ИП Петров",
+            email="ip@list.ru",
+            country="Россия",
+            city="Тверь",
+            street="Новая",
+            house="3",
+            unit_name="ИП",
+            level=2,
+            supplier=self.retail,
+        )
+        self.user = User.objects.create(
+            email="factory@list.ru",
+            last_name="Иванов",
+            first_name="Иван",
+            employer=self.factory,
+            is_staff=True,
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_tree_path(self):
+        """Проверка пути в иерархии"""
+
+        self.assertEqual(self.factory.tree_path, "/")
+        self.assertEqual(self.retail.tree_path, f"/{self.factory.pk}/")
+        self.assertEqual(
+            self.entrepreneur.tree_path, f"/{self.factory.pk}/{self.retail.pk}/"
+        )
+
+    def test_downstream(self):
+        """Проверка списка покупателей по цепочке (одним запросом)"""
+
+        url = reverse("participants:downstream", args=(self.factory.pk,))
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        ids = [item["id"] for item in response.json()["results"]]
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(ids, [self.entrepreneur.pk, self.retail.pk])
+
+    def test_upstream(self):
+        """Проверка списка поставщиков по цепочке"""
+
+        url = reverse("participants:upstream", args=(self.entrepreneur.pk,))
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        ids = [item["id"] for item in response.json()]
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(ids, [self.factory.pk, self.retail.pk])
+
+    def test_upstream_is_false(self):
+        """Проверка списка поставщиков (нет такого участника)"""
+
+        url = reverse("participants:upstream", args=(1001,))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_supplier_change_moves_subtree(self):
+        """Смена поставщика переносит всех покупателей участника"""
+
+        factory = Participant.objects.create(
+            name="Второй завод",
+            email="factory2@list.ru",
+            country="Россия",
+            city="Тула",
+            street="Заводская",
+            house="7",
+            unit_name="завод",
+            level=0,
+        )
+        self.retail.supplier = factory
+        self.retail.save()
+
+        self.entrepreneur.refresh_from_db()
+        self.assertEqual(
+            self.entrepreneur.tree_path, f"/{factory.pk}/{self.retail.pk}/"
+        )
+
+    def assert_tree_path_index(self, queries):
+        """Выборка покупателей по пути идет по индексу participant_tree_path_idx"""
+        (sql,) = [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith("SELECT") and "LIKE" in query["sql"]
+        ]
+        with connection.cursor() as cursor:
+            # На маленькой таблице планировщик и так выбрал бы Seq Scan
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute(f"EXPLAIN {sql}")
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+            cursor.execute("SET LOCAL enable_seqscan = on")
+        self.assertIn("participant_tree_path_idx", plan)
+
+    def test_downstream_uses_index(self):
+        """Покупатели по цепочке выбираются по индексу пути"""
+
+        url = reverse("participants:downstream", args=(self.factory.pk,))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        self.assert_tree_path_index(queries)
+
+    def test_delete_uses_index(self):
+        """Покупатели удаляемого участника выбираются по индексу пути"""
+
+        with CaptureQueriesContext(connection) as queries:
+            self.retail.delete()
+        self.assert_tree_path_index(queries)
+
+    def test_supplier_delete_detaches_subtree(self):
+        """Удаление поставщика: его покупатели становятся верхним звеном"""
+
+        self.retail.delete()
+
+        self.entrepreneur.refresh_from_db()
+        self.assertIsNone(self.entrepreneur.supplier)
+        self.assertEqual(self.entrepreneur.tree_path, "/")
+        self.assertIsNone(self.entrepreneur.level)
+
+    def test_factory_delete_relevels_subtree(self):
+        """Удаление завода: уровни покупателей пересчитываются по цепочке"""
+
+        self.factory.delete()
+
+        self.retail.refresh_from_db()
+        self.entrepreneur.refresh_from_db()
+        self.assertIsNone(self.retail.level)
+        self.assertEqual(self.entrepreneur.level, 1)
+        self.assertEqual(self.entrepreneur.tree_path, f"/{self.retail.pk}/")
+
+    def test_set_debt(self):
+        """Изменение задолженности: журнал и сводка поставщика"""
+
+        self.entrepreneur.set_debt(100, author=self.user)
+        self.entrepreneur.set_debt(40)
+
+        self.entrepreneur.refresh_from_db()
+        self.assertEqual(self.entrepreneur.debt, 40)
+        self.assertEqual(
+            list(
+                self.entrepreneur.debt_changes.values_list(
+                    "previous_debt", "amount", "debt"
+                )
+            ),
+            [(100, -60, 40), (0, 100, 100)],
+        )
+        self.assertEqual(self.retail.receivable.total, 40)
+
+    def test_save_debt(self):
+        """Задолженность при создании и при сохранении записывается в журнал"""
+
+        customer = Participant.objects.create(
+            name="ИП Сидоров",
+            email="sidorov@list.ru",
+            country="Россия",
+            city="Тула",
+            street="Ленина",
+            house="2",
+            unit_name="ИП",
+            supplier=self.retail,
+            debt=25,
+        )
+        stale = Participant.objects.get(pk=customer.pk)
+        customer.debt = 10
+        customer.save()
+        # Устаревший экземпляр не перезаписывает задолженность
+        stale.name = "ИП Сидоров и К"
+        stale.save()
+
+        customer.refresh_from_db()
+        self.assertEqual(customer.debt, 10)
+        self.assertEqual(customer.name, "ИП Сидоров и К")
+        self.assertEqual(
+            list(
+                customer.debt_changes.values_list("previous_debt", "amount", "debt")
+            ),
+            [(25, -15, 10), (0, 25, 25)],
+        )
+        self.assertEqual(SupplierReceivable.objects.get(pk=self.retail.pk).total, 10)
+
+    def test_receivables(self):
+        """Сводная задолженность покупателей перед поставщиками"""
+
+        self.retail.set_debt(70)
+        self.entrepreneur.set_debt(30)
+
+        url = reverse("participants:receivables")
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json()["results"],
+            [
+                {
+                    "supplier": self.retail.pk,
+                    "name": "Розничная сеть",
+                    "total": "30.00",
+                },
+                {
+                    "supplier": self.factory.pk,
+                    "name": "Завод",
+                    "total": "70.00",
+                },
+            ],
+        )
+
+    def test_receivables_follow_supplier(self):
+        """Смена поставщика переносит задолженность в сводку нового"""
+
+        factory = Participant.objects.create(
+            name="Второй завод",
+            email="factory2@list.ru",
+            country="Россия",
+            city="Тула",
+            street="Заводская",
+            house="7",
+            unit_name="завод",
+        )
+        self.retail.set_debt(70)
+        self.retail.supplier = factory
+        self.retail.save()
+
+        self.assertEqual(SupplierReceivable.objects.get(pk=self.factory.pk).total, 0)
+        self.assertEqual(SupplierReceivable.objects.get(pk=factory.pk).total, 70)
+
+        self.retail.delete()
+        self.assertEqual(SupplierReceivable.objects.get(pk=factory.pk).total, 0)
+
+    def test_level_derived_from_supplier(self):
+        """Уровень вычисляется по цепочке поставщиков"""
+
+        self.assertEqual(self.factory.level, 0)
+        self.assertEqual(self.retail.level, 1)
+        self.assertEqual(self.entrepreneur.level, 2)
+
+    def test_factory_with_customers_stays_factory(self):
+        """Завод с покупателями не может сменить звено и выйти из сети"""
+
+        url = reverse("participants:update", args=(self.factory.pk,))
+        response = self.client.patch(url, {"unit_name": "ИП"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json(),
+            {
+                "non_field_errors": [
+                    "У Вас есть покупатели, без поставщика звено может быть "
+                    "только заводом."
+                ]
+            },
+        )
+
+        self.factory.unit_name = "ИП"
+        with self.assertRaises(ValueError):
+            self.factory.save()
+        self.factory.refresh_from_db()
+        self.retail.refresh_from_db()
+        self.assertEqual(self.factory.level, 0)
+        self.assertEqual(self.retail.level, 1)
+
+    def test_supplier_change_is_constant_queries(self):
+        """Смена поставщика сети: число запросов не зависит от числа покупателей"""
+
+        factory = Participant.objects.create(
+            name="Второй завод",
+            email="factory2@list.ru",
+            country="Россия",
+            city="Тула",
+            street="Заводская",
+            house="7",
+            unit_name="завод",
+        )
+        url = reverse("participants:update", args=(self.retail.pk,))
+        data = {
+            "name": "Розничная сеть",
+            "email": "retail@list.ru",
+            "country": "Россия",
+            "city": "Москва",
+            "street": "Торговая",
+            "house": "2",
+            "unit_name": "розничная сеть",
+            "supplier": factory.pk,
+        }
+        self.user.employer = self.retail
+        self.user.save()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as small_subtree:
+                response = self.client.put(url, data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        for number in range(50):
+            Participant.objects.create(
+                name=f"ИП {number}",
+                email=f"ip{number}@list.ru",
+                country="Россия",
+                city="Тверь",
+                street="Новая",
+                house="3",
+                unit_name="ИП",
+                supplier=self.retail,
+            )
+        data["supplier"] = self.factory.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as large_subtree:
+                response = self.client.put(url, data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(small_subtree), len(large_subtree))
+        self.assertEqual(
+            Participant.objects.filter(
+                tree_path__startswith=f"/{self.factory.pk}/{self.retail.pk}/",
+                level=2,
+            ).count(),
+            51,
+        )
+
+    def test_supplier_with_customers_is_false(self):
+        """Участник с покупателями не может стать вторым уровнем"""
+
+        retail = Participant.objects.create(
+            name="Вторая сеть",
+            email="retail2@list.ru",
+            country="Россия",
+            city="Тула",
+            street="Торговая",
+            house="9",
+            unit_name="розничная сеть",
+            supplier=self.factory,
+        )
+        self.user.employer = self.retail
+        self.user.save()
+        url = reverse("participants:update", args=(self.retail.pk,))
+        response = self.client.patch(url, {"supplier": retail.pk})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json(),
+            {
+                "non_field_errors": [
+                    "У Вас есть покупатели, поставщик должен быть с уровнем '0'."
+                ]
+            },
+        )
+
+
+class ParticipantHierarchyTestCase(APITestCase):
+    def setUp(self) -> None:
+
+        super().setUp()
+        cache.clear()
+        self.factory = Participant.objects.create(
+            name="Завод",
+            email="factory@list.ru",
+            country="Россия",
+            city="Москва",
+            street="Заводская",
+            house="1",
+            unit_name="завод",
+        )
+        self.retail = Participant.objects.create(
+            name="Розничная сеть",
+            email="retail@list.ru",
+            country="Россия",
+            city="Москва",
+            street="Торговая",
+            house="2",
+            unit_name="розничная сеть",
+            supplier=self.factory,
+        )
+        self.entrepreneur = Participant.objects.create(
+            name="ИП Петров",
+            email="ip@list.ru",
+            country="Россия",
+            city="Тверь",
+            street="Новая",
+            house="3",
+            unit_name="ИП",
+            supplier=self.retail,
+        )
+        self.user = User.objects.create(
+            email="retail@list.ru",
+            last_name="Иванов",
+            first_name="Иван",
+            employer=self.retail,
+            is_staff=True,
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("participants:update", args=(self.retail.pk,))
+        self.data = {
+            "name": "Розничная сеть",
+            "email": "retail@list.ru",
+            "country": "Россия",
+            "city": "Москва",
+            "street": "Торговая",
+            "house": "2",
+            "unit_name": "розничная сеть",
+            "supplier": self.factory.pk,
+        }
+
+    def test_cycle(self):
+        """Покупатель участника (на любой глубине) не может стать его поставщиком"""
+
+        with self.assertRaisesMessage(
+            ValidationError, "Поставщик не может быть покупателем участника."
+        ):
+            check_supplier(
+                "factory@list.ru", "розничная сеть", self.retail, self.factory
+            )
+        self.factory.supplier = self.entrepreneur
+        with self.assertRaises(ValueError):
+            self.factory.save()
+        self.factory.refresh_from_db()
+        self.assertIsNone(self.factory.supplier_id)
+
+    @override_settings(PARTICIPANT_MAX_LEVEL=3)
+    def test_max_level(self):
+        """Глубина сети задается PARTICIPANT_MAX_LEVEL"""
+
+        wholesale = Participant.objects.create(
+            name="Дистрибьютор",
+            email="wholesale@list.ru",
+            country="Россия",
+            city="Тула",
+            street="Складская",
+            house="5",
+            unit_name="розничная сеть",
+            supplier=self.factory,
+        )
+        response = self.client.put(self.url, {**self.data, "supplier": wholesale.pk})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.entrepreneur.refresh_from_db()
+        self.assertEqual(self.entrepreneur.level, 3)
+        self.assertEqual(self.entrepreneur.get_height(), 0)
+        self.assertEqual(wholesale.get_height(), 2)
+
+        self.user.employer = wholesale
+        self.user.save()
+        self.user.refresh_from_db()
+        url = reverse("participants:update", args=(wholesale.pk,))
+        retail = Participant.objects.create(
+            name="Вторая сеть",
+            email="retail2@list.ru",
+            country="Россия",
+            city="Тула",
+            street="Торговая",
+            house="8",
+            unit_name="розничная сеть",
+            supplier=self.factory,
+        )
+        response = self.client.patch(url, {"supplier": retail.pk})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json()["non_field_errors"],
+            ["У Вас есть покупатели, поставщик должен быть с уровнем '0'."],
+        )
+        with self.assertRaisesMessage(
+            ValidationError, "Поставщик с уровнем '3' не осуществляет поставки."
+        ):
+            check_supplier("new@list.ru", "ИП", self.entrepreneur)
+
+        with override_settings(PARTICIPANT_MAX_LEVEL=4):
+            response = self.client.patch(url, {"supplier": retail.pk})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.entrepreneur.refresh_from_db()
+        self.assertEqual(self.entrepreneur.level, 4)
+
+    def test_update_validation_from_cache(self):
+        """Повторная проверка поставщика - без запросов к базе"""
+
+        def checks_customers(data, method="put"):
+            # Был ли запрос наличия покупателей (EXISTS), число запросов
+            with CaptureQueriesContext(connection) as captured:
+                response = getattr(self.client, method)(self.url, data)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            queries = [query["sql"] for query in captured.captured_queries]
+            return any("EXISTS" in sql for sql in queries), len(queries)
+
+        self.assertTrue(checks_customers(self.data)[0])
+        self.assertFalse(checks_customers({**self.data, "city": "Тверь"})[0])
+        # Без поставщика в запросе текущий поставщик берется из кеша:
+        # повторный PATCH - только выборка и изменение участника
+        self.assertTrue(checks_customers({"city": "Тула"}, "patch")[0])
+        self.assertEqual(checks_customers({"city": "Тверь"}, "patch"), (False, 2))
+
+    def test_invalidation(self):
+        """Записи кеша сбрасываются при смене поставщика и удалении"""
+
+        factory = Participant.objects.create(
+            name="Второй завод",
+            email="factory2@list.ru",
+            country="Россия",
+            city="Тула",
+            street="Заводская",
+            house="7",
+            unit_name="завод",
+        )
+        self.assertFalse(get_participant(factory.pk).has_customers)
+        self.assertTrue(get_participant(self.factory.pk).has_customers)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(self.url, {**self.data, "supplier": factory.pk})
+            # До фиксации транзакции кеш не сбрасывается
+            self.assertFalse(get_participant(factory.pk).has_customers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(get_participant(factory.pk).has_customers)
+        self.assertFalse(get_participant(self.factory.pk).has_customers)
+        self.assertEqual(get_participant(self.retail.pk).supplier_id, factory.pk)
+
+        self.assertTrue(get_participant(self.retail.pk).has_customers)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.entrepreneur.delete()
+        self.assertFalse(get_participant(self.retail.pk).has_customers)
+
+    def test_max_level_check(self):
+        """PARTICIPANT_MAX_LEVEL ограничен длиной пути в иерархии"""
+
+        self.assertEqual(check_max_level(None), [])
+        with override_settings(PARTICIPANT_MAX_LEVEL=40):
+            errors = check_max_level(None)
+        self.assertEqual([error.id for error in errors], ["participants.E001"])
+
+    def test_has_customers_rule(self):
+        """У участника с покупателями поставщик только нулевого уровня"""
+
+        retail = Participant.objects.create(
+            name="Вторая сеть",
+            email="retail2@list.ru",
+            country="Россия",
+            city="Тула",
+            street="Торговая",
+            house="8",
+            unit_name="розничная сеть",
+            supplier=self.factory,
+        )
+        response = self.client.put(self.url, {**self.data, "supplier": retail.pk})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json()["non_field_errors"],
+            ["У Вас есть покупатели, поставщик должен быть с уровнем '0'."],
+        )
+
+    def tearDown(self):
+        cache.clear()
+        super().tearDown()
+
+
+class ParticipantConcurrencyTestCase(TransactionTestCase):
+    def setUp(self) -> None:
+
+        super().setUp()
+        self.first, self.second = (
+            Participant.objects.create(
+                name=f"Сеть {number}",
+                email=f"retail{number}@list.ru",
+                country="Россия",
+                city="Москва",
+                street="Торговая",
+                house="2",
+                unit_name="розничная сеть",
+            )
+            for number in range(2)
+        )
+
+    def test_concurrent_cycle(self):
+        """Встречные смены поставщиков выполняются по очереди, без цикла"""
+
+        errors = []
+
+        def set_second_supplier():
+            second = Participant.objects.get(pk=self.second.pk)
+            second.supplier_id = self.first.pk
+            try:
+                second.save()
+            except ValueError as error:
+                errors.append(error)
+            finally:
+                connections.close_all()
+
+        with transaction.atomic():
+            self.first.supplier = self.second
+            self.first.save()
+            thread = threading.Thread(target=set_second_supplier)
+            thread.start()
+            # Смена поставщика второго участника ждет блокировки
+            thread.join(0.5)
+            self.assertTrue(thread.is_alive())
+        thread.join()
+        self.assertEqual(len(errors), 1)
+        self.second.refresh_from_db()
+        self.assertIsNone(self.second.supplier_id)
+
+
+class ParticipantAdminTestCase(APITestCase):
+    def setUp(self) -> None:
+
+        super().setUp()
+        self.factory = Participant.objects.create(
+            name="Завод",
+            email="factory@list.ru",
+            country="Россия",
+            city="Москва",
+            street="Заводская",
+            house="1",
+            unit_name="завод",
+        )
+        Participant.objects.bulk_create(
+            Participant(
+                name=f"ИП {number}",
+                email=f"ip{number}@list.ru",
+                country="Россия",
+                city="Тверь",
+                street="Новая",
+                house="3",
+                unit_name="ИП",
+                level=1,
+                supplier=self.factory,
+                tree_path=f"/{self.factory.pk}/",
+                debt=number,
+            )
+            for number in range(5)
+        )
+        SupplierReceivable.objects.add({self.factory.pk: 10})
+        self.admin = User.objects.create(
+            email="admin@list.ru",
+            last_name="Иванов",
+            first_name="Иван",
+            is_staff=True,
+            is_superuser=True,
+        )
+        self.client.force_login(self.admin)
+
+    def test_clear_debt(self):
+        """Очистка задолженности в админке (одним UPDATE, с журналом)"""
+
+        url = reverse("admin:participants_participant_changelist")
+        data = {
+            "action": "is_clear_debt",
+            "_selected_action": list(Participant.objects.values_list("pk", flat=True)),
+        }
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertFalse(Participant.objects.exclude(debt=0).exists())
+        self.assertEqual(DebtChange.objects.count(), 4)
+        self.assertEqual(
+            sorted(DebtChange.objects.values_list("previous_debt", flat=True)),
+            [1, 2, 3, 4],
+        )
+        self.assertFalse(DebtChange.objects.exclude(author=self.admin).exists())
+        self.assertEqual(self.factory.receivable.total, 0)
+
+    def test_change_debt(self):
+        """Изменение задолженности в админке записывается в журнал"""
+
+        participant = Participant.objects.get(email="ip1@list.ru")
+        url = reverse("admin:participants_participant_change", args=(participant.pk,))
+        data = {
+            "name": participant.name,
+            "email": participant.email,
+            "country": participant.country,
+            "city": participant.city,
+            "street": participant.street,
+            "house": participant.house,
+            "unit_name": participant.unit_name,
+            "supplier": self.factory.pk,
+            "debt": "15.50",
+        }
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        change = DebtChange.objects.get()
+        self.assertEqual(change.previous_debt, 1)
+        self.assertEqual(float(change.amount), 14.5)
+        self.factory.receivable.refresh_from_db()
+        self.assertEqual(float(self.factory.receivable.total), 24.5)
+
+    def test_changelist_queries(self):
+        """
+        Список в админке: число запросов не зависит от числа участников,
+        значения фильтра по городу - из кеша
+        """
+
+        cache.clear()
+        url = reverse("admin:participants_participant_changelist")
+        with CaptureQueriesContext(connection) as first:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertContains(response, "Тверь")
+
+        Participant.objects.bulk_create(
+            Participant(
+                name=f"Сеть {number}",
+                email=f"network{number}@list.ru",
+                country="Россия",
+                city="Тула",
+                street="Новая",
+                house="3",
+                unit_name="розничная сеть",
+                level=1,
+                supplier=self.factory,
+                tree_path=f"/{self.factory.pk}/",
+            )
+            for number in range(20)
+        )
+        with CaptureQueriesContext(connection) as second:
+            response = self.client.get(url)
+        self.assertEqual(len(second), len(first) - 1)
+        self.assertFalse(
+            any("DISTINCT" in query["sql"] for query in second.captured_queries)
+        )
+        # Новый город появится в фильтре после истечения кеша
+        self.assertNotContains(response, "?city=%D0%A2%D1%83%D0%BB%D0%B0")
+
+    def test_estimated_count(self):
+        """Для больших выборок число записей - оценка, без COUNT(*)"""
+
+        queryset = Participant.objects.all()
+        self.assertEqual(EstimatedCountPaginator(queryset, 10).count, 6)
+        with override_settings(ADMIN_EXACT_COUNT_LIMIT=0):
+            with CaptureQueriesContext(connection) as context:
+                count = EstimatedCountPaginator(queryset, 10).count
+        self.assertIsInstance(count, int)
+        self.assertEqual(len(context), 1)
+        self.assertTrue(context.captured_queries[0]["sql"].startswith("EXPLAIN"))
+
+    def test_change_form_checks_supplier(self):
+        """В админке поставщик проверяется так же, как в API"""
+
+        customer = Participant.objects.create(
+            name="ИП Петров",
+            email="petrov@list.ru",
+            country="Россия",
+            city="Тверь",
+            street="Новая",
+            house="5",
+            unit_name="ИП",
+            supplier=Participant.objects.filter(supplier=self.factory).first(),
+        )
+        retail = Participant.objects.create(
+            name="Сеть",
+            email="retail@list.ru",
+            country="Россия",
+            city="Тверь",
+            street="Новая",
+            house="3",
+            unit_name="розничная сеть",
+        )
+        url = reverse("admin:participants_participant_change", args=(retail.pk,))
+        data = {
+            "name": "Сеть",
+            "email": "retail@list.ru",
+            "country": "Россия",
+            "city": "Тверь",
+            "street": "Новая",
+            "house": "3",
+            "unit_name": "розничная сеть",
+            "supplier": customer.pk,
+            "debt": "0",
+        }
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertContains(response, "Поставщик с уровнем &#x27;2&#x27;")
+
+        response = self.client.post(url, {**data, "supplier": self.factory.pk})
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        retail.refresh_from_db()
+        self.assertEqual(retail.level, 1)
+
+    def test_supplier_autocomplete(self):
+        """Поставщик выбирается поиском по началу наименования"""
+
+        url = reverse("admin:participants_participant_change", args=(self.factory.pk,))
+        response = self.client.get(url)
+        self.assertContains(response, "admin-autocomplete")
+
+        response = self.client.get(
+            reverse("admin:autocomplete"),
+            {
+                "term": "зав",
+                "app_label": "participants",
+                "model_name": "participant",
+                "field_name": "supplier",
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json()["results"], [{"id": str(self.factory.pk), "text": "Завод"}]
+        )
+
+
+class ParticipantQueryCountTestCase(APITestCase):
+    """Число запросов каждого метода API не зависит от числа участников"""
+
+    SIZES = (1, 100, 10000)
+
+    def setUp(self) -> None:
+
+        super().setUp()
+        self.factory = Participant.objects.create(
+            name="Завод",
+            email="factory@list.ru",
+            country="Россия",
+            city="Москва",
+            street="Заводская",
+            house="1",
+            unit_name="завод",
+        )
+        self.user = User.objects.create(
+            email="factory@list.ru",
+            last_name="Иванов",
+            first_name="Иван",
+            employer=self.factory,
+            is_staff=True,
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def grow(self, size):
+        """Покупатели завода, всего size участников"""
+        count = Participant.objects.count()
+        Participant.objects.bulk_create(
+            Participant(
+                name=f"ИП {number}",
+                email=f"ip{number}@list.ru",
+                country="Россия",
+                city="Тула",
+                street="Ленина",
+                house="1",
+                unit_name="ИП",
+                supplier=self.factory,
+                tree_path=self.factory.subtree_path,
+                level=1,
+                debt=1,
+            )
+            for number in range(count, size)
+        )
+        SupplierReceivable.objects.update_or_create(
+            supplier=self.factory, defaults={"total": size - 1}
+        )
+        return Participant.objects.order_by("pk").last()
+
+    def assert_queries(self, number, method, url, data=None, status_code=200):
+        cache.clear()
+        with self.assertNumQueries(number):
+            response = getattr(self.client, method)(url, data, format="json")
+            if response.streaming:
+                b"".join(response.streaming_content)
+        self.assertEqual(response.status_code, status_code)
+        return response
+
+    def test_query_count(self):
+        """Чтение, выгрузка, изменение и удаление при 1, 100 и 10000 участниках"""
+
+        for size in self.SIZES:
+            with self.subTest(size=size):
+                customer = self.grow(size)
+                self.assertEqual(Participant.objects.count(), size)
+                for expand in ("", "1"):
+                    self.assert_queries(
+                        1, "get", reverse("participants:list"), {"expand": expand}
+                    )
+                    self.assert_queries(
+                        1,
+                        "get",
+                        reverse("participants:view", args=[customer.pk]),
+                        {"expand": expand},
+                    )
+                    self.assert_queries(
+                        2,
+                        "get",
+                        reverse("participants:downstream", args=[self.factory.pk]),
+                        {"expand": expand},
+                    )
+                    # У завода нет поставщиков - выборка пуста без запроса
+                    self.assert_queries(
+                        2 if size > 1 else 1,
+                        "get",
+                        reverse("participants:upstream", args=[customer.pk]),
+                        {"expand": expand},
+                    )
+                self.assert_queries(
+                    1, "get", reverse("participants:export", args=["csv"])
+                )
+                self.assert_queries(1, "get", reverse("participants:receivables"))
+                # Поставщик не изменился - путь и уровень не пересчитываются
+                self.assert_queries(
+                    2,
+                    "patch",
+                    reverse("participants:update", args=[self.factory.pk]),
+                    {"city": "Тверь"},
+                )
+                self.assert_queries(
+                    4,
+                    "post",
+                    reverse("participants:create"),
+                    {
+                        "name": "ИП Новый",
+                        "email": f"new{size}@list.ru",
+                        "country": "Россия",
+                        "city": "Тула",
+                        "street": "Ленина",
+                        "house": "1",
+                        "unit_name": "ИП",
+                    },
+                    status_code=status.HTTP_201_CREATED,
+                )
+
+        response = self.assert_queries(
+            1,
+            "get",
+            reverse("participants:view", args=[customer.pk]),
+            {"expand": "1"},
+        )
+        self.assertEqual(
+            response.json()["supplier"],
+            {"id": self.factory.pk, "name": "Завод", "level": "0"},
+        )
+        self.assert_queries(
+            12,
+            "delete",
+            reverse("participants:delete", args=[self.factory.pk]),
+            status_code=status.HTTP_204_NO_CONTENT,
+        )
+        self.assertFalse(Participant.objects.filter(level=1).exists())
+
+    def tearDown(self):
+        cache.clear()
+        super().tearDown()
+
+
+class ParticipantImportTestCase(APITestCase):
+    def setUp(self) -> None:
+
+        super().setUp()
+        self.factory = Participant.objects.create(
+            name="ПАО Завод",
+            email="factory@list.ru",
+            country="Россия",
+            city="Москва",
+            street="Московская",
+            house="5",
+            unit_name="завод",
+        )
+        self.directory = tempfile.TemporaryDirectory()
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+        return path
+
+    def import_participants(self, path, **options):
+        stdout, stderr = StringIO(), StringIO()
+        call_command(
+            "import_participants", path, stdout=stdout, stderr=stderr, **options
+        )
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import_csv(self):
+        """Импорт CSV: поставщики из базы и из этой же порции файла"""
+
+        path = self.write(
+            "participants.csv",
+            "name,email,country,city,street,house,unit_name,supplier\n"
+            "Сеть,net@list.ru,Россия,Тула,Ленина,1,розничная сеть,factory@list.ru\n"
+            "ИП Иванов,ip@list.ru,Россия,Тула,Ленина,2,ИП,net@list.ru\n"
+            "ИП Петров,ip2@list.ru,Россия,Тула,Ленина,3,ИП,\n",
+        )
+        with CaptureQueriesContext(connection) as queries:
+            stdout, stderr = self.import_participants(path)
+        self.assertEqual(stderr, "")
+        self.assertIn("создано: 3", stdout)
+        self.assertEqual(
+            len(
+                [
+                    query
+                    for query in queries
+                    if query["sql"].startswith('INSERT INTO "participants_participant"')
+                ]
+            ),
+            2,
+        )
+        net = Participant.objects.get(email="net@list.ru")
+        ip = Participant.objects.get(email="ip@list.ru")
+        self.assertEqual(net.level, 1)
+        self.assertEqual(ip.level, 2)
+        self.assertEqual(ip.tree_path, f"/{self.factory.pk}/{net.pk}/")
+        self.assertIsNone(Participant.objects.get(email="ip2@list.ru").level)
+        self.assertFalse(ImportProgress.objects.exists())
+
+    def test_import_ndjson_errors(self):
+        """Импорт NDJSON: ошибочные строки пропускаются, уже записанные - тоже"""
+
+        rows = [
+            {
+                "name": "Сеть",
+                "email": "net@list.ru",
+                "country": "Россия",
+                "city": "Тула",
+                "street": "Ленина",
+                "house": "1",
+                "unit_name": "завод",
+                "supplier": "factory@list.ru",
+            },
+            {
+                "name": "Сеть",
+                "email": "net@list.ru",
+                "country": "Россия",
+                "city": "Тула",
+                "street": "Ленина",
+                "house": "1",
+                "unit_name": "розничная сеть",
+                "supplier": "nobody@list.ru",
+            },
+            {"name": "Завод", "email": "factory@list.ru"},
+        ]
+        path = self.write(
+            "participants.ndjson",
+            "\n".join(json.dumps(row, ensure_ascii=False) for row in rows)
+            + "\n{broken\n",
+        )
+        stdout, stderr = self.import_participants(path)
+        self.assertIn('Строка 1: {"non_field_errors": ["Завод', stderr)
+        self.assertIn("Завод всегда находится на нулевом(0) уровне.", stderr)
+        self.assertIn("Нет такого поставщика.", stderr)
+        self.assertIn("Строка 4: Некорректная строка.", stderr)
+        self.assertIn("создано: 0, пропущено: 1, ошибок: 3", stdout)
+        self.assertEqual(Participant.objects.count(), 1)
+
+    def test_import_resume(self):
+        """Импорт продолжается с последней записанной порции"""
+
+        lines = [
+            f"ИП {number},ip{number}@list.ru,Россия,Тула,Ленина,1,ИП,"
+            "factory@list.ru\n"
+            for number in range(5)
+        ]
+        path = self.write(
+            "participants.csv",
+            "name,email,country,city,street,house,unit_name,supplier\n"
+            + "".join(lines),
+        )
+        ImportProgress.objects.create(
+            command="import_participants", path=os.path.abspath(path), line=3
+        )
+        stdout, stderr = self.import_participants(path, resume=True, batch_size=1)
+        self.assertIn("Продолжение импорта со строки 4", stdout)
+        self.assertEqual(
+            set(Participant.objects.values_list("email", flat=True)),
+            {"factory@list.ru", "ip3@list.ru", "ip4@list.ru"},
+        )
+        self.assertFalse(ImportProgress.objects.exists())
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+class ParticipantAsyncTestCase(APITestCase):
+    def setUp(self) -> None:
+
+        super().setUp()
+        self.factory = Participant.objects.create(
+            name="Завод",
+            email="factory@list.ru",
+            country="Россия",
+            city="Москва",
+            street="Заводская",
+            house="1",
+            unit_name="завод",
+            level=0,
+        )
+        self.retail = Participant.objects.create(
+            name="Розничная сеть",
+            email="retail@list.ru",
+            country="Россия",
+            city="Москва",
+            street="Торговая",
+            house="2",
+            unit_name="розничная сеть",
+            level=1,
+            supplier=self.factory,
+        )
+        self.entrepreneur = Participant.objects.create(
+            name="ИП Петров",
+            email="ip@list.ru",
+            country="Россия",
+            city="Тверь",
+            street="Новая",
+            house="3",
+            unit_name="ИП",
+            level=2,
+            supplier=self.retail,
+        )
+        self.user = User.objects.create(
+            email="factory@list.ru",
+            last_name="Иванов",
+            first_name="Иван",
+            employer=self.factory,
+        )
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_async_list(self):
+        """Асинхронный список: страницы по убыванию id и фильтры"""
+
+        url = reverse("participants:async_list")
+        response = self.client.get(url, {"page_size": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["id"] for item in response.json()["results"]],
+            [self.entrepreneur.pk, self.retail.pk],
+        )
+        response = self.client.get(response.json()["next"])
+        self.assertEqual(
+            [item["id"] for item in response.json()["results"]], [self.factory.pk]
+        )
+        self.assertIsNone(response.json()["next"])
+
+        response = self.client.get(url, {"city": "Тверь"})
+        self.assertEqual(
+            [item["name"] for item in response.json()["results"]], ["ИП Петров"]
+        )
+        response = self.client.get(url, {"debt__gte": "много"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_async_view(self):
+        """Асинхронный просмотр участника"""
+
+        url = reverse("participants:async_view", args=(self.retail.pk,))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["name"], "Розничная сеть")
+        self.assertEqual(response.json()["supplier"], self.factory.pk)
+
+        url = reverse("participants:async_view", args=(0,))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_async_chain(self):
+        """Асинхронные цепочки покупателей и поставщиков"""
+
+        url = reverse("participants:async_downstream", args=(self.factory.pk,))
+        response = self.client.get(url)
+        self.assertEqual(
+            [item["id"] for item in response.json()["results"]],
+            [self.entrepreneur.pk, self.retail.pk],
+        )
+        url = reverse("participants:async_upstream", args=(self.entrepreneur.pk,))
+        response = self.client.get(url)
+        self.assertEqual(
+            [item["id"] for item in response.json()["results"]],
+            [self.factory.pk, self.retail.pk],
+        )
+
+    def test_async_permissions(self):
+        """Без токена и без места работы доступа нет"""
+
+        url = reverse("participants:async_list")
+        self.client.credentials()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.user.employer = None
+        self.user.save()
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -5,9 +5,18 @@ from participants.apps import ParticipantsConfig
 from participants.permissions import IsActiveEmployee
 from participants.views import (ParticipantCreateAPIView,
                                 ParticipantDestroyAPIView,
+                                ParticipantDownstreamAPIView,
+                                ParticipantDownstreamAsyncView,
+                                ParticipantExportAPIView,
                                 ParticipantListAPIView,
+                                ParticipantListAsyncView,
                                 ParticipantRetrieveAPIView,
-                                ParticipantUpdateAPIView)
+                                ParticipantRetrieveAsyncView,
+                                ParticipantUpdateAPIView,
+                                ParticipantUpstreamAPIView,
+                                ParticipantUpstreamAsyncView,
+                                SupplierReceivableListAPIView,
+                                SupplierReceivableRetrieveAPIView)
 
 app_name = ParticipantsConfig.name
 
@@ -23,11 +32,64 @@ urlpatterns = [
         ParticipantListAPIView.as_view(permission_classes=(IsActiveEmployee,)),
         name="list",
     ),
+    path(
+        "export/<str:file_format>/",
+        ParticipantExportAPIView.as_view(permission_classes=(IsActiveEmployee,)),
+        name="export",
+    ),
     path(
         "view/<int:pk>/",
         ParticipantRetrieveAPIView.as_view(permission_classes=(IsActiveEmployee,)),
         name="view",
     ),
+    path(
+        "downstream/<int:pk>/",
+        ParticipantDownstreamAPIView.as_view(
+            permission_classes=(IsActiveEmployee,)
+        ),
+        name="downstream",
+    ),
+    path(
+        "upstream/<int:pk>/",
+        ParticipantUpstreamAPIView.as_view(permission_classes=(IsActiveEmployee,)),
+        name="upstream",
+    ),
+    path(
+        "async/",
+        ParticipantListAsyncView.as_view(permission_classes=(IsActiveEmployee,)),
+        name="async_list",
+    ),
+    path(
+        "async/view/<int:pk>/",
+        ParticipantRetrieveAsyncView.as_view(permission_classes=(IsActiveEmployee,)),
+        name="async_view",
+    ),
+    path(
+        "async/downstream/<int:pk>/",
+        ParticipantDownstreamAsyncView.as_view(
+            permission_classes=(IsActiveEmployee,)
+        ),
+        name="async_downstream",
+    ),
+    path(
+        "async/upstream/<int:pk>/",
+        ParticipantUpstreamAsyncView.as_view(permission_classes=(IsActiveEmployee,)),
+        name="async_upstream",
+    ),
+    path(
+        "receivables/",
+        SupplierReceivableListAPIView.as_view(
+            permission_classes=(IsActiveEmployee,)
+        ),
+        name="receivables",
+    ),
+    path(
+        "receivables/<int:pk>/",
+        SupplierReceivableRetrieveAPIView.as_view(
+            permission_classes=(IsActiveEmployee,)
+        ),
+        name="receivable",
+    ),
     path(
         "update/<int:pk>/",
         ParticipantUpdateAPIView.as_view(permission_classes=(IsActiveEmployee,)),
@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+from participants.hierarchy import get_participant
+from participants.models import Participant
+
+
+def check_supplier(email, unit_name, supplier, instance=None):
+    """
+    Проверка звена и поставщика участника (общая для API, Admin-панели и
+    импорта), instance - изменяемый участник (при создании отсутствует).
+    В сети не больше PARTICIPANT_MAX_LEVEL уровней, поставщик не может
+    быть покупателем участника на любой глубине
+    """
+    if not supplier:
+        # Без поставщика в сети только завод: участник сети с покупателями
+        # не выходит из нее (уровни покупателей считаются от завода)
+        if (
+            instance is not None
+            and instance.level is not None
+            and unit_name != Participant.FACTORY
+            and get_participant(instance.pk).has_customers
+        ):
+            raise ValidationError(
+                "У Вас есть покупатели, без поставщика звено может быть "
+                "только заводом."
+            )
+        return
+    if email == supplier.email:
+        raise ValidationError("Покупатель и поставщик не могут быть одним лицом.")
+    if unit_name == Participant.FACTORY:
+        raise ValidationError("Завод всегда находится на нулевом(0) уровне.")
+    if supplier.level is None:
+        raise ValidationError(
+            "Поставщик не подключен к сети (не выбран его поставщик)."
+        )
+    level = supplier.level + 1
+    if level > settings.PARTICIPANT_MAX_LEVEL:
+        raise ValidationError(
+            f"Поставщик с уровнем '{supplier.level}' не осуществляет поставки."
+        )
+    if instance is None:
+        return
+    # Путь поставщика в иерархии - все его поставщики: цикл проверяется
+    # за O(глубины) без обхода цепочки
+    if instance.pk == supplier.pk or instance.pk in supplier.supplier_ids:
+        raise ValidationError("Поставщик не может быть покупателем участника.")
+    if not get_participant(instance.pk).has_customers:
+        return
+    # Участник не опускается ниже - уровни покупателей остаются допустимыми
+    if instance.level is not None and level <= instance.level:
+        return
+    allowed = settings.PARTICIPANT_MAX_LEVEL - instance.get_height() - 1
+    if supplier.level <= allowed:
+        return
+    if allowed < 0:
+        raise ValidationError(
+            "У Вас есть покупатели, цепочка длиннее допустимой "
+            f"({settings.PARTICIPANT_MAX_LEVEL} уровней)."
+        )
+    if allowed == 0:
+        raise ValidationError(
+            "У Вас есть покупатели, поставщик должен быть с уровнем '0'."
+        )
+    raise ValidationError(
+        f"У Вас есть покупатели, поставщик должен быть с уровнем не выше '{allowed}'."
+    )
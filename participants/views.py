@@ -1,11 +1,24 @@
+from django.db.models.functions import Length
 from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import exceptions
+from rest_framework.filters import OrderingFilter
 from rest_framework.generics import (CreateAPIView, DestroyAPIView,
-                                     ListAPIView, RetrieveAPIView,
-                                     UpdateAPIView)
+                                     GenericAPIView, ListAPIView,
+                                     RetrieveAPIView, UpdateAPIView,
+                                     get_object_or_404)
 
-from participants.models import Participant
+from config.async_views import AsyncAPIView
+from config.cache import CachedResponseMixin
+from config.conditional import ConditionalGetMixin
+from config.expand import ExpandMixin
+from config.exports import ExportMixin
+from participants.filters import ParticipantFilter
+from participants.models import Participant, SupplierReceivable
+from participants.paginators import ParticipantPaginator
 from participants.serializers import (ParticipantsCreateSerializer,
-                                      ParticipantsSerializer)
+                                      ParticipantsExpandedSerializer,
+                                      ParticipantsSerializer,
+                                      SupplierReceivableSerializer)
 
 
 class ParticipantCreateAPIView(CreateAPIView):
@@ -13,16 +26,77 @@ class ParticipantCreateAPIView(CreateAPIView):
     serializer_class = ParticipantsCreateSerializer
 
 
-class ParticipantListAPIView(ListAPIView):
+class ParticipantListAPIView(
+    ExpandMixin, ConditionalGetMixin, CachedResponseMixin, ListAPIView
+):
     queryset = Participant.objects.all()
     serializer_class = ParticipantsSerializer
+    expanded_serializer_class = ParticipantsExpandedSerializer
+    expand_fields = {"supplier": ("name", "level")}
+    filter_backends = (DjangoFilterBackend, OrderingFilter)
+    filterset_class = ParticipantFilter
+    # Сортировка только по полям с индексом (?ordering=-debt)
+    ordering_fields = ("id", "created_at", "debt")
+    pagination_class = ParticipantPaginator
+
+
+class ParticipantExportAPIView(ExportMixin, GenericAPIView):
+    """Выгрузка всех участников сети (CSV/NDJSON) потоком"""
+
+    queryset = Participant.objects.order_by("pk")
+    serializer_class = ParticipantsSerializer
     filter_backends = (DjangoFilterBackend,)
-    filterset_fields = ("country",)
+    filterset_class = ParticipantFilter
+    export_fields = ParticipantsSerializer.Meta.fields
+
+
+class ParticipantRetrieveAPIView(
+    ExpandMixin, ConditionalGetMixin, CachedResponseMixin, RetrieveAPIView
+):
+    queryset = Participant.objects.all()
+    serializer_class = ParticipantsSerializer
+    expanded_serializer_class = ParticipantsExpandedSerializer
+    expand_fields = {"supplier": ("name", "level")}
+
+
+class ParticipantDownstreamAPIView(ExpandMixin, ConditionalGetMixin, ListAPIView):
+    """Все покупатели участника по цепочке (на любой глубине)"""
 
+    queryset = Participant.objects.all()
+    serializer_class = ParticipantsSerializer
+    expanded_serializer_class = ParticipantsExpandedSerializer
+    expand_fields = {"supplier": ("name", "level")}
+    pagination_class = ParticipantPaginator
+
+    def get_queryset(self):
+        participant = get_object_or_404(
+            Participant.objects.only("tree_path"), pk=self.kwargs["pk"]
+        )
+        return (
+            super()
+            .get_queryset()
+            .filter(tree_path__startswith=participant.subtree_path)
+        )
+
+
+class ParticipantUpstreamAPIView(ExpandMixin, ConditionalGetMixin, ListAPIView):
+    """Все поставщики участника по цепочке, начиная с верхнего"""
 
-class ParticipantRetrieveAPIView(RetrieveAPIView):
     queryset = Participant.objects.all()
     serializer_class = ParticipantsSerializer
+    expanded_serializer_class = ParticipantsExpandedSerializer
+    expand_fields = {"supplier": ("name", "level")}
+
+    def get_queryset(self):
+        participant = get_object_or_404(
+            Participant.objects.only("tree_path"), pk=self.kwargs["pk"]
+        )
+        return (
+            super()
+            .get_queryset()
+            .filter(pk__in=participant.supplier_ids)
+            .order_by(Length("tree_path"))
+        )
 
 
 class ParticipantUpdateAPIView(UpdateAPIView):
@@ -32,7 +106,7 @@ class ParticipantUpdateAPIView(UpdateAPIView):
     def get_queryset(self, *args, **kwargs):
         queryset = super().get_queryset(*args, **kwargs)
         if not self.request.user.is_anonymous:
-            queryset = queryset.filter(user__pk=self.request.user.pk)
+            queryset = queryset.filter(pk=self.request.user.employer_id)
             return queryset
         else:
             return None
@@ -48,3 +122,66 @@ class ParticipantDestroyAPIView(DestroyAPIView):
             return queryset
         else:
             return None
+
+
+class SupplierReceivableListAPIView(ListAPIView):
+    """Задолженность покупателей перед каждым поставщиком (из сводки)"""
+
+    queryset = SupplierReceivable.objects.select_related("supplier")
+    serializer_class = SupplierReceivableSerializer
+    pagination_class = ParticipantPaginator
+
+
+class SupplierReceivableRetrieveAPIView(RetrieveAPIView):
+    queryset = SupplierReceivable.objects.select_related("supplier")
+    serializer_class = SupplierReceivableSerializer
+
+
+class ParticipantListAsyncView(AsyncAPIView):
+    """Список участников (ASGI), фильтры - как у синхронного списка"""
+
+    serializer_class = ParticipantsSerializer
+
+    async def get_data(self, request):
+        filterset = ParticipantFilter(request.GET, queryset=Participant.objects.all())
+        if not filterset.is_valid():
+            raise exceptions.ValidationError(filterset.errors)
+        return await self.get_page(request, filterset.qs)
+
+
+class ParticipantRetrieveAsyncView(AsyncAPIView):
+    serializer_class = ParticipantsSerializer
+
+    async def get_data(self, request, pk):
+        return await self.get_object(Participant.objects.all(), pk=pk)
+
+
+class ParticipantDownstreamAsyncView(AsyncAPIView):
+    """Все покупатели участника по цепочке (ASGI)"""
+
+    serializer_class = ParticipantsSerializer
+
+    async def get_data(self, request, pk):
+        participant = await self.get_anchor(pk)
+        return await self.get_page(
+            request,
+            Participant.objects.filter(tree_path__startswith=participant.subtree_path),
+        )
+
+    async def get_anchor(self, pk):
+        try:
+            return await Participant.objects.only("tree_path").aget(pk=pk)
+        except Participant.DoesNotExist:
+            raise exceptions.NotFound()
+
+
+class ParticipantUpstreamAsyncView(ParticipantDownstreamAsyncView):
+    """Все поставщики участника по цепочке, начиная с верхнего (ASGI)"""
+
+    async def get_data(self, request, pk):
+        participant = await self.get_anchor(pk)
+        return await self.get_list(
+            Participant.objects.filter(pk__in=participant.supplier_ids).order_by(
+                Length("tree_path")
+            )
+        )
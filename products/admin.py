@@ -1,10 +1,12 @@
 from django.contrib import admin
 
+from config.admin import LargeTableAdmin
 from products.models import Product
+from products.search import search_products
 
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(LargeTableAdmin):
     list_display = (
         "id",
         "product_name",
@@ -12,3 +14,17 @@ class ProductAdmin(admin.ModelAdmin):
         "release_date",
         "owner",
     )
+    list_select_related = ("owner",)
+    # Выбор владельца поиском по началу наименования вместо списка всех
+    # участников
+    autocomplete_fields = ("owner",)
+    search_fields = ("product_name", "model")
+    search_help_text = "Поиск по словам наименования и модели"
+    date_hierarchy = "release_date"
+
+    def get_search_results(self, request, queryset, search_term):
+        # Полнотекстовый поиск по GIN-индексу вместо ILIKE '%...%' по
+        # каждому полю; порядок списка задает админка
+        if not search_term:
+            return queryset, False
+        return search_products(queryset, search_term), False
@@ -0,0 +1,37 @@
+from config.cache import invalidate_list
+from config.imports import ImportCommand
+from participants.models import Participant
+from products.models import Product
+from products.serializers import ProductImportSerializer
+
+
+class Command(ImportCommand):
+    help = "Импорт продуктов из CSV/NDJSON файла (владелец - email участника)"
+
+    def import_chunk(self, rows):
+        """Владельцы порции загружаются одним запросом, продукты - одним INSERT"""
+        emails = {
+            row.get("owner")
+            for _, row in rows
+            if isinstance(row.get("owner"), str) and row.get("owner")
+        }
+        participants = {
+            participant.email: participant
+            for participant in Participant.objects.filter(email__in=emails).only(
+                "id", "email"
+            )
+        }
+        products = []
+        for number, row in rows:
+            serializer = ProductImportSerializer(
+                data=row, context={"participants": participants}
+            )
+            if not serializer.is_valid():
+                self.report_error(number, serializer.errors)
+                continue
+            products.append(Product(**serializer.validated_data))
+        Product.objects.bulk_create(products)
+        self.created += len(products)
+
+    def after_chunk(self):
+        invalidate_list(Product)
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.15 on 2026-10-18 12:10
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="product",
+            options={
+                "ordering": ["-pk"],
+                "verbose_name": "продукт",
+                "verbose_name_plural": "продукты",
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.15 on 2026-10-18 12:19
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0002_product_ordering"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                default=django.utils.timezone.now,
+                verbose_name="Время изменения",
+            ),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1 on 2026-10-18 12:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("participants", "0008_participant_filter_indexes"),
+        ("products", "0003_product_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["owner", "-id"],
+                include=("product_name", "model", "release_date"),
+                name="product_owner_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1 on 2026-10-18 13:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("participants", "0010_participant_name_upper_index"),
+        ("products", "0005_product_search"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["release_date"], name="product_release_date_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1 on 2026-10-18 13:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("participants", "0012_participant_ordering_id_indexes"),
+        ("products", "0006_product_release_date_index"),
+    ]
+
+    # Удаляется только индекс внешнего ключа: AlterField пересоздал бы
+    # ограничение FOREIGN KEY с проверкой всех строк таблицы
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    'DROP INDEX IF EXISTS "products_product_owner_id_f189d068"',
+                    'CREATE INDEX "products_product_owner_id_f189d068" '
+                    'ON "products_product" ("owner_id")',
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="product",
+                    name="owner",
+                    field=models.ForeignKey(
+                        blank=True,
+                        db_index=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="product",
+                        to="participants.participant",
+                        verbose_name="владелец",
+                    ),
+                ),
+            ],
+        ),
+    ]
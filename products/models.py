@@ -1,9 +1,14 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 
 from participants.models import Participant
 
 NULLABLE = {"blank": True, "null": True}
 
+# Конфигурация полнотекстового поиска PostgreSQL
+SEARCH_CONFIG = "russian"
+
 
 class Product(models.Model):
     """Продукты"""
@@ -11,13 +16,27 @@ class Product(models.Model):
     product_name = models.CharField(max_length=150, verbose_name="наименование")
     model = models.CharField(max_length=50, verbose_name="модель")
     release_date = models.DateField(verbose_name="Дата выхода продукта")
+    # Отдельный индекс внешнего ключа не нужен: owner - первое поле
+    # индекса product_owner_idx
     owner = models.ForeignKey(
         Participant,
         related_name="product",
         verbose_name="владелец",
         on_delete=models.SET_NULL,
+        db_index=False,
         **NULLABLE,
     )
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Время изменения")
+    # Поисковый вектор наименования и модели, вычисляется базой при
+    # каждой записи (хранимая генерируемая колонка)
+    search_vector = models.GeneratedField(
+        expression=SearchVector(
+            "product_name", "model", config=SEARCH_CONFIG
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+        verbose_name="поисковый вектор",
+    )
 
     def __str__(self):
         # Строковое отображение объекта
@@ -29,3 +48,18 @@ class Product(models.Model):
     class Meta:
         verbose_name = "продукт"
         verbose_name_plural = "продукты"
+        # Сортировка по id
+        ordering = ["-pk"]
+        indexes = [
+            # Продукты владельца в порядке списка, поля списка в самом
+            # индексе (выборка без чтения таблицы)
+            models.Index(
+                fields=["owner", "-id"],
+                include=["product_name", "model", "release_date"],
+                name="product_owner_idx",
+            ),
+            GinIndex(fields=["search_vector"], name="product_search_idx"),
+            # Навигация по датам выхода в Admin-панели (MIN/MAX, годы и
+            # месяцы по индексу)
+            models.Index(fields=["release_date"], name="product_release_date_idx"),
+        ]
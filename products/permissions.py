@@ -7,6 +7,6 @@ class IsOwner(BasePermission):
     """
 
     def has_object_permission(self, request, view, obj):
-        if obj.owner == request.user.employer:
+        if obj.owner_id == request.user.employer_id:
             return True
         return False
@@ -0,0 +1,38 @@
+"""
+Поиск продуктов: полнотекстовый по наименованию и модели (хранимый
+tsvector с GIN-индексом) и, если в базе есть pg_trgm, по сходству
+триграмм - находит продукты и при опечатках в запросе
+"""
+
+from functools import cache
+
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            TrigramSimilarity)
+from django.db import connection
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+
+from products.models import SEARCH_CONFIG
+
+
+@cache
+def trigram_enabled():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def search_products(queryset, text):
+    """Продукты, подходящие под запрос, в порядке релевантности"""
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type="websearch")
+    condition = Q(search_vector=query)
+    rank = SearchRank(F("search_vector"), query)
+    if trigram_enabled():
+        condition |= Q(product_name__trigram_similar=text) | Q(
+            model__trigram_similar=text
+        )
+        rank = rank + Greatest(
+            TrigramSimilarity("product_name", text),
+            TrigramSimilarity("model", text),
+        )
+    return queryset.filter(condition).annotate(rank=rank).order_by("-rank", "-pk")
@@ -1,12 +1,54 @@
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
 
+from participants.models import Participant
 from products.models import Product
 
 
+class ProductListSerializer(serializers.ListSerializer):
+    """Пакетное создание и изменение продуктов (одним запросом к базе)"""
+
+    def to_internal_value(self, data):
+        attrs = super().to_internal_value(data)
+        if self.instance is not None:
+            products = {product.pk for product in self.instance}
+            errors = [
+                {} if item.get("id") in products else {"id": ["Нет такого продукта."]}
+                for item in attrs
+            ]
+            if any(errors):
+                raise serializers.ValidationError(errors)
+        return attrs
+
+    def create(self, validated_data):
+        return Product.objects.bulk_create(
+            [Product(**attrs) for attrs in validated_data],
+            batch_size=settings.PRODUCTS_BULK_BATCH_SIZE,
+        )
+
+    def update(self, instance, validated_data):
+        products = {product.pk: product for product in instance}
+        ids = [attrs["id"] for attrs in validated_data]
+        fields = {"updated_at"}
+        now = timezone.now()
+        for attrs in validated_data:
+            product = products[attrs.pop("id")]
+            for field, value in attrs.items():
+                setattr(product, field, value)
+                fields.add(field)
+            product.updated_at = now
+        Product.objects.bulk_update(
+            products.values(), fields, batch_size=settings.PRODUCTS_BULK_BATCH_SIZE
+        )
+        return [products[pk] for pk in ids]
+
+
 class ProductSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Product
+        list_serializer_class = ProductListSerializer
         read_only_fields = ("owner",)
         fields = [
             "id",
@@ -15,3 +57,47 @@ class ProductSerializer(serializers.ModelSerializer):
             "release_date",
             "owner",
         ]
+
+
+class ProductOwnerSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = Participant
+        fields = [
+            "id",
+            "name",
+        ]
+
+
+class ProductExpandedSerializer(ProductSerializer):
+    """Продукт с вложенным владельцем (наименование)"""
+
+    owner = ProductOwnerSerializer(read_only=True)
+
+
+class ProductBulkUpdateSerializer(ProductSerializer):
+    id = serializers.IntegerField()
+
+
+class ProductImportSerializer(serializers.ModelSerializer):
+    """
+    Строка файла импорта продуктов: владелец указывается по email и
+    берется из context["participants"] (владельцы загружаются порцией)
+    """
+
+    owner = serializers.EmailField()
+
+    def validate_owner(self, value):
+        owner = self.context["participants"].get(value)
+        if owner is None:
+            raise serializers.ValidationError("Нет такого участника.")
+        return owner
+
+    class Meta:
+        model = Product
+        fields = [
+            "product_name",
+            "model",
+            "release_date",
+            "owner",
+        ]
@@ -1,11 +1,22 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import translation
 from rest_framework import status
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
 
 from config import settings
 from participants.models import Participant
 from products.models import Product
+from products.search import trigram_enabled
 from users.models import User
 
 
@@ -13,6 +24,9 @@ class ProductTestCase(APITestCase):
     def setUp(self) -> None:
 
         super().setUp()
+        # Сброс кеша ответов выполняется после фиксации транзакции,
+        # а транзакция теста не фиксируется
+        cache.clear()
         self.participant = Participant.objects.create(
             name="ООО Мир",
             email="vvv@list.ru",
@@ -21,7 +35,7 @@ class ProductTestCase(APITestCase):
             street="New",
             house="36/5",
             unit_name="завод",
-            level="0",
+            level=0,
         )
         self.user = User.objects.create(
             email="vvv@list.ru",
@@ -158,7 +172,80 @@ class ProductTestCase(APITestCase):
         ]
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(data, result)
+        self.assertEqual(data["results"], result)
+        self.assertIsNone(data["next"])
+
+    def test_product_list_page_size(self):
+        """Проверка постраничного вывода продуктов (курсор)"""
+
+        Product.objects.bulk_create(
+            Product(
+                product_name="телефон",
+                model=f"sony {number}",
+                release_date="2021-01-28",
+                owner=self.participant,
+            )
+            for number in range(3)
+        )
+        url = reverse("products:list")
+        response = self.client.get(url, {"page_size": 3})
+        data = response.json()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(data["results"]), 3)
+        self.assertEqual(data["results"][0]["model"], "sony 2")
+
+        response = self.client.get(data["next"])
+        data = response.json()
+        self.assertEqual(data["results"][0]["id"], self.product.pk)
+        self.assertIsNone(data["next"])
+
+    def test_product_list_is_cached(self):
+        """Повторный запрос списка - из кеша без запросов к базе; развернутый
+        список сбрасывается при изменении владельца"""
+
+        url = reverse("products:list")
+        for params in ({}, {"expand": "1"}):
+            self.client.get(url, params)
+            with self.assertNumQueries(0):
+                response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.participant.name = "ООО Мир и Ко"
+            self.participant.save()
+        response = self.client.get(url, {"expand": "1"})
+        self.assertEqual(response.json()["results"][0]["owner"]["name"], "ООО Мир и Ко")
+
+    def test_product_retrieve_is_cached(self):
+        """Повторный просмотр продукта отдается из кеша,
+        удаление продукта сбрасывает кеш"""
+
+        url = reverse("products:view", args=(self.product.pk,))
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.delete()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_product_retrieve_not_modified(self):
+        """Условный запрос продукта: 304, пока продукт не изменился"""
+
+        url = reverse("products:view", args=(self.product.pk,))
+        response = self.client.get(url)
+        etag = response["ETag"]
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.model = "super sony"
+            self.product.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
 
     def test_product_list_is_false(self):
         """Проверка списка продуктов (нет доступа)"""
@@ -193,6 +280,535 @@ class ProductTestCase(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_product_create_owner(self):
+        """Проверка создания продукта (владелец - работодатель, одна запись)"""
+
+        url = reverse("products:create")
+        data = {
+            "product_name": "телефон",
+            "model": "super sony",
+            "release_date": "2021-01-28",
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["owner"], self.participant.pk)
+        self.assertEqual(
+            len([query for query in queries if query["sql"].startswith("UPDATE")]), 0
+        )
+
+    def test_product_bulk_create_is_true(self):
+        """Пакетное создание продуктов"""
+
+        url = reverse("products:bulk_create")
+        data = [
+            {
+                "product_name": "телефон",
+                "model": f"sony {number}",
+                "release_date": "2021-01-28",
+            }
+            for number in range(100)
+        ]
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.json()), 100)
+        self.assertEqual(
+            Product.objects.filter(owner=self.participant).count(), 101
+        )
+
+    def test_product_bulk_create_is_false(self):
+        """Пакетное создание продуктов (с ошибкой, ошибки по каждому продукту)"""
+
+        url = reverse("products:bulk_create")
+        data = [
+            {"product_name": "телефон", "model": "sony", "release_date": "2021-01-28"},
+            {"product_name": "телефон", "release_date": "2021-01-28"},
+        ]
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json(), [{}, {"model": ["This field is required."]}]
+        )
+        self.assertEqual(Product.objects.all().count(), 1)
+
+    def test_product_bulk_update(self):
+        """Пакетное изменение продуктов (только своих)"""
+
+        participant = Participant.objects.create(
+            name="ПАО Завод",
+            email="PPP@list.ru",
+            country="Россия",
+            city="Москва",
+            street="Московская",
+            house="5",
+            unit_name="завод",
+        )
+        product = Product.objects.create(
+            product_name="плеер",
+            model="sony",
+            release_date="2020-01-28",
+            owner=participant,
+        )
+        url = reverse("products:bulk_update")
+        data = [
+            {"id": self.product.pk, "model": "super sony"},
+            {"id": product.pk, "model": "super sony"},
+        ]
+        response = self.client.patch(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), [{}, {"id": ["Нет такого продукта."]}])
+
+        response = self.client.patch(url, data[:1], format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()[0]["model"], "super sony")
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.model, "super sony")
+
+    def test_product_bulk_delete(self):
+        """Пакетное удаление продуктов"""
+
+        url = reverse("products:bulk_delete")
+        response = self.client.delete(url, {"ids": [self.product.pk]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(Product.objects.all().count(), 0)
+
+        response = self.client.delete(url, {"ids": "all"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def create_catalogue(self):
+        for product_name, model in (
+            ("телефоны", "samsung galaxy"),
+            ("ноутбук", "asus zenbook"),
+            ("наушники", "jbl tune"),
+        ):
+            Product.objects.create(
+                product_name=product_name,
+                model=model,
+                release_date="2021-01-28",
+                owner=self.participant,
+            )
+
+    def test_product_search(self):
+        """Поиск продуктов по словам наименования и модели, по релевантности"""
+
+        self.create_catalogue()
+        url = reverse("products:search")
+        trigram_enabled()
+        # Страница без подсчета общего числа результатов - один запрос
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {"q": "телефон"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.json())
+        self.assertEqual(
+            [product["product_name"] for product in response.json()["results"]],
+            ["телефоны", "телефон"],
+        )
+
+        response = self.client.get(url, {"q": "телефон", "page_size": 1})
+        data = response.json()
+        self.assertEqual(data["results"][0]["product_name"], "телефоны")
+        self.assertIsNone(data["previous"])
+        response = self.client.get(data["next"])
+        data = response.json()
+        self.assertEqual(data["results"][0]["product_name"], "телефон")
+        self.assertIsNone(data["next"])
+        self.assertIsNotNone(data["previous"])
+        response = self.client.get(url, {"q": "телефон", "page": 0})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get(url, {"q": "asus zenbook"})
+        self.assertEqual(
+            [product["model"] for product in response.json()["results"]],
+            ["asus zenbook"],
+        )
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {"q": ["Укажите строку поиска."]})
+
+    def test_product_search_typo(self):
+        """Поиск продуктов с опечаткой (сходство триграмм)"""
+
+        if not trigram_enabled():
+            self.skipTest("в базе нет расширения pg_trgm")
+        self.create_catalogue()
+        response = self.client.get(reverse("products:search"), {"q": "samsnug"})
+        self.assertEqual(
+            [product["model"] for product in response.json()["results"]],
+            ["samsung galaxy"],
+        )
+
+    def test_product_export(self):
+        """Выгрузка каталога продуктов потоком"""
+
+        url = reverse("products:export", args=["csv"])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response["Content-Disposition"], 'attachment; filename="product.csv"'
+        )
+        self.assertEqual(
+            b"".join(response.streaming_content).decode().splitlines(),
+            [
+                "id,product_name,model,release_date,owner",
+                f"{self.product.pk},телефон,sony,2020-01-28,{self.participant.pk}",
+            ],
+        )
+
+    def test_import_products(self):
+        """Импорт продуктов из CSV (владелец по email, одна вставка на порцию)"""
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "products.csv")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(
+                    "product_name,model,release_date,owner\n"
+                    "телефон,sony 1,2021-01-28,vvv@list.ru\n"
+                    "телефон,sony 2,2021-01-28,nobody@list.ru\n"
+                    "телефон,sony 3,28.01.2021,vvv@list.ru\n"
+                    "телефон,sony 4,2021-01-28,vvv@list.ru\n"
+                )
+            stdout, stderr = StringIO(), StringIO()
+            with CaptureQueriesContext(connection) as queries:
+                call_command("import_products", path, stdout=stdout, stderr=stderr)
+        self.assertIn(
+            'Строка 2: {"owner": ["Нет такого участника."]}', stderr.getvalue()
+        )
+        self.assertIn('Строка 3: {"release_date": [', stderr.getvalue())
+        self.assertIn("создано: 2, пропущено: 0, ошибок: 2", stdout.getvalue())
+        self.assertEqual(
+            len(
+                [
+                    query
+                    for query in queries
+                    if query["sql"].startswith('INSERT INTO "products_product"')
+                ]
+            ),
+            1,
+        )
+        self.assertEqual(
+            list(
+                Product.objects.filter(owner=self.participant)
+                .order_by("pk")
+                .values_list("model", flat=True)
+            ),
+            ["sony", "sony 1", "sony 4"],
+        )
+
+    def test_import_products_resume(self):
+        """Сбой после записи порции: продолжение не повторяет ее строки"""
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "products.csv")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(
+                    "product_name,model,release_date,owner\n"
+                    "телефон,sony 1,2021-01-28,vvv@list.ru\n"
+                    "телефон,sony 2,2021-01-28,vvv@list.ru\n"
+                )
+            with mock.patch(
+                "products.management.commands.import_products.Command.after_chunk",
+                side_effect=RuntimeError,
+            ):
+                with self.assertRaises(RuntimeError):
+                    call_command(
+                        "import_products", path, batch_size=1, stdout=StringIO()
+                    )
+            stdout = StringIO()
+            call_command("import_products", path, resume=True, stdout=stdout)
+        self.assertIn("Продолжение импорта со строки 2", stdout.getvalue())
+        self.assertEqual(
+            list(
+                Product.objects.filter(model__startswith="sony ")
+                .order_by("pk")
+                .values_list("model", flat=True)
+            ),
+            ["sony 1", "sony 2"],
+        )
+
     def tearDown(self):
         translation.activate(settings.LANGUAGE_CODE)
         super().tearDown()
+
+    def test_product_async(self):
+        """Асинхронные список и просмотр продуктов (по JWT-токену)"""
+
+        other = Product.objects.create(
+            product_name="ноутбук",
+            model="asus",
+            release_date="2022-05-01",
+            owner=self.participant,
+        )
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.force_authenticate(user=None)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        response = self.client.get(reverse("products:async_list"), {"page_size": 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["results"][0]["id"], other.pk)
+        response = self.client.get(response.json()["next"])
+        self.assertEqual(response.json()["results"][0]["model"], "sony")
+
+        url = reverse("products:async_view", args=(self.product.pk,))
+        response = self.client.get(url)
+        self.assertEqual(response.json()["release_date"], "2020-01-28")
+        self.assertEqual(response.json()["owner"], self.participant.pk)
+
+    def test_owner_index(self):
+        """Продукты владельца ищутся по одному индексу product_owner_idx"""
+
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, Product._meta.db_table
+            )
+        self.assertEqual(
+            [
+                name
+                for name, constraint in constraints.items()
+                if constraint["index"] and constraint["columns"][0] == "owner_id"
+            ],
+            ["product_owner_idx"],
+        )
+
+
+class ProductQueryCountTestCase(APITestCase):
+    """Число запросов каждого метода API не зависит от числа продуктов"""
+
+    SIZES = (1, 100, 10000)
+
+    def setUp(self) -> None:
+
+        super().setUp()
+        self.participant = Participant.objects.create(
+            name="ООО Мир",
+            email="vvv@list.ru",
+            country="Другая",
+            city="N",
+            street="New",
+            house="36/5",
+            unit_name="завод",
+        )
+        self.user = User.objects.create(
+            email="vvv@list.ru",
+            last_name="Иванов",
+            first_name="Иван",
+            employer=self.participant,
+            is_staff=True,
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def grow(self, size):
+        """Продукты участника, всего size продуктов"""
+        count = Product.objects.count()
+        Product.objects.bulk_create(
+            Product(
+                product_name="телефон",
+                model=f"sony {number}",
+                release_date="2020-01-28",
+                owner=self.participant,
+            )
+            for number in range(count, size)
+        )
+        return list(Product.objects.order_by("-pk")[:10])
+
+    def assert_queries(self, number, method, url, data=None, status_code=200):
+        cache.clear()
+        with self.assertNumQueries(number):
+            response = getattr(self.client, method)(url, data, format="json")
+            if response.streaming:
+                b"".join(response.streaming_content)
+        self.assertEqual(response.status_code, status_code)
+        return response
+
+    def test_query_count(self):
+        """Чтение, выгрузка и изменение при 1, 100 и 10000 продуктах"""
+
+        for size in self.SIZES:
+            with self.subTest(size=size):
+                products = self.grow(size)
+                product = products[0]
+                for expand in ("", "1"):
+                    self.assert_queries(
+                        1, "get", reverse("products:list"), {"expand": expand}
+                    )
+                    self.assert_queries(
+                        1,
+                        "get",
+                        reverse("products:view", args=[product.pk]),
+                        {"expand": expand},
+                    )
+                self.assert_queries(1, "get", reverse("products:export", args=["csv"]))
+                self.assert_queries(
+                    2,
+                    "patch",
+                    reverse("products:update", args=[product.pk]),
+                    {"model": "super sony"},
+                )
+                self.assert_queries(
+                    2,
+                    "patch",
+                    reverse("products:bulk_update"),
+                    [{"id": item.pk, "model": "super sony"} for item in products],
+                )
+                self.assert_queries(
+                    1,
+                    "post",
+                    reverse("products:bulk_create"),
+                    [
+                        {
+                            "product_name": "телефон",
+                            "model": "sony",
+                            "release_date": "2021-01-28",
+                        }
+                        for _ in range(10)
+                    ],
+                    status_code=status.HTTP_201_CREATED,
+                )
+                self.assert_queries(
+                    1,
+                    "post",
+                    reverse("products:create"),
+                    {
+                        "product_name": "телефон",
+                        "model": "sony",
+                        "release_date": "2021-01-28",
+                    },
+                    status_code=status.HTTP_201_CREATED,
+                )
+                self.assert_queries(
+                    2,
+                    "delete",
+                    reverse("products:bulk_delete"),
+                    {"ids": list(Product.objects.values_list("pk", flat=True)[:11])},
+                    status_code=status.HTTP_204_NO_CONTENT,
+                )
+                self.assert_queries(
+                    2,
+                    "delete",
+                    reverse("products:delete", args=[product.pk]),
+                    status_code=status.HTTP_204_NO_CONTENT,
+                )
+
+        response = self.assert_queries(
+            1,
+            "get",
+            reverse("products:view", args=[products[1].pk]),
+            {"expand": "1"},
+        )
+        self.assertEqual(
+            response.json()["owner"], {"id": self.participant.pk, "name": "ООО Мир"}
+        )
+
+    def tearDown(self):
+        cache.clear()
+        super().tearDown()
+
+
+class ProductAdminTestCase(APITestCase):
+    def setUp(self) -> None:
+
+        super().setUp()
+        self.participant = Participant.objects.create(
+            name="ООО Мир",
+            email="vvv@list.ru",
+            country="Другая",
+            city="N",
+            street="New",
+            house="36/5",
+            unit_name="завод",
+        )
+        self.admin = User.objects.create(
+            email="admin@list.ru",
+            last_name="Иванов",
+            first_name="Иван",
+            is_staff=True,
+            is_superuser=True,
+        )
+        self.client.force_login(self.admin)
+        self.product = Product.objects.create(
+            product_name="телефон",
+            model="sony",
+            release_date="2020-01-28",
+            owner=self.participant,
+        )
+
+    def test_changelist_queries(self):
+        """Число запросов списка не зависит от числа продуктов и владельцев"""
+
+        url = reverse("admin:products_product_changelist")
+        with CaptureQueriesContext(connection) as first:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertContains(response, "ООО Мир")
+
+        for number in range(10):
+            owner = Participant.objects.create(
+                name=f"ИП {number}",
+                email=f"ip{number}@list.ru",
+                country="Россия",
+                city="Тверь",
+                street="Новая",
+                house="3",
+                unit_name="ИП",
+            )
+            Product.objects.create(
+                product_name="ноутбук",
+                model=f"asus {number}",
+                release_date=f"2021-0{number % 9 + 1}-01",
+                owner=owner,
+            )
+        with CaptureQueriesContext(connection) as second:
+            response = self.client.get(url)
+        self.assertEqual(len(second), len(first))
+        self.assertContains(response, "ИП 9")
+
+    def test_search(self):
+        """Полнотекстовый поиск по наименованию и модели"""
+
+        Product.objects.create(
+            product_name="ноутбук",
+            model="asus",
+            release_date="2021-01-28",
+            owner=self.participant,
+        )
+        url = reverse("admin:products_product_changelist")
+        response = self.client.get(url, {"q": "Телефоны"})
+        self.assertEqual(
+            [product.pk for product in response.context["cl"].result_list],
+            [self.product.pk],
+        )
+        response = self.client.get(url, {"q": "asus"})
+        self.assertNotContains(response, "телефон,")
+        self.assertEqual(len(response.context["cl"].result_list), 1)
+
+    def test_date_hierarchy(self):
+        """Навигация по датам выхода"""
+
+        url = reverse("admin:products_product_changelist")
+        response = self.client.get(url, {"release_date__year": "2020"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.context["cl"].result_list), 1)
+        response = self.client.get(url, {"release_date__year": "2021"})
+        self.assertEqual(len(response.context["cl"].result_list), 0)
+
+    def test_owner_autocomplete(self):
+        """Владелец выбирается поиском по началу наименования"""
+
+        url = reverse("admin:products_product_change", args=(self.product.pk,))
+        response = self.client.get(url)
+        self.assertContains(response, "admin-autocomplete")
+
+        response = self.client.get(
+            reverse("admin:autocomplete"),
+            {
+                "term": "ооо",
+                "app_label": "products",
+                "model_name": "product",
+                "field_name": "owner",
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json()["results"],
+            [{"id": str(self.participant.pk), "text": "ООО Мир"}],
+        )
@@ -3,9 +3,13 @@ from django.urls import path
 from participants.permissions import IsActiveEmployee
 from products.apps import ProductsConfig
 from products.permissions import IsOwner
-from products.views import (ProductsCreateAPIView, ProductsDestroyAPIView,
-                            ProductsListAPIView, ProductsRetrieveAPIView,
-                            ProductsUpdateAPIView)
+from products.views import (ProductsBulkCreateAPIView,
+                            ProductsBulkDestroyAPIView,
+                            ProductsBulkUpdateAPIView, ProductsCreateAPIView,
+                            ProductsDestroyAPIView, ProductsExportAPIView,
+                            ProductsListAPIView, ProductsListAsyncView,
+                            ProductsRetrieveAPIView, ProductsRetrieveAsyncView,
+                            ProductsSearchAPIView, ProductsUpdateAPIView)
 
 app_name = ProductsConfig.name
 
@@ -21,6 +25,26 @@ urlpatterns = [
         ProductsListAPIView.as_view(permission_classes=(IsActiveEmployee,)),
         name="list",
     ),
+    path(
+        "async/",
+        ProductsListAsyncView.as_view(permission_classes=(IsActiveEmployee,)),
+        name="async_list",
+    ),
+    path(
+        "async/view/<int:pk>/",
+        ProductsRetrieveAsyncView.as_view(permission_classes=(IsActiveEmployee,)),
+        name="async_view",
+    ),
+    path(
+        "search/",
+        ProductsSearchAPIView.as_view(permission_classes=(IsActiveEmployee,)),
+        name="search",
+    ),
+    path(
+        "export/<str:file_format>/",
+        ProductsExportAPIView.as_view(permission_classes=(IsActiveEmployee,)),
+        name="export",
+    ),
     path(
         "view/<int:pk>/",
         ProductsRetrieveAPIView.as_view(permission_classes=(IsActiveEmployee,)),
@@ -36,4 +60,19 @@ urlpatterns = [
         ProductsDestroyAPIView.as_view(permission_classes=(IsOwner,)),
         name="delete",
     ),
+    path(
+        "bulk/create/",
+        ProductsBulkCreateAPIView.as_view(permission_classes=(IsActiveEmployee,)),
+        name="bulk_create",
+    ),
+    path(
+        "bulk/update/",
+        ProductsBulkUpdateAPIView.as_view(permission_classes=(IsActiveEmployee,)),
+        name="bulk_update",
+    ),
+    path(
+        "bulk/delete/",
+        ProductsBulkDestroyAPIView.as_view(permission_classes=(IsActiveEmployee,)),
+        name="bulk_delete",
+    ),
 ]
@@ -1,28 +1,71 @@
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import (CreateAPIView, DestroyAPIView,
-                                     ListAPIView, RetrieveAPIView,
-                                     UpdateAPIView)
+                                     GenericAPIView, ListAPIView,
+                                     RetrieveAPIView, UpdateAPIView)
+from rest_framework.response import Response
 
+from config.async_views import AsyncAPIView
+from config.cache import (CachedResponseMixin, invalidate_list,
+                          invalidate_objects)
+from config.conditional import ConditionalGetMixin
+from config.expand import ExpandMixin
+from config.exports import ExportMixin
 from products.models import Product
-from products.serializers import ProductSerializer
+from products.paginators import ProductPaginator, ProductSearchPaginator
+from products.search import search_products
+from products.serializers import (ProductBulkUpdateSerializer,
+                                  ProductExpandedSerializer, ProductSerializer)
 
 
 class ProductsCreateAPIView(CreateAPIView):
     serializer_class = ProductSerializer
 
     def perform_create(self, serializer):
-        product = serializer.save()
-        product.owner = self.request.user.employer
-        product.save()
+        serializer.save(owner_id=self.request.user.employer_id)
 
 
-class ProductsListAPIView(ListAPIView):
+class ProductsListAPIView(
+    ExpandMixin, ConditionalGetMixin, CachedResponseMixin, ListAPIView
+):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
+    expanded_serializer_class = ProductExpandedSerializer
+    expand_fields = {"owner": ("name",)}
+    pagination_class = ProductPaginator
 
 
-class ProductsRetrieveAPIView(RetrieveAPIView):
+class ProductsSearchAPIView(ConditionalGetMixin, CachedResponseMixin, ListAPIView):
+    """Поиск продуктов по наименованию и модели (?q=), по релевантности"""
+
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
+    pagination_class = ProductSearchPaginator
+
+    def get_queryset(self):
+        text = self.request.query_params.get("q", "").strip()
+        if not text:
+            raise ValidationError({"q": ["Укажите строку поиска."]})
+        queryset = super().get_queryset().only(*self.serializer_class.Meta.fields)
+        return search_products(queryset, text)
+
+
+class ProductsExportAPIView(ExportMixin, GenericAPIView):
+    """Выгрузка всего каталога продуктов (CSV/NDJSON) потоком"""
+
+    queryset = Product.objects.order_by("pk")
+    serializer_class = ProductSerializer
+    export_fields = ProductSerializer.Meta.fields
+
+
+class ProductsRetrieveAPIView(
+    ExpandMixin, ConditionalGetMixin, CachedResponseMixin, RetrieveAPIView
+):
+    queryset = Product.objects.all()
+    serializer_class = ProductSerializer
+    expanded_serializer_class = ProductExpandedSerializer
+    expand_fields = {"owner": ("name",)}
 
 
 class ProductsUpdateAPIView(UpdateAPIView):
@@ -32,7 +75,7 @@ class ProductsUpdateAPIView(UpdateAPIView):
     def get_queryset(self, *args, **kwargs):
         queryset = super().get_queryset(*args, **kwargs)
         if not self.request.user.is_anonymous:
-            queryset = queryset.filter(owner=self.request.user.employer)
+            queryset = queryset.filter(owner_id=self.request.user.employer_id)
             return queryset
         else:
             return None
@@ -44,7 +87,104 @@ class ProductsDestroyAPIView(DestroyAPIView):
     def get_queryset(self, *args, **kwargs):
         queryset = super().get_queryset(*args, **kwargs)
         if not self.request.user.is_anonymous:
-            queryset = queryset.filter(owner=self.request.user.employer)
+            queryset = queryset.filter(owner_id=self.request.user.employer_id)
             return queryset
         else:
             return None
+
+
+class ProductsBulkCreateAPIView(CreateAPIView):
+    """Пакетное создание продуктов (список продуктов в запросе)"""
+
+    serializer_class = ProductSerializer
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs["many"] = True
+        kwargs["max_length"] = settings.PRODUCTS_BULK_MAX_ITEMS
+        return super().get_serializer(*args, **kwargs)
+
+    def perform_create(self, serializer):
+        serializer.save(owner_id=self.request.user.employer_id)
+        invalidate_list(Product)
+
+
+class ProductsBulkUpdateAPIView(GenericAPIView):
+    """Пакетное изменение своих продуктов (список продуктов с id в запросе)"""
+
+    queryset = Product.objects.all()
+    serializer_class = ProductBulkUpdateSerializer
+
+    def get_queryset(self, *args, **kwargs):
+        queryset = super().get_queryset(*args, **kwargs)
+        return queryset.filter(owner_id=self.request.user.employer_id)
+
+    def update(self, request, partial=False):
+        ids = []
+        if isinstance(request.data, list):
+            ids = [
+                item.get("id")
+                for item in request.data
+                if isinstance(item, dict) and isinstance(item.get("id"), int)
+            ]
+        serializer = self.get_serializer(
+            self.get_queryset().filter(pk__in=ids),
+            data=request.data,
+            many=True,
+            partial=partial,
+            max_length=settings.PRODUCTS_BULK_MAX_ITEMS,
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        invalidate_objects(Product, ids)
+        return Response(serializer.data)
+
+    def put(self, request, *args, **kwargs):
+        return self.update(request)
+
+    def patch(self, request, *args, **kwargs):
+        return self.update(request, partial=True)
+
+
+class ProductsBulkDestroyAPIView(GenericAPIView):
+    """Пакетное удаление своих продуктов ({"ids": [...]} в запросе)"""
+
+    queryset = Product.objects.all()
+
+    def get_queryset(self, *args, **kwargs):
+        queryset = super().get_queryset(*args, **kwargs)
+        return queryset.filter(owner_id=self.request.user.employer_id)
+
+    def delete(self, request, *args, **kwargs):
+        ids = request.data.get("ids") if isinstance(request.data, dict) else None
+        if not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids):
+            return Response(
+                {"ids": ["Ожидается список id продуктов."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(ids) > settings.PRODUCTS_BULK_MAX_ITEMS:
+            return Response(
+                {
+                    "ids": [
+                        f"Не более {settings.PRODUCTS_BULK_MAX_ITEMS} продуктов."
+                    ]
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        self.get_queryset().filter(pk__in=ids).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ProductsListAsyncView(AsyncAPIView):
+    """Список продуктов (ASGI)"""
+
+    serializer_class = ProductSerializer
+
+    async def get_data(self, request):
+        return await self.get_page(request, Product.objects.all())
+
+
+class ProductsRetrieveAsyncView(AsyncAPIView):
+    serializer_class = ProductSerializer
+
+    async def get_data(self, request, pk):
+        return await self.get_object(Product.objects.all(), pk=pk)
@@ -0,0 +1,110 @@
+"""
+Аутентификация по JWT-токену без запроса пользователя к базе
+
+Поля пользователя, нужные для проверки прав (работодатель, флаги
+сотрудника и активности), хранятся в кеше AUTH_USER_CACHE_TIMEOUT секунд
+и сбрасываются после фиксации транзакции, изменившей или удалившей
+пользователя или удалившей его работодателя. Работодатель и флаги также
+записываются в токен, но права проверяются по текущим значениям:
+изменение работодателя действует сразу, а не после истечения токена.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users.models import User
+
+# Поля пользователя в кеше; остальные поля загружаются из базы при обращении
+USER_CACHE_FIELDS = (
+    "id",
+    "email",
+    "last_name",
+    "first_name",
+    "employer_id",
+    "is_staff",
+    "is_superuser",
+    "is_active",
+)
+
+
+def get_user_key(pk):
+    return f"{User._meta.label_lower}:auth:{pk}"
+
+
+def invalidate_users(pks):
+    """
+    Сброс пользователей в кеше после фиксации транзакции; pks вычисляются
+    сразу, пока связи в базе еще не изменены
+    """
+    keys = [get_user_key(pk) for pk in pks]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def user_from_snapshot(snapshot):
+    """Пользователь из полей кеша, как если бы он был загружен из базы"""
+    names = [
+        field.attname
+        for field in User._meta.concrete_fields
+        if field.attname in snapshot
+    ]
+    return User.from_db(DEFAULT_DB_ALIAS, names, [snapshot[name] for name in names])
+
+
+def get_user(pk):
+    """Пользователь по id из кеша (при отсутствии - из базы) или None"""
+    key = get_user_key(pk)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = User.objects.filter(pk=pk).values(*USER_CACHE_FIELDS).first()
+        if snapshot is None:
+            return None
+        cache.set(key, snapshot, settings.AUTH_USER_CACHE_TIMEOUT)
+    return user_from_snapshot(snapshot)
+
+
+async def aget_user(pk):
+    """Асинхронный вариант get_user"""
+    key = get_user_key(pk)
+    snapshot = await cache.aget(key)
+    if snapshot is None:
+        snapshot = await User.objects.filter(pk=pk).values(*USER_CACHE_FIELDS).afirst()
+        if snapshot is None:
+            return None
+        await cache.aset(key, snapshot, settings.AUTH_USER_CACHE_TIMEOUT)
+    return user_from_snapshot(snapshot)
+
+
+class UserRefreshToken(RefreshToken):
+    """Токен с работодателем и флагами сотрудника"""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token["employer_id"] = user.employer_id
+        token["is_staff"] = user.is_staff
+        token["is_superuser"] = user.is_superuser
+        return token
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Проверке отзыва токена нужен пароль, он в кеше не хранится
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("В токене нет идентификатора пользователя.")
+        user = get_user(user_id)
+        if user is None:
+            raise AuthenticationFailed("Пользователь не найден.", code="user_not_found")
+        if not user.is_active:
+            raise AuthenticationFailed("Пользователь неактивен.", code="user_inactive")
+        return user
@@ -0,0 +1,30 @@
+"""
+Алгоритмы хеширования паролей с параметрами стоимости из настроек
+
+Имена алгоритмов те же, что у Django, поэтому сохраненные хеши
+проверяются; при изменении параметров пароль перехешируется при входе.
+Параметр 0 - значение Django по умолчанию.
+"""
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    iterations = settings.PBKDF2_ITERATIONS or hashers.PBKDF2PasswordHasher.iterations
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    time_cost = settings.ARGON2_TIME_COST or hashers.Argon2PasswordHasher.time_cost
+    memory_cost = (
+        settings.ARGON2_MEMORY_COST or hashers.Argon2PasswordHasher.memory_cost
+    )
+    parallelism = (
+        settings.ARGON2_PARALLELISM or hashers.Argon2PasswordHasher.parallelism
+    )
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    work_factor = (
+        settings.SCRYPT_WORK_FACTOR or hashers.ScryptPasswordHasher.work_factor
+    )
@@ -0,0 +1,35 @@
+"""
+Хеширование паролей пакетной регистрации в пуле процессов
+
+Хеширование занимает процессор, а не ожидает базу, поэтому потоки одного
+процесса его не ускоряют. Пул создается при первой пакетной регистрации
+и используется повторно; процессы запускаются заново (spawn), а не
+копируются из многопоточного процесса сервера.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+_pool = None
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASHING_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=django.setup,
+        )
+    return _pool
+
+
+def make_passwords(passwords):
+    """Хеши паролей в том же порядке (без пула, если процесс один)"""
+    if settings.PASSWORD_HASHING_WORKERS < 2 or len(passwords) < 2:
+        return [make_password(password) for password in passwords]
+    return list(get_pool().map(make_password, passwords))
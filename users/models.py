@@ -20,6 +20,7 @@ class User(AbstractUser):
         on_delete=models.SET_NULL,
         **NULLABLE,
     )
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Время изменения")
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
@@ -1,5 +1,10 @@
-from rest_framework.serializers import ModelSerializer
+from rest_framework.serializers import (ListSerializer, ModelSerializer,
+                                        ValidationError)
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
+from participants.models import Participant
+from users.authentication import UserRefreshToken
+from users.hashing import make_passwords
 from users.models import User
 
 
@@ -10,6 +15,63 @@ class UserFullSerializer(ModelSerializer):
         fields = ["id", "email", "last_name", "first_name", "password", "employer"]
 
 
+class UserOnboardingListSerializer(ListSerializer):
+    """
+    Пакетная регистрация сотрудников: пароли хешируются в пуле процессов,
+    пользователи записываются одним запросом к базе
+    """
+
+    def to_internal_value(self, data):
+        attrs = super().to_internal_value(data)
+        emails = [item["email"] for item in attrs]
+        existing = set(
+            User.objects.filter(email__in=emails).values_list("email", flat=True)
+        )
+        errors = []
+        for email in emails:
+            if email in existing:
+                errors.append({"email": ["Пользователь с таким адресом уже есть."]})
+            elif emails.count(email) > 1:
+                errors.append({"email": ["Адрес повторяется в списке."]})
+            else:
+                errors.append({})
+        if any(errors):
+            raise ValidationError(errors)
+        return attrs
+
+    def create(self, validated_data):
+        employers = {
+            participant.email: participant
+            for participant in Participant.objects.filter(
+                email__in=[attrs["email"] for attrs in validated_data]
+            )
+        }
+        passwords = make_passwords([attrs["password"] for attrs in validated_data])
+        users = []
+        for attrs, password in zip(validated_data, passwords):
+            employer = employers.get(attrs["email"])
+            users.append(
+                User(
+                    **{**attrs, "password": password},
+                    is_active=True,
+                    is_staff=employer is not None,
+                    employer=employer,
+                )
+            )
+        return User.objects.bulk_create(users)
+
+
+class UserOnboardingSerializer(ModelSerializer):
+
+    class Meta:
+        model = User
+        list_serializer_class = UserOnboardingListSerializer
+        # Уникальность адресов проверяется для всего списка одним запросом
+        extra_kwargs = {"password": {"write_only": True}, "email": {"validators": []}}
+        read_only_fields = ("employer",)
+        fields = ["id", "email", "last_name", "first_name", "password", "employer"]
+
+
 class UserSerializer(ModelSerializer):
 
     class Meta:
@@ -26,3 +88,7 @@ class UserSerializer(ModelSerializer):
             "first_name",
             "employer",
         ]
+
+
+class UserTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = UserRefreshToken
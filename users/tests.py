@@ -1,11 +1,21 @@
 import os
+from unittest import mock
 
-from django.contrib.auth.hashers import make_password
+from django.conf import settings
+from django.contrib.auth.hashers import (check_password, identify_hasher,
+                                         make_password)
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from prometheus_client import REGISTRY
 from rest_framework import status
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
 
 from participants.models import Participant
+from users.authentication import UserRefreshToken, get_user_key
 from users.models import User
 
 ROOT_DIR = os.path.dirname(__file__)
@@ -14,6 +24,9 @@ ROOT_DIR = os.path.dirname(__file__)
 class UsersTestCase(APITestCase):
     def setUp(self):
         super().setUp()
+        # Сброс кеша ответов выполняется после фиксации транзакции,
+        # а транзакция теста не фиксируется
+        cache.clear()
         self.participant = Participant.objects.create(
             name="ООО Мир",
             email="vvv@list.ru",
@@ -22,7 +35,7 @@ class UsersTestCase(APITestCase):
             street="New",
             house="36/5",
             unit_name="завод",
-            level="0",
+            level=0,
         )
 
         self.user = User.objects.create(
@@ -113,6 +126,27 @@ class UsersTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(data, result)
 
+    def test_list_not_modified(self):
+        """Условный запрос списка сотрудников: 304, пока список не изменился"""
+
+        url = reverse("users:list")
+        response = self.client.get(url)
+        etag = response["ETag"]
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.create(
+                email="new@list.ru",
+                last_name="Синицина",
+                first_name="Галина",
+                employer=self.participant,
+            )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 2)
+
     def test_update_false_no_access(self):
         """Проверка изменения пользователя
         (с ошибкой, нет доступа"""
@@ -173,3 +207,341 @@ class UsersTestCase(APITestCase):
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
         self.assertEqual(User.objects.all().count(), 1)
+
+    def test_create_single_write(self):
+        """Регистрация записывает пользователя с хешем пароля одним запросом"""
+
+        Participant.objects.create(
+            name="ИП Петров",
+            email="ip@list.ru",
+            country="Россия",
+            city="Тверь",
+            street="Новая",
+            house="3",
+            unit_name="ИП",
+            supplier=self.participant,
+        )
+        url = reverse("users:create")
+        data = {
+            "email": "ip@list.ru",
+            "password": "qwe",
+            "last_name": "Петров",
+            "first_name": "Петр",
+        }
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(url, data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        writes = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith(("INSERT", "UPDATE"))
+            and User._meta.db_table in query["sql"]
+        ]
+        self.assertEqual(len(writes), 1)
+        user = User.objects.get(email="ip@list.ru")
+        self.assertTrue(check_password("qwe", user.password))
+        self.assertTrue(user.is_staff)
+        self.assertEqual(user.employer.name, "ИП Петров")
+
+    @override_settings(PASSWORD_HASHING_WORKERS=2)
+    def test_bulk_create(self):
+        """Пакетная регистрация: пароли хешируются в пуле процессов"""
+
+        url = reverse("users:bulk_create")
+        data = [
+            {
+                "email": f"employee{number}@list.ru",
+                "password": f"secret{number}",
+                "last_name": "Сотрудник",
+                "first_name": f"Номер {number}",
+            }
+            for number in range(3)
+        ]
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [item["email"] for item in response.json()],
+            ["employee0@list.ru", "employee1@list.ru", "employee2@list.ru"],
+        )
+        self.assertNotIn("password", response.json()[0])
+        for number in range(3):
+            user = User.objects.get(email=f"employee{number}@list.ru")
+            self.assertTrue(check_password(f"secret{number}", user.password))
+            self.assertTrue(user.is_active)
+            self.assertIsNone(user.employer)
+
+    def test_bulk_create_is_false(self):
+        """Пакетная регистрация: ошибки по каждому пользователю, без записи"""
+
+        url = reverse("users:bulk_create")
+        item = {"password": "qwe", "last_name": "Сидоров", "first_name": "Петр"}
+        data = [
+            {**item, "email": "vvv@list.ru"},
+            {**item, "email": "new@list.ru"},
+            {**item, "email": "new@list.ru"},
+            {**item, "email": "other@list.ru"},
+        ]
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json(),
+            [
+                {"email": ["Пользователь с таким адресом уже есть."]},
+                {"email": ["Адрес повторяется в списке."]},
+                {"email": ["Адрес повторяется в списке."]},
+                {},
+            ],
+        )
+        self.assertEqual(User.objects.count(), 1)
+
+        self.user.is_staff = False
+        response = self.client.post(url, data[3:], format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_password_hashers(self):
+        """Пароли любого из настроенных алгоритмов проверяются"""
+
+        for algorithm in ("pbkdf2_sha256", "argon2", "scrypt"):
+            encoded = make_password("123qwe", hasher=algorithm)
+            self.assertEqual(
+                type(identify_hasher(encoded)).__module__, "users.hashers"
+            )
+            self.assertTrue(check_password("123qwe", encoded))
+
+
+class CachedJWTAuthenticationTestCase(APITestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.participant = Participant.objects.create(
+            name="ООО Мир",
+            email="vvv@list.ru",
+            country="Другая",
+            city="N",
+            street="New",
+            house="36/5",
+            unit_name="завод",
+            level=0,
+        )
+        self.user = User.objects.create(
+            email="vvv@list.ru",
+            last_name="Иванов",
+            first_name="Иван",
+            password=make_password("123qwe"),
+            employer=self.participant,
+        )
+        url = reverse("users:login")
+        data = {"email": "vvv@list.ru", "password": "123qwe"}
+        self.token = self.client.post(url, data).json()["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+
+    def get_user_queries(self, url):
+        """Запросы к таблице пользователей при выполнении запроса к API"""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [
+            query["sql"]
+            for query in context.captured_queries
+            if User._meta.db_table in query["sql"]
+        ]
+
+    def test_token_claims(self):
+        """В токене работодатель и флаги сотрудника"""
+
+        token = AccessToken(self.token)
+        self.assertEqual(token["employer_id"], self.participant.pk)
+        self.assertFalse(token["is_staff"])
+        self.assertFalse(token["is_superuser"])
+
+    def test_user_from_cache(self):
+        """Пользователь загружается из базы только при первом запросе"""
+
+        url = reverse("products:list")
+        self.assertEqual(len(self.get_user_queries(url)), 1)
+        self.assertEqual(self.get_user_queries(url), [])
+
+    def test_cache_invalidation(self):
+        """Смена работодателя и удаление работодателя действуют сразу"""
+
+        url = reverse("products:list")
+        self.get_user_queries(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.employer = None
+            self.user.save()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.employer = self.participant
+            self.user.save()
+        self.get_user_queries(url)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.participant.delete()
+        # Кеш сбрасывается после фиксации удаления
+        self.assertIsNotNone(cache.get(get_user_key(self.user.pk)))
+        for callback in callbacks:
+            callback()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.refresh_from_db()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class HealthTestCase(APITestCase):
+
+    def test_health(self):
+        """Проверка работоспособности без аутентификации: 200 или 503"""
+
+        url = reverse("health")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {"status": "ok"})
+
+        with mock.patch(
+            "config.health.connection.cursor", side_effect=DatabaseError
+        ):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+@override_settings(
+    METRICS_ENABLED=True,
+    MIDDLEWARE=["config.metrics.metrics_middleware", *settings.MIDDLEWARE],
+)
+class MetricsTestCase(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.participant = Participant.objects.create(
+            name="ООО Мир",
+            email="vvv@list.ru",
+            country="Другая",
+            city="N",
+            street="New",
+            house="36/5",
+            unit_name="завод",
+            level=0,
+        )
+        self.user = User.objects.create(
+            email="vvv@list.ru",
+            last_name="Иванов",
+            first_name="Иван",
+            employer=self.participant,
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def get_sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_metrics(self):
+        """Время ответа, SQL, рендеринг и размер ответа по маршруту"""
+
+        view = {"view": "participants:list"}
+        before = {
+            "requests": self.get_sample(
+                "api_requests_total", method="GET", status="200", **view
+            ),
+            "queries": self.get_sample("api_request_sql_queries_sum", **view),
+            "render": self.get_sample(
+                "api_request_render_duration_seconds_count", **view
+            ),
+            "size": self.get_sample("api_response_size_bytes_sum", **view),
+        }
+        response = self.client.get(reverse("participants:list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(
+            self.get_sample("api_requests_total", method="GET", status="200", **view),
+            before["requests"] + 1,
+        )
+        self.assertGreater(
+            self.get_sample("api_request_sql_queries_sum", **view), before["queries"]
+        )
+        self.assertEqual(
+            self.get_sample("api_request_render_duration_seconds_count", **view),
+            before["render"] + 1,
+        )
+        self.assertGreater(
+            self.get_sample("api_request_render_duration_seconds_sum", **view), 0
+        )
+        self.assertEqual(
+            self.get_sample("api_response_size_bytes_sum", **view),
+            before["size"] + len(response.content),
+        )
+
+        staff = User.objects.create(email="admin@list.ru", is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(
+            'api_request_duration_seconds_count{method="GET",view="participants:list"}',
+            response.content.decode(),
+        )
+
+    def test_metrics_access(self):
+        """Без METRICS_TOKEN метрики доступны только сотрудникам (is_staff)"""
+
+        url = reverse("metrics")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_login(self.user)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_metrics_streaming(self):
+        """Метрики выгрузки записываются после передачи содержимого"""
+
+        view = {"view": "participants:export"}
+        before = {
+            "requests": self.get_sample(
+                "api_requests_total", method="GET", status="200", **view
+            ),
+            "queries": self.get_sample("api_request_sql_queries_sum", **view),
+            "size": self.get_sample("api_response_size_bytes_sum", **view),
+        }
+        response = self.client.get(reverse("participants:export", args=["csv"]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.get_sample("api_requests_total", method="GET", status="200", **view),
+            before["requests"],
+        )
+        content = b"".join(response.streaming_content)
+        self.assertEqual(
+            self.get_sample("api_requests_total", method="GET", status="200", **view),
+            before["requests"] + 1,
+        )
+        self.assertGreater(
+            self.get_sample("api_request_sql_queries_sum", **view), before["queries"]
+        )
+        self.assertEqual(
+            self.get_sample("api_response_size_bytes_sum", **view),
+            before["size"] + len(content),
+        )
+
+    def test_metrics_async(self):
+        """SQL-запросы асинхронного представления учитываются в его маршруте"""
+
+        view = {"view": "participants:async_list"}
+        before = self.get_sample("api_request_sql_queries_sum", **view)
+        token = UserRefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        response = self.client.get(reverse("participants:async_list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreater(
+            self.get_sample("api_request_sql_queries_sum", **view), before
+        )
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_token(self):
+        """С METRICS_TOKEN метрики доступны только с токеном"""
+
+        url = reverse("metrics")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.get(url, HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
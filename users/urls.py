@@ -4,8 +4,10 @@ from rest_framework_simplejwt.views import (TokenObtainPairView,
                                             TokenRefreshView)
 
 from users.apps import UsersConfig
-from users.views import (UserCreateAPIView, UserDestroyAPIView,
-                         UserListAPIView, UserUpdateAPIView)
+from users.serializers import UserTokenObtainPairSerializer
+from users.views import (UserBulkCreateAPIView, UserCreateAPIView,
+                         UserDestroyAPIView, UserListAPIView,
+                         UserUpdateAPIView)
 
 app_name = UsersConfig.name
 
@@ -13,7 +15,10 @@ app_name = UsersConfig.name
 urlpatterns = [
     path(
         "login/",
-        TokenObtainPairView.as_view(permission_classes=(AllowAny,)),
+        TokenObtainPairView.as_view(
+            serializer_class=UserTokenObtainPairSerializer,
+            permission_classes=(AllowAny,),
+        ),
         name="login",
     ),
     path(
@@ -26,6 +31,11 @@ urlpatterns = [
         UserCreateAPIView.as_view(permission_classes=(AllowAny,)),
         name="create",
     ),
+    path(
+        "bulk/create/",
+        UserBulkCreateAPIView.as_view(permission_classes=(IsAdminUser,)),
+        name="bulk_create",
+    ),
     path("", UserListAPIView.as_view(permission_classes=(IsAdminUser,)), name="list"),
     path(
         "update/<int:pk>/",
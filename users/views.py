@@ -1,32 +1,58 @@
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
 from rest_framework.generics import (CreateAPIView, DestroyAPIView,
-                                     ListAPIView, UpdateAPIView,
-                                     get_object_or_404)
+                                     ListAPIView, UpdateAPIView)
 
+from config.cache import invalidate_list
+from config.conditional import ConditionalGetMixin
 from participants.models import Participant
 from users.models import User
-from users.serializers import UserFullSerializer, UserSerializer
+from users.serializers import (UserFullSerializer, UserOnboardingSerializer,
+                               UserSerializer)
 
 
 class UserCreateAPIView(CreateAPIView):
     serializer_class = UserFullSerializer
 
     def perform_create(self, serializer):
-        user = serializer.save(is_active=True)
-        if Participant.objects.filter(email=user.email).exists():
-            user.is_staff = True
-            user.employer = get_object_or_404(Participant, email=user.email)
-        user.set_password(user.password)
-        user.save()
+        """Пароль хешируется до записи, пользователь записывается один раз"""
+        employer = Participant.objects.filter(
+            email=serializer.validated_data["email"]
+        ).first()
+        serializer.save(
+            password=make_password(serializer.validated_data["password"]),
+            is_active=True,
+            is_staff=employer is not None,
+            employer=employer,
+        )
 
 
-class UserListAPIView(ListAPIView):
+class UserBulkCreateAPIView(CreateAPIView):
+    """
+    Пакетная регистрация сотрудников (список пользователей в запросе);
+    работодатель определяется по email так же, как при регистрации
+    """
+
+    serializer_class = UserOnboardingSerializer
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs["many"] = True
+        kwargs["max_length"] = settings.USERS_BULK_MAX_ITEMS
+        return super().get_serializer(*args, **kwargs)
+
+    def perform_create(self, serializer):
+        serializer.save()
+        invalidate_list(User)
+
+
+class UserListAPIView(ConditionalGetMixin, ListAPIView):
     serializer_class = UserSerializer
     queryset = User.objects.all()
 
     def get_queryset(self, *args, **kwargs):
         queryset = super().get_queryset(*args, **kwargs)
         if not self.request.user.is_anonymous:
-            queryset = queryset.filter(employer=self.request.user.employer)
+            queryset = queryset.filter(employer_id=self.request.user.employer_id)
             return queryset
         else:
             return None
@@ -51,7 +77,7 @@ class UserDestroyAPIView(DestroyAPIView):
     def get_queryset(self, *args, **kwargs):
         queryset = super().get_queryset(*args, **kwargs)
         if not self.request.user.is_anonymous:
-            queryset = queryset.filter(employer=self.request.user.employer)
+            queryset = queryset.filter(employer_id=self.request.user.employer_id)
             return queryset
         else:
             return None